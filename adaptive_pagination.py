@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Yield-Aware Pagination
+- Decides page by page whether a Custom Search query is worth paging deeper
+- Stops as soon as a page yields no new jobs that pass the filters
+- Keeps going past the usual 3 pages (up to start=91) while pages keep
+  yielding fresh high-fit jobs
+- Appends per-page yield records to a JSONL log for tuning
+"""
+
+import json
+import os
+from datetime import datetime
+
+MAX_START = 91  # Custom Search hard limit: start + num <= 100
+RESULTS_PER_PAGE = 10
+
+PAGINATION_LOG_FILE = os.getenv('PAGINATION_LOG_FILE', 'pagination_yield.jsonl')
+PAGINATION_MIN_NEW = int(os.getenv('PAGINATION_MIN_NEW', 1))      # new passing jobs to fetch another page
+PAGINATION_DEEP_NEW = int(os.getenv('PAGINATION_DEEP_NEW', 3))    # ...to go beyond the base depth
+PAGINATION_DEEP_FIT = float(os.getenv('PAGINATION_DEEP_FIT', 50))  # ...with at least this mean fit score
+
+_stats = {'pages': 0, 'api_calls': 0, 'new_jobs': 0, 'stops': {}}
+
+
+def next_page_decision(start, items_on_page, new_jobs, mean_fit, base_results=30):
+    """Return (continue?, reason) after a page at `start` produced `new_jobs` fresh passing jobs"""
+    next_start = start + RESULTS_PER_PAGE
+
+    if items_on_page < RESULTS_PER_PAGE:
+        return False, 'exhausted'
+    if next_start > MAX_START:
+        return False, 'max_depth'
+    if new_jobs < PAGINATION_MIN_NEW:
+        return False, 'no_yield'
+    if next_start > base_results:
+        if new_jobs < PAGINATION_DEEP_NEW or mean_fit < PAGINATION_DEEP_FIT:
+            return False, 'shallow_yield'
+        return True, 'deep_yield'
+    return True, 'yield'
+
+
+def record_page_yield(query, start, items_on_page, new_jobs, mean_fit, reason, cached=False):
+    """Append one page's yield to the tuning log and the run counters"""
+    _stats['pages'] += 1
+    if not cached:
+        _stats['api_calls'] += 1
+    _stats['new_jobs'] += new_jobs
+    if reason not in ('yield', 'deep_yield'):
+        _stats['stops'][reason] = _stats['stops'].get(reason, 0) + 1
+
+    record = {
+        'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'query': query,
+        'start': start,
+        'items': items_on_page,
+        'new_jobs': new_jobs,
+        'mean_fit': round(mean_fit, 1),
+        'decision': reason,
+        'cached': cached,
+    }
+    with open(PAGINATION_LOG_FILE, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
+
+
+def page_yield_summary(jobs, seen_jobs):
+    """(new passing jobs, their mean fit score) for the parsed jobs of one page"""
+    fresh = [job for job in jobs if job['job_id'] not in seen_jobs]
+    if not fresh:
+        return 0, 0.0
+    return len(fresh), sum(job['fit_score'] for job in fresh) / len(fresh)
+
+
+def print_pagination_stats():
+    """Print API calls per new job for this run"""
+    if not _stats['pages']:
+        return
+
+    per_job = _stats['api_calls'] / _stats['new_jobs'] if _stats['new_jobs'] else float('inf')
+    stops = ", ".join(f"{reason}={count}" for reason, count in sorted(_stats['stops'].items()))
+    print(f"Pagination: {_stats['pages']} pages ({_stats['api_calls']} API calls), "
+          f"{_stats['new_jobs']} new jobs ({per_job:.2f} API calls per new job)")
+    if stops:
+        print(f"  Stop reasons: {stops}")
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Async Custom Search Engine
+- Runs every SEARCHES query (and its pages) concurrently
+- Global QPS cap + concurrency limit so we stay under Google's quota rules
+- Returns the same {'items': [...]} shape as search_google_paginated,
+  so parse_job_results keeps working unchanged
+- Wall-clock comparison against the sequential loop (--compare)
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from http_transport import http_get
+from response_cache import get_cache
+
+BASE_URL = "https://www.googleapis.com/customsearch/v1"
+RESULTS_PER_PAGE = 10
+MAX_RETRIES = 3
+
+_sent = Counter()   # query -> Custom Search requests actually sent (cache hits excluded)
+_sent_lock = threading.Lock()
+
+
+class RateLimiter:
+    """Spaces request starts so no more than `qps` begin per second"""
+
+    def __init__(self, qps):
+        self.interval = 1.0 / qps if qps > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+def fetch_page(query, start, api_key, search_engine_id, date_restrict='d1'):
+    """Fetch a single Custom Search page (blocking). Returns JSON dict or None"""
+    cached = get_cache().get('customsearch', query, start, date_restrict)
+    if cached is not None:
+        return json.loads(cached)
+
+    params = {
+        'key': api_key,
+        'cx': search_engine_id,
+        'q': query,
+        'dateRestrict': date_restrict,
+        'num': RESULTS_PER_PAGE,
+        'start': start
+    }
+
+    for attempt in range(MAX_RETRIES):
+        with _sent_lock:
+            _sent[query] += 1
+        try:
+            response = http_get(BASE_URL, params=params, timeout=10)
+        except requests.exceptions.RequestException as e:
+            print(f"   Request error at page {start // 10 + 1}: {str(e)[:60]}")
+            return None
+
+        if response.status_code == 429:
+            wait_time = (2 ** attempt) * 5
+            print(f"   Rate limit at page {start // 10 + 1}. Retry {attempt + 1}/{MAX_RETRIES} after {wait_time}s")
+            time.sleep(wait_time)
+            continue
+
+        if response.status_code != 200:
+            try:
+                error_msg = response.json().get('error', {}).get('message', 'Unknown error')
+            except ValueError:
+                error_msg = response.text[:100]
+            print(f"   HTTP {response.status_code} at page {start // 10 + 1}: {error_msg}")
+            return None
+
+        get_cache().put('customsearch', query, start, date_restrict, response.text)
+        return response.json()
+
+    return None
+
+
+class AsyncSearchEngine:
+    """Concurrent Custom Search client bounded by a QPS cap and a worker limit"""
+
+    def __init__(self, fetch, qps=5.0, concurrency=8):
+        # fetch(query, start) -> dict | None, called from worker threads
+        self.fetch = fetch
+        self.qps = qps
+        self.concurrency = concurrency
+        self.requests_made = 0
+
+    async def _get_page(self, query, start):
+        async with self._semaphore:
+            await self._limiter.acquire()
+            self.requests_made += 1
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self.fetch, query, start)
+
+    async def search_query(self, query, max_results=30):
+        """Fetch page 1, then the remaining pages of one query in parallel"""
+        first = await self._get_page(query, 1)
+        if not first or 'items' not in first:
+            return None
+
+        pages = [first]
+        total = int(first.get('searchInformation', {}).get('totalResults', 0) or 0)
+        if len(first['items']) >= RESULTS_PER_PAGE:
+            starts = [start for start in range(1 + RESULTS_PER_PAGE, max_results + 1, RESULTS_PER_PAGE)
+                      if start <= total]
+            pages.extend(await asyncio.gather(*(self._get_page(query, s) for s in starts)))
+
+        # Same semantics as the sequential loop: stop at the first empty page
+        all_items = []
+        for page in pages:
+            if not page or 'items' not in page:
+                break
+            all_items.extend(page['items'])
+
+        return {'items': all_items} if all_items else None
+
+    async def search_many(self, queries, max_results=30):
+        """
+        Run all queries concurrently; results come back in input order.
+        max_results: one limit for every query, or a list aligned with queries
+        """
+        limits = max_results if isinstance(max_results, list) else [max_results] * len(queries)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._limiter = RateLimiter(self.qps)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as self._executor:
+            return await asyncio.gather(*(self.search_query(q, limit) for q, limit in zip(queries, limits)))
+
+
+def search_all(searches, api_key, search_engine_id, qps=5.0, concurrency=8,
+               date_restrict='d1', max_results=30, page_caps=None):
+    """
+    Run every entry of a SEARCHES list concurrently. Returns list aligned with `searches`.
+    page_caps: optional pages per query (the scheduler's allocation), replacing max_results
+    """
+    fetch = functools.partial(fetch_page, api_key=api_key, search_engine_id=search_engine_id,
+                              date_restrict=date_restrict)
+    engine = AsyncSearchEngine(fetch, qps=qps, concurrency=concurrency)
+    queries = [s['query'] for s in searches]
+    limits = [max_results if cap is None else cap * RESULTS_PER_PAGE
+              for cap in (page_caps or [None] * len(queries))]
+    return asyncio.run(engine.search_many(queries, max_results=limits))
+
+
+def requests_sent(query):
+    """Custom Search requests fetch_page sent for `query` in this process: the quota actually spent"""
+    with _sent_lock:
+        return _sent[query]
+
+
+def run_sequential(queries, fetch, max_results=30, page_delay=0.5, delay_between_searches=2):
+    """The current search_google_paginated + DELAY_BETWEEN_SEARCHES loop, for comparison"""
+    results = []
+    for query in queries:
+        all_items = []
+        for start in range(1, max_results + 1, RESULTS_PER_PAGE):
+            if len(all_items) >= max_results:
+                break
+            data = fetch(query, start)
+            if not data or 'items' not in data:
+                break
+            all_items.extend(data['items'])
+            time.sleep(page_delay)
+        results.append({'items': all_items} if all_items else None)
+        time.sleep(delay_between_searches)
+    return results
+
+
+def simulated_fetch(latency, total_results=30):
+    """Offline stand-in for fetch_page: fixed latency, `total_results` fake items per query"""
+
+    def fetch(query, start):
+        time.sleep(latency)
+        if start > total_results:
+            return {'searchInformation': {'totalResults': str(total_results)}}
+        count = min(RESULTS_PER_PAGE, total_results - start + 1)
+        return {
+            'searchInformation': {'totalResults': str(total_results)},
+            'items': [{'title': f"{query[:20]} #{start + i}", 'link': f"https://example.com/{start + i}",
+                       'snippet': ''} for i in range(count)]
+        }
+
+    return fetch
+
+
+def compare_wall_clock(queries, fetch, qps=5.0, concurrency=8, max_results=30,
+                       page_delay=0.5, delay_between_searches=2):
+    """Time the sequential loop against the async engine on the same queries"""
+    t0 = time.perf_counter()
+    sequential = run_sequential(queries, fetch, max_results, page_delay, delay_between_searches)
+    sequential_time = time.perf_counter() - t0
+
+    engine = AsyncSearchEngine(fetch, qps=qps, concurrency=concurrency)
+    t0 = time.perf_counter()
+    concurrent = asyncio.run(engine.search_many(queries, max_results=max_results))
+    concurrent_time = time.perf_counter() - t0
+
+    seq_items = sum(len(r['items']) for r in sequential if r)
+    con_items = sum(len(r['items']) for r in concurrent if r)
+
+    print("=" * 60)
+    print("WALL-CLOCK COMPARISON")
+    print(f"Queries: {len(queries)} | QPS cap: {qps} | Concurrency: {concurrency}")
+    print("=" * 60)
+    print(f"Sequential: {sequential_time:7.2f}s  ({seq_items} items)")
+    print(f"Async:      {concurrent_time:7.2f}s  ({con_items} items, {engine.requests_made} requests)")
+    if concurrent_time > 0:
+        print(f"Speedup:    {sequential_time / concurrent_time:7.1f}x")
+    print("=" * 60)
+    return sequential_time, concurrent_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Async Custom Search engine")
+    parser.add_argument('--compare', action='store_true', help="Compare wall clock vs the sequential loop")
+    parser.add_argument('--simulate-latency', type=float, default=None,
+                        help="Use a fake backend with this per-request latency (no API quota used)")
+    parser.add_argument('--qps', type=float, default=5.0)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--delay', type=float, default=2, help="DELAY_BETWEEN_SEARCHES for the sequential run")
+    args = parser.parse_args()
+
+    from job_scraper_complete import SEARCHES, GOOGLE_API_KEY, SEARCH_ENGINE_ID
+
+    queries = [s['query'] for s in SEARCHES]
+
+    if args.simulate_latency is not None:
+        fetch = simulated_fetch(args.simulate_latency)
+    else:
+        if not GOOGLE_API_KEY or not SEARCH_ENGINE_ID:
+            print("ERROR: Missing API keys (use --simulate-latency to run offline)")
+            return
+        fetch = functools.partial(fetch_page, api_key=GOOGLE_API_KEY, search_engine_id=SEARCH_ENGINE_ID)
+
+    if args.compare:
+        compare_wall_clock(queries, fetch, qps=args.qps, concurrency=args.concurrency,
+                           delay_between_searches=args.delay)
+    else:
+        engine = AsyncSearchEngine(fetch, qps=args.qps, concurrency=args.concurrency)
+        t0 = time.perf_counter()
+        results = asyncio.run(engine.search_many(queries))
+        elapsed = time.perf_counter() - t0
+        total = sum(len(r['items']) for r in results if r)
+        print(f"{len(queries)} queries, {engine.requests_made} requests, {total} items in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
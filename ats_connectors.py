@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Direct ATS Board Connectors
+- Polls public job board JSON endpoints (Greenhouse, Lever, Ashby) concurrently
+- One request returns every opening on a board, instead of one Google result at a time
+- Workday tenants go through the CXS job-search endpoint with keyword and location
+  facets applied server-side, remaining pages fetched concurrently
+- Maps postings to Custom Search shaped items ({'title', 'link', 'snippet'}) so they
+  go through the scrapers' existing parse_job_results senior/US/fit filters
+- Board URLs we already keep (boards.greenhouse.io/<slug>, jobs.lever.co/<slug>,
+  jobs.ashbyhq.com/<slug>, <tenant>.wd<N>.myworkdayjobs.com/<site>) are turned
+  back into boards to poll
+"""
+
+import argparse
+import html
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from http_transport import http_get, http_post, print_transport_stats
+
+GREENHOUSE_API_BASE = os.getenv('GREENHOUSE_API_BASE', 'https://boards-api.greenhouse.io')
+LEVER_API_BASE = os.getenv('LEVER_API_BASE', 'https://api.lever.co')
+ASHBY_API_BASE = os.getenv('ASHBY_API_BASE', 'https://api.ashbyhq.com')
+WORKDAY_API_BASE = os.getenv('WORKDAY_API_BASE', '')  # override the tenant host (tests)
+WORKDAY_SEARCH_TEXT = os.getenv('WORKDAY_SEARCH_TEXT', 'machine learning|AI engineer|applied scientist')
+WORKDAY_LOCATIONS = os.getenv('WORKDAY_LOCATIONS', 'United States of America')
+WORKDAY_FETCH_DETAILS = os.getenv('WORKDAY_FETCH_DETAILS', '1') == '1'  # descriptions feed the fit score
+ATS_POLL_WORKERS = int(os.getenv('ATS_POLL_WORKERS', 8))
+
+WORKDAY_PAGE_SIZE = 20  # CXS rejects limit > 20
+
+SNIPPET_CHARS = 300
+BOARD_ROLE = 'ATS Board'   # role_category of jobs found by board polling
+TAG_RE = re.compile(r'<[^>]+>')
+
+BOARD_URL_PATTERNS = [
+    ('greenhouse', re.compile(r'(?:boards|job-boards)\.greenhouse\.io/([^/?#]+)')),
+    ('lever', re.compile(r'jobs\.lever\.co/([^/?#]+)')),
+    ('ashby', re.compile(r'jobs\.ashbyhq\.com/([^/?#]+)')),
+]
+# Workday boards are "<tenant>.wd<N>/<site>", e.g. nvidia.wd5/NVIDIAExternalCareerSite
+WORKDAY_URL_RE = re.compile(r'//([^./]+\.wd\d+)\.myworkdayjobs\.com/(?:[a-z]{2}-[A-Z]{2}/)?([^/?#]+)')
+
+ATS_LABELS = {'greenhouse': 'Greenhouse', 'lever': 'Lever', 'ashby': 'Ashby', 'workday': 'Workday'}
+
+
+def _plain(text):
+    """Strip tags/entities from board HTML (Greenhouse content is entity-escaped HTML)"""
+    return ' '.join(TAG_RE.sub(' ', html.unescape(html.unescape(text or ''))).split())
+
+
+def _item(title, link, location, description, posting_id, updated_at):
+    """Custom Search shaped item; location leads the snippet so the US filter sees it"""
+    snippet = f"{location}. {description}" if location else description
+    return {
+        'title': title,
+        'link': link,
+        'snippet': snippet[:SNIPPET_CHARS],
+        'location': location,
+        'posting_id': str(posting_id),
+        'updated_at': updated_at,
+    }
+
+
+def _greenhouse_item(slug, job):
+    # absolute_url is often the company's own careers page; the canonical board
+    # URL keeps extract_job_id/extract_company_name working
+    link = f"https://boards.greenhouse.io/{slug}/jobs/{job['id']}"
+    location = (job.get('location') or {}).get('name', '')
+    return _item(job.get('title', ''), link, location, _plain(job.get('content')),
+                 job['id'], job.get('updated_at'))
+
+
+def fetch_greenhouse(slug, content=True):
+    """Every posting on a board; content=False skips descriptions (a fraction of the bytes)"""
+    response = http_get(f"{GREENHOUSE_API_BASE}/v1/boards/{slug}/jobs",
+                        params={'content': 'true' if content else 'false'})
+    response.raise_for_status()
+    return [_greenhouse_item(slug, job) for job in response.json().get('jobs', [])]
+
+
+def fetch_greenhouse_content(slug, items, max_workers=ATS_POLL_WORKERS):
+    """Fill in descriptions for items from a content=False listing, one request per posting"""
+    def fetch_one(item):
+        try:
+            response = http_get(f"{GREENHOUSE_API_BASE}/v1/boards/{slug}/jobs/{item['posting_id']}")
+            response.raise_for_status()
+            return _greenhouse_item(slug, response.json())
+        except Exception:
+            return item
+
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(fetch_one, items))
+
+
+def fetch_lever(slug):
+    response = http_get(f"{LEVER_API_BASE}/v0/postings/{slug}", params={'mode': 'json'})
+    response.raise_for_status()
+
+    items = []
+    for posting in response.json():
+        categories = posting.get('categories') or {}
+        link = posting.get('hostedUrl') or f"https://jobs.lever.co/{slug}/{posting['id']}"
+        items.append(_item(posting.get('text', ''), link, categories.get('location', ''),
+                           posting.get('descriptionPlain') or _plain(posting.get('description')),
+                           posting['id'], posting.get('updatedAt', posting.get('createdAt'))))
+    return items
+
+
+def fetch_ashby(slug):
+    response = http_get(f"{ASHBY_API_BASE}/posting-api/job-board/{slug}")
+    response.raise_for_status()
+
+    items = []
+    for job in response.json().get('jobs', []):
+        if job.get('isListed') is False:
+            continue
+        location = job.get('location', '')
+        if job.get('isRemote') and 'remote' not in location.lower():
+            location = f"{location} (Remote)" if location else 'Remote'
+        link = job.get('jobUrl') or f"https://jobs.ashbyhq.com/{slug}/{job['id']}"
+        items.append(_item(job.get('title', ''), link, location,
+                           job.get('descriptionPlain') or _plain(job.get('descriptionHtml')),
+                           job['id'], job.get('updatedAt', job.get('publishedAt'))))
+    return items
+
+
+def _workday_facets(facets, locations):
+    """appliedFacets for every facet value whose descriptor names one of `locations`"""
+    wanted = [loc.lower() for loc in locations]
+    applied = {}
+    descriptors = []
+
+    def walk(facet_list):
+        for facet in facet_list or []:
+            parameter = facet.get('facetParameter')
+            for value in facet.get('values', []):
+                if 'values' in value:
+                    # Grouped facets (e.g. locationMainGroup) nest their own parameter
+                    walk([value])
+                    continue
+                descriptor = value.get('descriptor', '')
+                if parameter and descriptor.lower() in wanted:
+                    applied.setdefault(parameter, []).append(value['id'])
+                    descriptors.append(descriptor)
+
+    walk(facets)
+    return applied, descriptors
+
+
+def fetch_workday(slug, search_text=None, locations=None, max_workers=ATS_POLL_WORKERS):
+    """
+    Search one Workday tenant (slug "<tenant>.wd<N>/<site>") through its CXS endpoint.
+    Location names are resolved to facet IDs from the first response and applied
+    server-side; each keyword's remaining pages are fetched concurrently.
+    Search results carry no description, so posting details are fetched concurrently too
+    (WORKDAY_FETCH_DETAILS=0 skips them and scores on title only).
+    """
+    host_prefix, _, site = slug.partition('/')
+    tenant = host_prefix.split('.')[0]
+    host = f"https://{host_prefix}.myworkdayjobs.com"
+    cxs_base = f"{WORKDAY_API_BASE or host}/wday/cxs/{tenant}/{site}"
+    endpoint = f"{cxs_base}/jobs"
+    search_texts = [t.strip() for t in (search_text or WORKDAY_SEARCH_TEXT).split('|') if t.strip()]
+    locations = [l.strip() for l in (locations or WORKDAY_LOCATIONS).split('|') if l.strip()]
+
+    def search_page(text, offset, applied_facets):
+        payload = {'appliedFacets': applied_facets, 'limit': WORKDAY_PAGE_SIZE,
+                   'offset': offset, 'searchText': text}
+        response = http_post(endpoint, json=payload, headers={'Accept': 'application/json'})
+        response.raise_for_status()
+        return response.json()
+
+    applied_facets, facet_descriptors = {}, []
+    if locations:
+        first = search_page(search_texts[0] if search_texts else '', 0, {})
+        applied_facets, facet_descriptors = _workday_facets(first.get('facets'), locations)
+
+    postings = {}
+    for text in search_texts or ['']:
+        first = search_page(text, 0, applied_facets)
+        pages = [first]
+        offsets = range(WORKDAY_PAGE_SIZE, first.get('total', 0), WORKDAY_PAGE_SIZE)
+        if offsets:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(offsets))) as pool:
+                pages.extend(pool.map(lambda offset: search_page(text, offset, applied_facets), offsets))
+        for page in pages:
+            for posting in page.get('jobPostings', []):
+                postings.setdefault(posting['externalPath'], posting)
+
+    def description(path):
+        try:
+            response = http_get(f"{cxs_base}{path}", headers={'Accept': 'application/json'})
+            response.raise_for_status()
+            return _plain(response.json().get('jobPostingInfo', {}).get('jobDescription'))
+        except Exception:
+            return ''
+
+    descriptions = {}
+    if WORKDAY_FETCH_DETAILS and postings:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(postings))) as pool:
+            descriptions = dict(zip(postings, pool.map(description, postings)))
+
+    # The server already filtered by location facet: say so in the snippet for the US filter
+    region = ', '.join(facet_descriptors)
+    items = []
+    for path, posting in postings.items():
+        location = posting.get('locationsText', '')
+        details = ' | '.join(filter(None, [region, *posting.get('bulletFields', []), posting.get('postedOn'),
+                                           descriptions.get(path)]))
+        item = _item(posting.get('title', ''), f"{host}/{site}{path}", location, details,
+                     path.rsplit('/', 1)[-1], None)
+        item['posted_on'] = posting.get('postedOn')
+        items.append(item)
+    return items
+
+
+CONNECTORS = {
+    'greenhouse': fetch_greenhouse,
+    'lever': fetch_lever,
+    'ashby': fetch_ashby,
+    'workday': fetch_workday,
+}
+
+
+def parse_board_spec(spec):
+    """'greenhouse:anthropic,workday:nvidia.wd5/NVIDIAExternalCareerSite' -> [(ats, slug), ...]"""
+    boards = []
+    for part in spec.split(','):
+        ats, _, slug = part.strip().partition(':')
+        if ats.lower() in CONNECTORS and slug:
+            boards.append((ats.lower(), slug.strip()))
+    return boards
+
+
+def board_from_url(url):
+    """(ats, slug) for a job URL on a supported board, else None"""
+    match = WORKDAY_URL_RE.search(url)
+    if match:
+        return 'workday', f"{match.group(1).lower()}/{match.group(2)}"
+    for ats, pattern in BOARD_URL_PATTERNS:
+        match = pattern.search(url)
+        if match and match.group(1) not in ('embed', 'v1'):
+            return ats, match.group(1).lower()
+    return None
+
+
+def boards_from_urls(urls):
+    """Unique boards behind a list of job URLs, in first-seen order"""
+    boards = []
+    for url in urls:
+        board = board_from_url(url)
+        if board and board not in boards:
+            boards.append(board)
+    return boards
+
+
+def poll_board(board):
+    """(board, items, error) for one board"""
+    ats, slug = board
+    try:
+        return board, CONNECTORS[ats](slug), None
+    except Exception as e:
+        return board, [], str(e)
+
+
+def poll_boards(boards, max_workers=ATS_POLL_WORKERS):
+    """Poll boards concurrently. Returns [(board, items, error)] in input order"""
+    if not boards:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(boards))) as pool:
+        return list(pool.map(poll_board, boards))
+
+
+def board_results(polled, role=BOARD_ROLE):
+    """
+    Group polled items into (metadata, {'items': [...]}) batches, one per board and location,
+    the same shape query_planner.split_results yields, ready for parse_job_results
+    """
+    batches = []
+    for (ats, slug), items, _ in polled:
+        by_location = {}
+        for item in items:
+            by_location.setdefault(item['location'] or 'Not specified', []).append(item)
+        for location, location_items in by_location.items():
+            metadata = {'query': f"{ats}:{slug}", 'location': location, 'role': role, 'ats': ATS_LABELS[ats]}
+            batches.append((metadata, {'items': location_items}))
+    return batches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Poll ATS job boards directly")
+    parser.add_argument('boards', help="Comma-separated ats:slug list, e.g. "
+                                       "greenhouse:anthropic,workday:nvidia.wd5/NVIDIAExternalCareerSite")
+    parser.add_argument('--workers', type=int, default=ATS_POLL_WORKERS)
+    args = parser.parse_args()
+
+    boards = parse_board_spec(args.boards)
+    for (ats, slug), items, error in poll_boards(boards, args.workers):
+        status = f"ERROR {error}" if error else f"{len(items)} postings"
+        print(f"{ats:<11} {slug:<25} {status}")
+        for item in items[:5]:
+            print(f"    {item['title'][:50]:<50} | {item['location'][:25]}")
+
+    print_transport_stats()
+
+
+if __name__ == "__main__":
+    main()
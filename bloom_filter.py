@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Memory-Mapped Bloom Filter
+- Bit array in a file, mapped with mmap: opening costs nothing, only touched pages
+  are read, and every process mapping the file shares the same bits
+- Sized from the expected number of keys and a target false-positive rate:
+  m = -n ln(p) / ln(2)^2 bits, k = (m / n) ln(2) hashes
+- k bit positions from one blake2b digest (double hashing)
+- No false negatives: "not in filter" means definitely never added. A hit only
+  means "maybe", and the caller checks its exact store
+- Stdlib only
+- python bloom_filter.py bench --ids 1000000 10000000
+"""
+
+import argparse
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+import time
+import tracemalloc
+
+MAGIC = b'SEENBLM1'
+HEADER = struct.Struct('<8sQQQQ')   # magic, bits, hashes, capacity, count
+HEADER_SIZE = HEADER.size
+
+
+def optimal_size(capacity, fp_rate):
+    """(bits, hashes) for `capacity` keys at `fp_rate`"""
+    bits = max(64, int(math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2))))
+    hashes = max(1, int(round(bits / capacity * math.log(2))))
+    return bits, hashes
+
+
+class BloomFilter:
+    """File-backed Bloom filter: `in`, add(), update(); create() sizes a new file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'r+b')
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        magic, self.bits, self.hashes, self.capacity, _ = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a Bloom filter file")
+        self.inode = os.fstat(self._file.fileno()).st_ino
+
+    @classmethod
+    def create(cls, path, capacity, fp_rate, keys=()):
+        """Write a new filter for `capacity` keys (built in a temp file, then swapped in atomically)"""
+        bits, hashes = optimal_size(capacity, fp_rate)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, bits, hashes, capacity, 0))
+            f.truncate(HEADER.size + (bits + 7) // 8)
+        bloom = cls(tmp_path)
+        bloom.update(keys)
+        bloom.flush()
+        bloom.close()
+        os.replace(tmp_path, path)
+        return cls(path)
+
+    @property
+    def count(self):
+        return HEADER.unpack_from(self._mm, 0)[4]
+
+    def _positions(self, key):
+        digest = int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest(), 'little')
+        h1, h2 = digest >> 64, (digest & 0xFFFFFFFFFFFFFFFF) | 1
+        bits = self.bits
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % bits
+
+    def __contains__(self, key):
+        mm = self._mm
+        for position in self._positions(key):
+            if not mm[HEADER_SIZE + (position >> 3)] & (1 << (position & 7)):
+                return False    # most new IDs stop at the first or second bit
+        return True
+
+    def add(self, key):
+        """Set the key's bits. Not atomic across processes: callers serialize writers"""
+        mm = self._mm
+        for position in self._positions(key):
+            offset = HEADER_SIZE + (position >> 3)
+            mm[offset] |= 1 << (position & 7)
+
+    def update(self, keys):
+        added = 0
+        for key in keys:
+            self.add(key)
+            added += 1
+        magic, bits, hashes, capacity, count = HEADER.unpack_from(self._mm, 0)
+        HEADER.pack_into(self._mm, 0, magic, bits, hashes, capacity, count + added)
+
+    def expected_fp_rate(self):
+        """False-positive rate at the current count"""
+        return (1 - math.exp(-self.hashes * self.count / self.bits)) ** self.hashes
+
+    def size_bytes(self):
+        return HEADER.size + (self.bits + 7) // 8
+
+    def flush(self):
+        self._mm.flush()
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+
+def benchmark(count, fp_rate=0.01, lookups=200000):
+    """Memory and lookup cost of a Python set vs the filter at `count` IDs"""
+    keys = (f"greenhouse_{n}" for n in range(count))
+
+    tracemalloc.start()
+    seen = set(f"greenhouse_{n}" for n in range(count))
+    set_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    misses = [f"lever_{n}" for n in range(lookups)]
+    start = time.perf_counter()
+    sum(1 for key in misses if key in seen)
+    set_lookup = time.perf_counter() - start
+    del seen
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench.bloom')
+    start = time.perf_counter()
+    bloom = BloomFilter.create(path, count, fp_rate, keys)
+    build_seconds = time.perf_counter() - start
+    bloom.close()
+
+    start = time.perf_counter()
+    bloom = BloomFilter(path)
+    open_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    false_positives = sum(1 for key in misses if key in bloom)
+    miss_lookup = time.perf_counter() - start
+    hits = [f"greenhouse_{n}" for n in range(0, count, max(1, count // lookups))][:lookups]
+    start = time.perf_counter()
+    found = sum(1 for key in hits if key in bloom)
+    hit_lookup = time.perf_counter() - start
+    bloom.close()
+
+    print(f"{count:,} IDs (target FP {fp_rate:.2%})")
+    print(f"  set:    {set_bytes / 1e6:.0f} MB in memory, {set_lookup / lookups * 1e6:.2f} us/lookup")
+    print(f"  filter: {os.path.getsize(path) / 1e6:.1f} MB file ({bloom.hashes} hashes), built in {build_seconds:.1f}s, "
+          f"opened in {open_seconds * 1000:.2f} ms")
+    print(f"          new IDs {miss_lookup / lookups * 1e6:.2f} us/lookup, {false_positives / lookups:.2%} false positives; "
+          f"known IDs {hit_lookup / len(hits) * 1e6:.2f} us/lookup ({found}/{len(hits)} found)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory-mapped Bloom filter")
+    sub = parser.add_subparsers(dest='command', required=True)
+    bench = sub.add_parser('bench', help="set vs filter memory and lookups")
+    bench.add_argument('--ids', type=int, nargs='+', default=[1000000, 10000000])
+    bench.add_argument('--fp', type=float, default=0.01)
+    args = parser.parse_args()
+    for count in args.ids:
+        benchmark(count, args.fp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Company Board Registry
+- Remembers every Greenhouse/Lever/Ashby/Workday board a search result pointed at
+- Per board: ATS, slug, Workday tenant, company, first/last seen, hit count
+- Picks which boards to poll directly (most hits first, skipping recently polled
+  and dead boards), so coverage shifts from Google searches to bulk board fetches
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime, timedelta
+
+from ats_connectors import board_from_url
+
+BOARD_REGISTRY_FILE = os.getenv('BOARD_REGISTRY_FILE', 'board_registry.json')
+ATS_MAX_BOARDS = int(os.getenv('ATS_MAX_BOARDS', 50))                        # boards polled per run
+BOARD_POLL_INTERVAL_HOURS = float(os.getenv('BOARD_POLL_INTERVAL_HOURS', 6))  # don't re-poll sooner
+BOARD_MAX_ERRORS = 3  # consecutive failures before a slug is treated as dead
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def board_key(board):
+    ats, slug = board
+    return f"{ats}:{slug}"
+
+
+class BoardRegistry:
+    """JSON-backed registry of discovered job boards"""
+
+    def __init__(self, path=BOARD_REGISTRY_FILE):
+        self.path = path
+        self.boards = {}
+        self.discovered = 0
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.boards = json.load(f)
+
+    def save(self):
+        with open(self.path, 'w') as f:
+            json.dump(self.boards, f, indent=2)
+
+    def record_url(self, url, company=None):
+        """Count a search hit for the board behind `url`. Returns the (ats, slug) board or None"""
+        board = board_from_url(url)
+        if board is None:
+            return None
+
+        ats, slug = board
+        now = datetime.now().strftime(TIME_FORMAT)
+        entry = self.boards.get(board_key(board))
+        if entry is None:
+            entry = {
+                'ats': ats,
+                'slug': slug,
+                'tenant': slug.split('.')[0] if ats == 'workday' else None,
+                'company': company,
+                'first_seen': now,
+                'hits': 0,
+                'errors': 0,
+            }
+            self.boards[board_key(board)] = entry
+            self.discovered += 1
+
+        entry['last_seen'] = now
+        entry['hits'] += 1
+        if company and company != 'Unknown' and not entry.get('company'):
+            entry['company'] = company
+        return board
+
+    def record_poll(self, board, postings, error=None):
+        """Remember when a board was polled, how many postings it had, and failures"""
+        entry = self.boards.get(board_key(board))
+        if entry is None:
+            return
+        entry['last_polled'] = datetime.now().strftime(TIME_FORMAT)
+        if error:
+            entry['errors'] = entry.get('errors', 0) + 1
+            entry['last_error'] = error[:200]
+        else:
+            entry['errors'] = 0
+            entry['postings'] = postings
+
+    def boards_to_poll(self, limit=ATS_MAX_BOARDS, interval_hours=BOARD_POLL_INTERVAL_HOURS):
+        """Boards due for a poll: most search hits first, dead and recently polled ones skipped"""
+        cutoff = (datetime.now() - timedelta(hours=interval_hours)).strftime(TIME_FORMAT)
+        due = [e for e in self.boards.values()
+               if e.get('errors', 0) < BOARD_MAX_ERRORS and e.get('last_polled', '') < cutoff]
+        due.sort(key=lambda e: (-e['hits'], e.get('last_polled', '')))
+        return [(e['ats'], e['slug']) for e in due[:limit]]
+
+    def summary(self):
+        by_ats = {}
+        for entry in self.boards.values():
+            by_ats[entry['ats']] = by_ats.get(entry['ats'], 0) + 1
+        counts = ", ".join(f"{ats}={n}" for ats, n in sorted(by_ats.items()))
+        return f"Board registry: {len(self.boards)} boards ({counts}), {self.discovered} new this run"
+
+
+_registry = None
+
+
+def get_registry():
+    """Process-wide registry (loaded on first use)"""
+    global _registry
+    if _registry is None:
+        _registry = BoardRegistry()
+    return _registry
+
+
+def save_registry():
+    if _registry is not None:
+        _registry.save()
+
+
+def print_registry_stats():
+    if _registry is not None:
+        print(_registry.summary())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show discovered job boards")
+    parser.add_argument('--due', action='store_true', help="Only boards due for polling")
+    args = parser.parse_args()
+
+    registry = BoardRegistry()
+    entries = list(registry.boards.values())
+    if args.due:
+        due = set(registry.boards_to_poll())
+        entries = [e for e in entries if (e['ats'], e['slug']) in due]
+
+    for e in sorted(entries, key=lambda e: -e['hits']):
+        status = f"{e.get('postings', '?')} postings" if not e.get('errors') else f"{e['errors']} errors"
+        print(f"{e['ats']:<11} {e['slug'][:35]:<35} hits {e['hits']:>4} | first {e['first_seen'][:10]} | "
+              f"last {e['last_seen'][:10]} | {status}")
+    print(registry.summary())
+
+
+if __name__ == "__main__":
+    main()
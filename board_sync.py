@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Incremental Board Sync
+- Per board cursor: sorted array of known posting IDs (+ their links) and the
+  newest updated_at seen
+- Each poll is diffed against the cursor: added, removed (closed) and changed postings
+- Greenhouse boards are listed without descriptions; content is only fetched for the delta,
+  posting by posting, or with one content listing on a first sync or a large delta
+- Only added/changed postings go on to parse_job_results scoring
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from ats_connectors import (CONNECTORS, ATS_POLL_WORKERS, fetch_greenhouse, fetch_greenhouse_content)
+
+BOARD_CURSORS_FILE = os.getenv('BOARD_CURSORS_FILE', 'board_cursors.json')
+# Greenhouse delta above this many postings: one content listing instead of a request per posting
+GREENHOUSE_DELTA_FETCH_MAX = int(os.getenv('GREENHOUSE_DELTA_FETCH_MAX', 10))
+
+
+def _timestamp(value):
+    """updated_at as epoch seconds: Lever sends epoch ms, Greenhouse/Ashby ISO 8601"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+def load_cursors(path=BOARD_CURSORS_FILE):
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            return json.load(f)
+    return {}
+
+
+def save_cursors(cursors, path=BOARD_CURSORS_FILE):
+    with open(path, 'w') as f:
+        json.dump(cursors, f)
+
+
+def diff_board(cursor, items):
+    """
+    Diff a fresh listing against a board cursor.
+    Returns (delta, new_cursor); delta has 'added', 'changed' (items) and 'removed'
+    ({'posting_id', 'link', 'title', 'location'} for postings no longer listed)
+    """
+    cursor = cursor or {'ids': [], 'links': [], 'updated_at': None}
+    old_ids, old_links = cursor['ids'], cursor['links']
+    # Cursors written before titles/locations were kept have neither
+    old_titles = cursor.get('titles') or [''] * len(old_ids)
+    old_locations = cursor.get('locations') or [''] * len(old_ids)
+    since = cursor.get('updated_at')
+
+    fresh = sorted(items, key=lambda item: item['posting_id'])
+    delta = {'added': [], 'changed': [], 'removed': []}
+
+    # Merge walk over the two sorted ID arrays
+    i = j = 0
+    while i < len(old_ids) or j < len(fresh):
+        if j == len(fresh) or (i < len(old_ids) and old_ids[i] < fresh[j]['posting_id']):
+            delta['removed'].append({'posting_id': old_ids[i], 'link': old_links[i],
+                                     'title': old_titles[i], 'location': old_locations[i]})
+            i += 1
+        elif i == len(old_ids) or fresh[j]['posting_id'] < old_ids[i]:
+            delta['added'].append(fresh[j])
+            j += 1
+        else:
+            updated = _timestamp(fresh[j].get('updated_at'))
+            if since is not None and updated is not None and updated > since:
+                delta['changed'].append(fresh[j])
+            i += 1
+            j += 1
+
+    stamps = [t for t in (_timestamp(item.get('updated_at')) for item in fresh) if t is not None]
+    new_cursor = {
+        'ids': [item['posting_id'] for item in fresh],
+        'links': [item['link'] for item in fresh],
+        'titles': [item.get('title', '') for item in fresh],
+        'locations': [item.get('location', '') for item in fresh],
+        'updated_at': max(stamps) if stamps else since,
+        'synced_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    return delta, new_cursor
+
+
+def sync_board(board, cursors):
+    """Poll one board and diff it. Returns (board, delta, listed, error); cursors updated in place"""
+    ats, slug = board
+    key = f"{ats}:{slug}"
+    # First sync: every posting is new, so list the board with content in one request
+    with_content = ats != 'greenhouse' or key not in cursors
+    try:
+        if ats == 'greenhouse':
+            items = fetch_greenhouse(slug, content=with_content)
+        else:
+            items = CONNECTORS[ats](slug)
+    except Exception as e:
+        return board, {'added': [], 'changed': [], 'removed': []}, 0, str(e)
+
+    delta, cursors[key] = diff_board(cursors.get(key), items)
+    if not with_content:
+        if len(delta['added']) + len(delta['changed']) > GREENHOUSE_DELTA_FETCH_MAX:
+            try:
+                listed = {item['posting_id']: item for item in fetch_greenhouse(slug, content=True)}
+            except Exception:
+                listed = {}
+            for part in ('added', 'changed'):
+                delta[part] = [listed.get(item['posting_id'], item) for item in delta[part]]
+        else:
+            delta['added'] = fetch_greenhouse_content(slug, delta['added'])
+            delta['changed'] = fetch_greenhouse_content(slug, delta['changed'])
+    return board, delta, len(items), None
+
+
+def sync_boards(boards, cursors, max_workers=ATS_POLL_WORKERS):
+    """Sync boards concurrently. Returns [(board, delta, listed, error)] in input order"""
+    if not boards:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(boards))) as pool:
+        return list(pool.map(lambda board: sync_board(board, cursors), boards))
+
+
+def delta_polled(synced):
+    """Added + changed postings in poll_boards' (board, items, error) shape for board_results"""
+    return [(board, delta['added'] + delta['changed'], error) for board, delta, _, error in synced]
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Browser Worker Pool
+- N browser workers (threads, one driver each) for the Selenium SERP scrapers
+- Queries are sharded round-robin across workers; every worker keeps its own pacing
+  controller, so one worker's block page backs off only that worker
+- Workers only collect raw result pages; filtering and global deduplication are
+  replayed afterwards in the original query order, so the output matches a single
+  driver's. A worker stops paging early only where that is exact: the scraper's
+  stop predicate replays its per-query filter. Where cross-query deduplication
+  decides (brave), workers read every page unless BROWSER_POOL_EARLY_STOP=1, which
+  trades identical output for fewer page loads
+"""
+
+import os
+import threading
+import time
+
+BROWSER_WORKERS = int(os.getenv('BROWSER_WORKERS', 1))          # 1 = single driver, in sequence
+BROWSER_HEADLESS = os.getenv('BROWSER_HEADLESS', '1') == '1'    # pool workers run headless
+BROWSER_POOL_EARLY_STOP = os.getenv('BROWSER_POOL_EARLY_STOP', '0') == '1'  # may diverge from a single driver
+
+
+def shard(tasks, workers):
+    """Round-robin shards so every worker gets a mix of categories/ATSs"""
+    return [tasks[i::workers] for i in range(workers)]
+
+
+def collect_pages(tasks, make_driver, iter_pages, make_pacing, selectors, workers=BROWSER_WORKERS, stop=None):
+    """
+    Fetch every query's result pages with a pool of drivers.
+    tasks: list of query strings. iter_pages(driver, query) yields pages; make_pacing(worker_id)
+    returns the worker's own PacingController, fed the page each query ends on (selectors are
+    the result containers). stop(pages) -> True once the filter would take no more pages.
+    Returns one (pages, error, signal) per task, in task order; signal is the pacing signal
+    ('ok', 'empty', 'slow', 'blocked'), None when the query was served from the response cache
+    """
+    workers = max(1, min(workers, len(tasks)))
+    indexed = list(enumerate(tasks))
+    results = [None] * len(tasks)
+    lock = threading.Lock()
+
+    def worker(worker_id, assigned):
+        try:
+            driver = make_driver()
+        except (Exception, SystemExit) as e:  # setup_brave_driver exits on failure
+            with lock:
+                for index, _ in assigned:
+                    results[index] = ([], f"worker {worker_id} failed to start: {e}", None)
+            return
+
+        pacing = make_pacing(worker_id)
+        signal = None
+        try:
+            for index, query in assigned:
+                if signal is not None:   # the previous query loaded pages (cache hits cost nothing)
+                    time.sleep(pacing.next_delay())
+
+                pages = []
+                error = None
+                try:
+                    for page in iter_pages(driver, query):
+                        pages.append(page)
+                        if stop is not None and stop(pages):
+                            break
+                except Exception as e:
+                    error = str(e)
+                signal = pacing.observe_query(driver, selectors)
+
+                with lock:
+                    results[index] = (pages, error, signal)
+                print(f"  [worker {worker_id}] {len(pages)} pages ({signal or 'cached'}): {query[:60]}")
+        finally:
+            driver.quit()
+
+    threads = [threading.Thread(target=worker, args=(worker_id, assigned), daemon=True)
+               for worker_id, assigned in enumerate(shard(indexed, workers), 1)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return results
+
+
+def replay(pages, error, select, max_results):
+    """
+    Run the scraper's page filter over pre-fetched pages exactly as the single driver would:
+    a fetch error only empties the result if the single driver would have reached it
+    (i.e. the filter still wanted another page)
+    """
+    jobs = select(pages)
+    if error and len(jobs) < max_results:
+        print(f"    Error: {error[:80]}")
+        return []
+    return jobs
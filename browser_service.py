@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Warm Browser Service
+- One long-lived headless browser (low-memory flags, remote debugging port) plus a
+  chromedriver server, started once: python browser_service.py start
+- Scrapers attach through a remote WebDriver session (BROWSER_SERVICE=1) instead of
+  cold-starting a browser per cron run; quitting the session leaves the browser up
+- Health-checked every BROWSER_SERVICE_CHECK_SECONDS and again before each attach;
+  a dead browser or chromedriver is restarted
+- Finds the browser binary on Linux as well as the macOS Brave app
+- python browser_service.py status | stop
+"""
+
+import argparse
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import time
+from urllib.request import urlopen
+
+from selenium import webdriver
+from selenium.webdriver.chromium.remote_connection import ChromiumRemoteConnection
+
+BROWSER_SERVICE = os.getenv('BROWSER_SERVICE', '0') == '1'                 # scrapers attach to the service
+BROWSER_SERVICE_FILE = os.getenv('BROWSER_SERVICE_FILE', 'browser_service.json')
+BROWSER_SERVICE_PORT = int(os.getenv('BROWSER_SERVICE_PORT', 9515))         # chromedriver
+BROWSER_DEBUG_PORT = int(os.getenv('BROWSER_DEBUG_PORT', 9222))             # browser DevTools
+BROWSER_SERVICE_CHECK_SECONDS = int(os.getenv('BROWSER_SERVICE_CHECK_SECONDS', 60))
+BROWSER_PROFILE_DIR = os.getenv('BROWSER_PROFILE_DIR', '.browser_service_profile')
+BROWSER_BINARY = os.getenv('BROWSER_BINARY', '')
+CHROMEDRIVER_PATH = os.getenv('CHROMEDRIVER_PATH', '')
+
+USER_AGENT = ('Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+
+# Brave first (what the scrapers were tuned on), then Chrome/Chromium
+BROWSER_PATHS = [
+    '/Applications/Brave Browser.app/Contents/MacOS/Brave Browser',
+    '/opt/brave.com/brave/brave',
+    '/usr/bin/brave-browser',
+    '/snap/bin/brave',
+    '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+    '/opt/google/chrome/chrome',
+    '/usr/bin/google-chrome',
+    '/usr/bin/chromium',
+    '/usr/bin/chromium-browser',
+    '/snap/bin/chromium',
+]
+BROWSER_COMMANDS = ['brave-browser', 'brave', 'google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser']
+
+LOW_MEMORY_ARGS = [
+    '--headless=new',
+    '--disable-gpu',
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-component-update',
+    '--disable-sync',
+    '--disable-default-apps',
+    '--disable-features=Translate,OptimizationHints,MediaRouter,AutofillServerCommunication',
+    '--renderer-process-limit=2',
+    '--js-flags=--max-old-space-size=256',
+    '--mute-audio',
+    '--no-first-run',
+    '--no-default-browser-check',
+    '--window-size=1280,900',
+    '--disable-blink-features=AutomationControlled',
+    f'--user-agent={USER_AGENT}',
+]
+
+HIDE_WEBDRIVER_JS = "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+
+
+def find_browser_binary():
+    """BROWSER_BINARY, else the first Brave/Chrome/Chromium install found (macOS or Linux)"""
+    if BROWSER_BINARY:
+        return BROWSER_BINARY if os.path.exists(BROWSER_BINARY) else None
+    for path in BROWSER_PATHS:
+        if os.path.exists(path):
+            return path
+    for command in BROWSER_COMMANDS:
+        path = shutil.which(command)
+        if path:
+            return path
+    return None
+
+
+def find_chromedriver():
+    if CHROMEDRIVER_PATH:
+        return CHROMEDRIVER_PATH if os.path.exists(CHROMEDRIVER_PATH) else None
+    return shutil.which('chromedriver')
+
+
+def _get_json(url, timeout=3):
+    with urlopen(url, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def load_state(path=BROWSER_SERVICE_FILE):
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            return json.load(f)
+    return None
+
+
+def save_state(state, path=BROWSER_SERVICE_FILE):
+    with open(path, 'w') as f:
+        json.dump(state, f, indent=2)
+
+
+def health(state):
+    """{'browser': bool, 'driver': bool} - both must answer for a session to attach"""
+    status = {'browser': False, 'driver': False}
+    try:
+        status['browser'] = 'Browser' in _get_json(f"http://{state['debugger']}/json/version")
+    except Exception:
+        pass
+    try:
+        status['driver'] = bool(_get_json(f"{state['executor']}/status")['value'].get('ready'))
+    except Exception:
+        pass
+    return status
+
+
+class ServiceDriver(webdriver.Remote):
+    """Remote session on the service's chromedriver; keeps execute_cdp_cmd like webdriver.Chrome"""
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        return self.execute('executeCdpCommand', {'cmd': cmd, 'params': cmd_args})['value']
+
+
+def _close_stale_tabs(state):
+    """Leave one tab open: a previous run may have crashed with tabs still loading"""
+    try:
+        tabs = [t for t in _get_json(f"http://{state['debugger']}/json/list") if t.get('type') == 'page']
+        for tab in tabs[1:]:
+            urlopen(f"http://{state['debugger']}/json/close/{tab['id']}", timeout=3).close()
+    except Exception:
+        pass
+
+
+def attach_driver():
+    """
+    Session on the warm browser, or None if the service isn't running/healthy
+    (callers fall back to starting their own browser)
+    """
+    state = load_state()
+    if state is None:
+        return None
+    if not all(health(state).values()):
+        print("Browser service not healthy - starting a local browser instead")
+        return None
+
+    _close_stale_tabs(state)
+
+    options = webdriver.ChromeOptions()
+    options.debugger_address = state['debugger']
+    executor = ChromiumRemoteConnection(remote_server_addr=state['executor'], vendor_prefix='goog',
+                                        browser_name='chrome')
+    driver = ServiceDriver(command_executor=executor, options=options)
+
+    # Fresh identity per run, like the incognito local browser
+    driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': HIDE_WEBDRIVER_JS})
+    print(f"Attached to warm browser service ({state['browser_binary']})")
+    return driver
+
+
+def _start_browser(binary):
+    args = [binary, f'--remote-debugging-port={BROWSER_DEBUG_PORT}',
+            f'--user-data-dir={os.path.abspath(BROWSER_PROFILE_DIR)}'] + LOW_MEMORY_ARGS + ['about:blank']
+    return subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _start_chromedriver(path):
+    return subprocess.Popen([path, f'--port={BROWSER_SERVICE_PORT}'],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _wait_healthy(state, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if all(health(state).values()):
+            return True
+        time.sleep(0.5)
+    return False
+
+
+def serve():
+    """Start browser + chromedriver, then health-check them until stopped"""
+    binary = find_browser_binary()
+    chromedriver = find_chromedriver()
+    if binary is None:
+        print("ERROR: no Brave/Chrome/Chromium binary found (set BROWSER_BINARY)")
+        sys.exit(1)
+    if chromedriver is None:
+        print("ERROR: chromedriver not found (set CHROMEDRIVER_PATH or put it on PATH)")
+        sys.exit(1)
+
+    browser = _start_browser(binary)
+    driver = _start_chromedriver(chromedriver)
+    state = {
+        'executor': f"http://127.0.0.1:{BROWSER_SERVICE_PORT}",
+        'debugger': f"127.0.0.1:{BROWSER_DEBUG_PORT}",
+        'browser_binary': binary,
+        'service_pid': os.getpid(),
+        'started_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'restarts': 0,
+    }
+    save_state(state)
+
+    def shutdown(*_, code=0):
+        for process in (driver, browser):
+            process.terminate()
+        if os.path.exists(BROWSER_SERVICE_FILE):
+            os.remove(BROWSER_SERVICE_FILE)
+        sys.exit(code)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    if not _wait_healthy(state):
+        print(f"ERROR: service did not come up: {health(state)}")
+        shutdown(code=1)
+    print(f"Browser service up: {binary} | webdriver {state['executor']} | devtools {state['debugger']}")
+
+    while True:
+        time.sleep(BROWSER_SERVICE_CHECK_SECONDS)
+        status = health(state)
+        if not status['browser']:
+            print("Browser unresponsive - restarting")
+            browser.kill()
+            browser.wait()
+            browser = _start_browser(binary)
+            state['restarts'] += 1
+        if not status['driver']:
+            print("chromedriver unresponsive - restarting")
+            driver.kill()
+            driver.wait()
+            driver = _start_chromedriver(chromedriver)
+            state['restarts'] += 1
+        if not all(status.values()):
+            save_state(state)
+            _wait_healthy(state)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-lived browser for the Selenium scrapers")
+    parser.add_argument('command', choices=['start', 'status', 'stop'])
+    args = parser.parse_args()
+
+    if args.command == 'start':
+        serve()
+        return
+
+    state = load_state()
+    if state is None:
+        print("Browser service not running")
+        sys.exit(1)
+
+    if args.command == 'status':
+        status = health(state)
+        print(f"browser {'ok' if status['browser'] else 'DOWN'} | chromedriver {'ok' if status['driver'] else 'DOWN'} | "
+              f"up since {state['started_at']} | {state['restarts']} restarts | {state['browser_binary']}")
+        sys.exit(0 if all(status.values()) else 1)
+
+    try:
+        os.kill(state['service_pid'], signal.SIGTERM)
+        print("Browser service stopped")
+    except ProcessLookupError:
+        os.remove(BROWSER_SERVICE_FILE)
+        print("Browser service was not running (removed stale state)")
+
+
+if __name__ == "__main__":
+    main()
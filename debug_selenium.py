@@ -3,10 +3,10 @@
 Debug version - See what Selenium is actually seeing
 """
 
-import time
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
+from page_ready import wait_for_results, wait_for_network_idle, print_wait_stats
 
 
 def setup_driver():
@@ -33,8 +33,9 @@ def test_search():
     print(f"Opening: {search_url}\n")
     driver.get(search_url)
 
-    print("Waiting 5 seconds for page to load...")
-    time.sleep(5)
+    print("Waiting for results to load...")
+    wait_for_results(driver, ('div.g', '#search a'))
+    wait_for_network_idle(driver)
 
     # Save screenshot
     driver.save_screenshot("google_search_debug.png")
@@ -75,6 +76,7 @@ def test_search():
     print("\n--- Page Title ---")
     print(driver.title)
 
+    print_wait_stats()
     input("\nPress Enter to close browser...")
     driver.quit()
 
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Conditional Detail Fetcher
+- Stores ETag / Last-Modified per job URL and sends conditional GETs
+- 304 Not Modified: reuse the stored parse, no body download
+- 200 with an unchanged body (sha256 match): reuse the stored parse, skip re-parsing
+- Only new or changed pages are handed to the parser
+- Other statuses (403, 202, ...) are still parsed, as before, but never cached
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from http_transport import http_get
+
+DETAIL_CACHE_FILE = os.getenv('DETAIL_CACHE_FILE', 'detail_cache.db')
+
+
+class DetailFetcher:
+    """Conditional GET + content-hash layer in front of a page parser"""
+
+    def __init__(self, path=DETAIL_CACHE_FILE):
+        self.path = path
+        self.stats = {'fetched': 0, 'not_modified': 0, 'unchanged': 0, 'parsed': 0, 'errors': 0}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS details (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body_hash TEXT,
+                parsed TEXT,
+                fetched_at REAL,
+                checked_at REAL
+            )
+        ''')
+        self._conn.commit()
+
+    def _lookup(self, url):
+        with self._lock:
+            return self._conn.execute(
+                'SELECT etag, last_modified, body_hash, parsed FROM details WHERE url = ?',
+                (url,)).fetchone()
+
+    def _touch(self, url, etag, last_modified):
+        with self._lock:
+            self._conn.execute(
+                'UPDATE details SET etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified), '
+                'checked_at = ? WHERE url = ?', (etag, last_modified, time.time(), url))
+            self._conn.commit()
+
+    def _store(self, url, etag, last_modified, body_hash, parsed):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO details VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (url, etag, last_modified, body_hash, json.dumps(parsed), now, now))
+            self._conn.commit()
+
+    def fetch(self, url, parse, headers=None, timeout=10):
+        """
+        Return parse(url, html) for the page, reusing the stored result when the server
+        answers 304 or the body hash is unchanged. parse() returning None, and any
+        non-200 response, is not cached.
+        """
+        row = self._lookup(url)
+        request_headers = dict(headers or {})
+        if row is not None:
+            etag, last_modified, _, _ = row
+            if etag:
+                request_headers['If-None-Match'] = etag
+            if last_modified:
+                request_headers['If-Modified-Since'] = last_modified
+
+        response = http_get(url, headers=request_headers, timeout=timeout)
+        self.stats['fetched'] += 1
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+
+        if response.status_code == 304 and row is not None:
+            self.stats['not_modified'] += 1
+            self._touch(url, etag, last_modified)
+            return json.loads(row[3])
+
+        if response.status_code != 200:
+            # A 403/202 body can still carry the posting, but its validators and hash
+            # belong to a block or placeholder page: parse it, don't cache it
+            self.stats['errors'] += 1
+            return parse(url, response.text) if response.content else None
+
+        body_hash = hashlib.sha256(response.content).hexdigest()
+        if row is not None and row[2] == body_hash:
+            self.stats['unchanged'] += 1
+            self._touch(url, etag, last_modified)
+            return json.loads(row[3])
+
+        parsed = parse(url, response.text)
+        self.stats['parsed'] += 1
+        if parsed is not None:
+            self._store(url, etag, last_modified, body_hash, parsed)
+        return parsed
+
+    def summary(self):
+        skipped = self.stats['not_modified'] + self.stats['unchanged']
+        return (f"Detail fetcher: {self.stats['fetched']} fetched, {self.stats['not_modified']} not modified (304), "
+                f"{self.stats['unchanged']} unchanged (hash), {self.stats['parsed']} parsed "
+                f"({skipped} parses skipped)")
+
+
+_fetcher = None
+
+
+def get_detail_fetcher():
+    """Process-wide fetcher (opened on first use)"""
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = DetailFetcher()
+    return _fetcher
+
+
+def print_detail_stats():
+    """Print 304/hash-skip counts if the fetcher was used this run"""
+    if _fetcher is not None:
+        print(_fetcher.summary())
@@ -2,8 +2,10 @@
 """
 GMP Job Scraper - DIAGNOSTIC VERSION
 Takes screenshots and tries all possible selectors to debug extraction
+Saved pages can be re-checked offline: python diagnose_brave.py debug_screenshots/*.html
 """
 
+import sys
 import time
 import os
 from datetime import datetime
@@ -11,6 +13,8 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.options import Options
+from serp_parser import SELECTOR_CHAIN, selector_report
+from page_ready import wait_for_search_box, wait_for_results, wait_for_network_idle, print_wait_stats
 
 # Configuration
 SCREENSHOT_DIR = 'debug_screenshots'
@@ -42,13 +46,14 @@ def test_google_selectors(driver, query):
 
     # Navigate and search
     driver.get("https://www.google.com")
-    time.sleep(2)
+    wait_for_search_box(driver)
 
     search_box = driver.find_element(By.NAME, "q")
     search_box.clear()
     search_box.send_keys(query)
     search_box.send_keys(Keys.RETURN)
-    time.sleep(5)  # Wait for results
+    wait_for_results(driver)
+    wait_for_network_idle(driver)  # let late images/widgets render before the screenshot
 
     # Take screenshot
     timestamp = datetime.now().strftime('%H%M%S')
@@ -56,55 +61,46 @@ def test_google_selectors(driver, query):
     driver.save_screenshot(screenshot_file)
     print(f"\nScreenshot saved: {screenshot_file}")
 
-    # Test different selectors
-    selectors = [
-        ('div.g', 'Standard Google result container'),
-        ('div[data-sokoban-container]', 'Sokoban container'),
-        ('div.Gx5Zad', 'Alternative container'),
-        ('div#search div', 'All divs in search area'),
-        ('div#rso div', 'RSO container divs'),
-        ('div#search a', 'All links in search'),
-        ('[data-ved]', 'Data-ved attribute'),
-        ('div.yuRUbf', 'yuRUbf container'),
-    ]
-
-    print("\nTesting selectors:")
-    print("-" * 70)
-
-    for selector, description in selectors:
-        try:
-            elements = driver.find_elements(By.CSS_SELECTOR, selector)
-            count = len(elements)
-            print(f"{selector:30s} → {count:3d} elements  ({description})")
+    # Save the page so selectors can be re-checked offline: python diagnose_brave.py <file>.html
+    html_file = f"{SCREENSHOT_DIR}/google_results_{timestamp}.html"
+    with open(html_file, 'w', encoding='utf-8') as f:
+        f.write(driver.page_source)
+    print(f"Page source saved: {html_file}")
 
-            if count > 0 and count < 100:  # Show sample
-                first_elem = elements[0]
-                sample_text = first_elem.text[:80].replace('\n', ' ') if first_elem.text else "[no text]"
-                print(f"  Sample: {sample_text}")
+    diagnose_html(driver.page_source)
 
-                # Try to find h3 and link in first element
-                try:
-                    h3 = first_elem.find_element(By.CSS_SELECTOR, 'h3')
-                    print(f"  ✓ Has h3: {h3.text[:50]}")
-                except:
-                    print(f"  ✗ No h3 found")
 
-                try:
-                    a = first_elem.find_element(By.CSS_SELECTOR, 'a')
-                    url = a.get_attribute('href')
-                    print(f"  ✓ Has link: {url[:60]}")
-                except:
-                    print(f"  ✗ No link found")
-
-                print()
+def diagnose_html(page_source):
+    """Run the selector chain and text checks against page HTML (live or saved)"""
+    print("\nTesting selectors:")
+    print("-" * 70)
 
-        except Exception as e:
-            print(f"{selector:30s} → ERROR: {str(e)[:40]}")
+    descriptions = {
+        'div.tF2Cxc': 'Current result container',
+        'div.g': 'Standard Google result container',
+        'div[data-sokoban-container]': 'Sokoban container',
+        'div.Gx5Zad': 'Alternative container',
+        'div.yuRUbf': 'yuRUbf container',
+        'div#rso div': 'RSO container divs',
+        'div#search div': 'All divs in search area',
+        'div#search a': 'All links in search',
+        '[data-ved]': 'Data-ved attribute',
+    }
+
+    for selector, count, sample in selector_report(page_source, SELECTOR_CHAIN):
+        print(f"{selector:30s} → {count:3d} elements  ({descriptions.get(selector, '')})")
+
+        if count > 0:
+            if sample:
+                print(f"  ✓ Has h3: {sample['title'][:50]}")
+                print(f"  ✓ Has link: {sample['url'][:60]}")
+            else:
+                print(f"  ✗ No element with both h3 and link")
+            print()
 
     # Check page source for common text
     print("\nPage source check:")
     print("-" * 70)
-    page_source = driver.page_source
 
     checks = [
         ('div class="g"', 'Standard result class'),
@@ -132,6 +128,15 @@ def main():
     print("GOOGLE SEARCH EXTRACTION DIAGNOSTIC")
     print("=" * 70)
 
+    # Offline: re-check saved pages without a browser or new searches
+    saved_pages = sys.argv[1:]
+    if saved_pages:
+        for path in saved_pages:
+            print(f"\nSAVED PAGE: {path}")
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                diagnose_html(f.read())
+        return
+
     driver = setup_brave_driver()
     print("Browser ready!")
 
@@ -146,6 +151,7 @@ def main():
             test_google_selectors(driver, query)
             time.sleep(3)
 
+        print_wait_stats()
         input("\nPress Enter to close browser and exit...")
 
     finally:
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Parquet Job History
+- Every run's jobs are appended to a columnar dataset next to the CSVs:
+  history/date=YYYY-MM-DD/category=<role pack or category>/<source>-<time>-<id>.parquet
+- A query lists only the date=/category= directories it needs and reads only the
+  columns it needs, so "top fit jobs last 7 days" doesn't touch the rest of the year
+- company/ats/location/role_category/status/source are dictionary-encoded: a few
+  hundred distinct values repeated over every row
+- One file per partition per write; daemon visits leave many small files, which
+  `compact` merges into one file per partition
+- pyarrow is optional: without it the history sink is off and the CSVs are unchanged
+- python history_store.py top --days 7
+"""
+
+import argparse
+import csv
+import os
+import random
+import re
+import shutil
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from job_identity import extract_job_id
+
+HISTORY_STORE = os.getenv('HISTORY_STORE', '1') == '1'
+HISTORY_DIR = os.getenv('HISTORY_DIR', 'history')
+HISTORY_COMPRESSION = os.getenv('HISTORY_COMPRESSION', 'zstd')
+
+DICTIONARY_COLUMNS = ['source', 'company', 'location', 'ats', 'role_category', 'status']
+TEXT_COLUMNS = ['title', 'company', 'location', 'ats', 'role_category', 'status', 'url',
+                'keywords_matched', 'fit_reasons', 'snippet']
+TOP_COLUMNS = ['date_found', 'fit_score', 'title', 'company', 'ats', 'location', 'url', 'job_id', 'category']
+DATE_FORMATS = ('%Y-%m-%d %H:%M', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d')
+PARTITION_UNSAFE = re.compile(r'[^a-z0-9]+')
+CATEGORY_CSV = re.compile(r'^(.+)_(\d{4}-\d{2}-\d{2})$')   # brave/gmp: <category>_<date>.csv
+
+if pa is not None:
+    _DICTIONARY = pa.dictionary(pa.int32(), pa.string())
+    SCHEMA = pa.schema([
+        ('date_found', pa.timestamp('s')),
+        ('source', _DICTIONARY),
+        ('job_id', pa.string()),
+        ('fit_score', pa.int16()),
+        ('title', pa.string()),
+        ('company', _DICTIONARY),
+        ('location', _DICTIONARY),
+        ('ats', _DICTIONARY),
+        ('role_category', _DICTIONARY),
+        ('status', _DICTIONARY),
+        ('url', pa.string()),
+        ('keywords_matched', pa.string()),
+        ('fit_reasons', pa.string()),
+        ('snippet', pa.string()),
+    ])
+    PARTITIONING = ds.partitioning(pa.schema([('date', pa.string()), ('category', pa.string())]), flavor='hive')
+
+
+def partition_value(value):
+    """Directory-safe partition value ("AI/ML Engineer" -> ai_ml_engineer)"""
+    return PARTITION_UNSAFE.sub('_', str(value or '').lower()).strip('_') or 'uncategorized'
+
+
+def _parse_date(value):
+    if isinstance(value, datetime):
+        return value
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def _fit_score(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _text(value):
+    return str(value) if value not in (None, '') else None
+
+
+def to_table(jobs, source):
+    """Arrow table in the history schema from the scrapers' job dicts (any subset of the columns)"""
+    columns = {
+        'date_found': [_parse_date(job.get('date_found')) for job in jobs],
+        'source': [source] * len(jobs),
+        'job_id': [job.get('job_id') or extract_job_id(job.get('url')) for job in jobs],
+        'fit_score': [_fit_score(job.get('fit_score')) for job in jobs],
+    }
+    for name in TEXT_COLUMNS:
+        columns[name] = [_text(job.get(name)) for job in jobs]
+    return pa.table({name: pa.array(columns[name], type=SCHEMA.field(name).type) for name in SCHEMA.names},
+                    schema=SCHEMA)
+
+
+def _write_table(table, path):
+    """Write via a temp file so readers never see a partial file (they only list *.parquet)"""
+    tmp_path = path + '.tmp'
+    pq.write_table(table, tmp_path, compression=HISTORY_COMPRESSION, use_dictionary=DICTIONARY_COLUMNS,
+                   write_statistics=['date_found', 'fit_score'])
+    os.replace(tmp_path, path)
+
+
+def write_jobs(jobs, source, category=None, root=HISTORY_DIR):
+    """Append jobs as one Parquet file per (date, category) partition. Returns the files written"""
+    partitions = {}
+    for job in jobs:
+        found = _parse_date(job.get('date_found')) or datetime.now()
+        key = (found.strftime('%Y-%m-%d'),
+               partition_value(category or job.get('role_pack') or job.get('role_category')))
+        partitions.setdefault(key, []).append(job)
+
+    stamp = datetime.now().strftime('%H%M%S')
+    written = []
+    for (day, category_value), rows in sorted(partitions.items()):
+        directory = os.path.join(root, f"date={day}", f"category={category_value}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{source}-{stamp}-{uuid.uuid4().hex[:8]}.parquet")
+        _write_table(to_table(rows, source), path)
+        written.append(path)
+    return written
+
+
+def partition_files(root=HISTORY_DIR, since=None, categories=None):
+    """Parquet files in partitions that can hold matching rows (pruned by directory name, no file opened)"""
+    if not os.path.isdir(root):
+        return []
+    wanted = {partition_value(c) for c in categories} if categories else None
+    files = []
+    for date_dir in sorted(os.listdir(root)):
+        if not date_dir.startswith('date=') or (since and date_dir[5:] < since):
+            continue
+        for category_dir in os.listdir(os.path.join(root, date_dir)):
+            if wanted is not None and category_dir[len('category='):] not in wanted:
+                continue
+            directory = os.path.join(root, date_dir, category_dir)
+            files.extend(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.parquet'))
+    return files
+
+
+def open_dataset(files, root=HISTORY_DIR):
+    return ds.dataset(files, schema=SCHEMA.append(pa.field('date', pa.string())).append(
+        pa.field('category', pa.string())), format='parquet', partitioning=PARTITIONING, partition_base_dir=root)
+
+
+def top_jobs(days=7, limit=20, categories=None, min_fit=None, root=HISTORY_DIR):
+    """Best-scored jobs found in the last `days` days, one row per job ID"""
+    cutoff = datetime.now() - timedelta(days=days)
+    files = partition_files(root, cutoff.strftime('%Y-%m-%d'), categories)
+    if not files:
+        return []
+    condition = (ds.field('date_found') >= pa.scalar(cutoff, pa.timestamp('s'))) & ds.field('fit_score').is_valid()
+    if min_fit is not None:
+        condition &= ds.field('fit_score') >= min_fit
+    table = open_dataset(files, root).to_table(columns=TOP_COLUMNS, filter=condition)
+    table = table.sort_by([('fit_score', 'descending'), ('date_found', 'descending')])
+
+    # The same job can be recorded by several scrapers/runs: keep its best row
+    picked, seen = [], set()
+    for i, job_id in enumerate(table.column('job_id').to_pylist()):
+        if job_id not in seen:
+            seen.add(job_id)
+            picked.append(i)
+            if len(picked) == limit:
+                break
+    return table.take(picked).to_pylist()
+
+
+def compact(root=HISTORY_DIR, before=None):
+    """Merge each partition's files into one (partitions dated before `before`, default today)"""
+    before = before or datetime.now().strftime('%Y-%m-%d')
+    merged = removed = 0
+    for date_dir in sorted(os.listdir(root)) if os.path.isdir(root) else []:
+        if not date_dir.startswith('date=') or date_dir[5:] >= before:
+            continue
+        for category_dir in os.listdir(os.path.join(root, date_dir)):
+            directory = os.path.join(root, date_dir, category_dir)
+            files = sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.parquet'))
+            if len(files) < 2:
+                continue
+            table = pa.concat_tables(pq.read_table(path, schema=SCHEMA) for path in files)
+            _write_table(table.sort_by([('date_found', 'ascending')]),
+                         os.path.join(directory, f"compacted-{uuid.uuid4().hex[:8]}.parquet"))
+            for path in files:     # only what was merged: files written meanwhile stay
+                os.remove(path)
+            merged += 1
+            removed += len(files)
+    return merged, removed
+
+
+def import_csv(paths, root=HISTORY_DIR):
+    """Backfill from the scrapers' CSVs. brave/gmp <category>_<date>.csv take the category from the name"""
+    total = 0
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        match = CATEGORY_CSV.match(stem)
+        category, source = (match.group(1), os.path.basename(os.path.dirname(os.path.abspath(path)))) if match \
+            else (None, stem)
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        if rows:
+            write_jobs(rows, source, category, root)
+        print(f"  {path}: {len(rows)} rows")
+        total += len(rows)
+    return total
+
+
+def stats(root=HISTORY_DIR):
+    """(days, partitions, files, rows, bytes); row counts come from the file footers"""
+    days = partitions = files = rows = size = 0
+    for date_dir in sorted(os.listdir(root)) if os.path.isdir(root) else []:
+        if not date_dir.startswith('date='):
+            continue
+        days += 1
+        for category_dir in os.listdir(os.path.join(root, date_dir)):
+            partitions += 1
+            directory = os.path.join(root, date_dir, category_dir)
+            for name in os.listdir(directory):
+                if name.endswith('.parquet'):
+                    path = os.path.join(directory, name)
+                    files += 1
+                    rows += pq.ParquetFile(path).metadata.num_rows
+                    size += os.path.getsize(path)
+    return days, partitions, files, rows, size
+
+
+_written = {'rows': 0, 'files': 0}
+_warned = False
+
+
+def append_history(jobs, source, category=None):
+    """Record jobs in the Parquet history (no-op when HISTORY_STORE is off or pyarrow isn't installed)"""
+    global _warned
+    if not jobs or not HISTORY_STORE:
+        return []
+    if pa is None:
+        if not _warned:
+            print("History store off: pip install pyarrow (or HISTORY_STORE=0)")
+            _warned = True
+        return []
+    files = write_jobs(jobs, source, category)
+    _written['rows'] += len(jobs)
+    _written['files'] += len(files)
+    return files
+
+
+def print_history_stats():
+    if _written['rows']:
+        print(f"History: {_written['rows']} jobs → {HISTORY_DIR}/ ({_written['files']} Parquet files)")
+
+
+def print_top(rows):
+    for row in rows:
+        print(f"  {row['fit_score']:>3}  {row['date_found']:%Y-%m-%d}  {(row['title'] or '')[:50]:<50}  "
+              f"{(row['company'] or '')[:20]:<20}  {row['category']}")
+        print(f"       {row['url']}")
+
+
+def synthetic_history(root, days, jobs_per_day, runs_per_day, seed=0):
+    """A generated history: `days` days back from today, each day's jobs split over `runs_per_day` runs"""
+    rng = random.Random(seed)
+    categories = ['llm_genai_engineer', 'ml_engineer', 'applied_scientist', 'ai_ml_engineer', 'mlops_engineer',
+                  'data_scientist', 'research_engineer', 'computer_vision']
+    companies = [f"Company {n}" for n in range(800)]
+    locations = ['New York, NY', 'San Francisco, CA', 'Seattle, WA', 'Remote', 'Austin, TX', 'Boston, MA']
+    ats = ['Greenhouse', 'Ashby', 'Lever', 'Workday']
+    now = datetime.now()
+    job_number = 0
+    for day in range(days):
+        date = now - timedelta(days=day)
+        for run in range(runs_per_day):
+            jobs = []
+            for _ in range(jobs_per_day // runs_per_day):
+                job_number += 1
+                jobs.append({
+                    'date_found': (date.replace(hour=6, minute=0) + timedelta(hours=run * 4)).strftime('%Y-%m-%d %H:%M'),
+                    'fit_score': rng.randint(35, 100), 'title': f"Machine Learning Engineer {job_number % 97}",
+                    'company': rng.choice(companies), 'location': rng.choice(locations), 'ats': rng.choice(ats),
+                    'role_pack': rng.choice(categories), 'status': 'Not Applied',
+                    'url': f"https://boards.greenhouse.io/company/jobs/{job_number}",
+                    'keywords_matched': 'pytorch, llm, rag', 'fit_reasons': 'ML title, LLM keywords',
+                    'snippet': "We are hiring an engineer to build and ship ML systems. " * 3,
+                })
+            write_jobs(jobs, 'bench', root=root)
+
+
+def benchmark(days, jobs_per_day, runs_per_day):
+    root = tempfile.mkdtemp(prefix='history-bench-')
+    try:
+        start = time.perf_counter()
+        synthetic_history(root, days, jobs_per_day, runs_per_day)
+        build_seconds = time.perf_counter() - start
+        _, partitions, files, rows, size = stats(root)
+        print(f"{days} days, {rows:,} jobs: {partitions:,} partitions, {files:,} files, {size / 1e6:.1f} MB "
+              f"(written in {build_seconds:.1f}s)")
+
+        csv_path = os.path.join(root, 'all.csv')
+        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+            table = open_dataset(partition_files(root), root).to_table()
+            writer = csv.DictWriter(f, fieldnames=[name for name in table.column_names if name not in ('date', 'category')])
+            writer.writeheader()
+            for row in table.drop_columns(['date', 'category']).to_pylist():
+                writer.writerow(row)
+        start = time.perf_counter()
+        cutoff = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d %H:%M:%S')
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            recent = [row for row in csv.DictReader(f) if row['date_found'] >= cutoff]
+        sorted(recent, key=lambda row: int(row['fit_score']), reverse=True)[:20]
+        print(f"  CSV scan, top 20 last 7 days:      {(time.perf_counter() - start) * 1000:8.1f} ms "
+              f"({os.path.getsize(csv_path) / 1e6:.0f} MB)")
+        os.remove(csv_path)
+
+        start = time.perf_counter()
+        top = top_jobs(7, 20, root=root)
+        print(f"  Parquet, top 20 last 7 days:       {(time.perf_counter() - start) * 1000:8.1f} ms ({len(top)} rows)")
+
+        compact(root, before=(datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d'))
+        _, _, files, _, size = stats(root)
+        start = time.perf_counter()
+        top = top_jobs(7, 20, root=root)
+        print(f"  Parquet compacted, same query:     {(time.perf_counter() - start) * 1000:8.1f} ms "
+              f"({files:,} files, {size / 1e6:.1f} MB)")
+    finally:
+        shutil.rmtree(root)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parquet job history")
+    parser.add_argument('--dir', default=HISTORY_DIR)
+    sub = parser.add_subparsers(dest='command', required=True)
+    top = sub.add_parser('top', help="best-scored jobs of the last N days")
+    top.add_argument('--days', type=float, default=7)
+    top.add_argument('--limit', type=int, default=20)
+    top.add_argument('--category', nargs='+')
+    top.add_argument('--min-fit', type=int)
+    sub.add_parser('stats', help="days, partitions, files and rows")
+    compact_parser = sub.add_parser('compact', help="merge each partition's files (days before today)")
+    compact_parser.add_argument('--before', help="YYYY-MM-DD (default: today)")
+    sub.add_parser('import', help="backfill from scraper CSVs").add_argument('csvs', nargs='+')
+    bench = sub.add_parser('bench', help="top query over a generated history")
+    bench.add_argument('--days', type=int, default=365)
+    bench.add_argument('--jobs-per-day', type=int, default=400)
+    bench.add_argument('--runs-per-day', type=int, default=4)
+    args = parser.parse_args()
+
+    if pa is None:
+        parser.exit(1, "pyarrow is not installed: pip install pyarrow\n")
+    if args.command == 'top':
+        start = time.perf_counter()
+        rows = top_jobs(args.days, args.limit, args.category, args.min_fit, args.dir)
+        print(f"Top {len(rows)} jobs, last {args.days:g} days ({(time.perf_counter() - start) * 1000:.0f} ms):")
+        print_top(rows)
+    elif args.command == 'stats':
+        days, partitions, files, rows, size = stats(args.dir)
+        print(f"{args.dir}: {rows:,} jobs over {days} days, {partitions} partitions, {files} files, {size / 1e6:.1f} MB")
+    elif args.command == 'compact':
+        merged, removed = compact(args.dir, args.before)
+        print(f"Compacted {merged} partitions ({removed} files merged)")
+    elif args.command == 'import':
+        print(f"Imported {import_csv(args.csvs, args.dir)} rows into {args.dir}/")
+    else:
+        benchmark(args.days, args.jobs_per_day, args.runs_per_day)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP Transport
+- One pooled requests.Session shared by every scraper
+- Keep-alive connection pools per host with a per-host connection cap
+- gzip/deflate (plus br/zstd when available) negotiation on every request
+- In-process DNS cache with TTL
+- Connection stats: opened vs reused, so handshake savings are visible
+"""
+
+import os
+import socket
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.request import ACCEPT_ENCODING
+
+POOL_HOSTS = int(os.getenv('HTTP_POOL_HOSTS', 32))
+MAX_CONNECTIONS_PER_HOST = int(os.getenv('HTTP_MAX_CONNECTIONS_PER_HOST', 8))
+DNS_CACHE_TTL = int(os.getenv('DNS_CACHE_TTL', 300))
+DEFAULT_TIMEOUT = 10
+
+_stats_lock = threading.Lock()
+_connections_opened = Counter()
+_requests_sent = Counter()
+_dns_stats = Counter()
+
+_session = None
+_session_lock = threading.Lock()
+
+_dns_cache = {}
+_original_getaddrinfo = socket.getaddrinfo
+
+
+def _cached_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+    """socket.getaddrinfo with a TTL cache in front of it"""
+    key = (host, port, family, type, proto, flags)
+    now = time.monotonic()
+
+    entry = _dns_cache.get(key)
+    if entry and entry[0] > now:
+        with _stats_lock:
+            _dns_stats['hits'] += 1
+        return entry[1]
+
+    result = _original_getaddrinfo(host, port, family, type, proto, flags)
+    _dns_cache[key] = (now + DNS_CACHE_TTL, result)
+    with _stats_lock:
+        _dns_stats['misses'] += 1
+    return result
+
+
+def install_dns_cache():
+    """Route hostname lookups through the TTL cache (idempotent)"""
+    if DNS_CACHE_TTL > 0 and socket.getaddrinfo is not _cached_getaddrinfo:
+        socket.getaddrinfo = _cached_getaddrinfo
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        with _stats_lock:
+            _connections_opened[self.host] += 1
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        with _stats_lock:
+            _connections_opened[self.host] += 1
+        return super()._new_conn()
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools count every new TCP/TLS connection they open"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _CountingHTTPConnectionPool,
+            'https': _CountingHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        host = urlparse(request.url).hostname or ''
+        with _stats_lock:
+            _requests_sent[host] += 1
+        return super().send(request, **kwargs)
+
+
+def get_session():
+    """Return the process-wide pooled session (created on first use)"""
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                install_dns_cache()
+
+                session = requests.Session()
+                # pool_block=True turns pool_maxsize into a hard per-host connection cap
+                adapter = PooledAdapter(pool_connections=POOL_HOSTS,
+                                        pool_maxsize=MAX_CONNECTIONS_PER_HOST,
+                                        pool_block=True)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+                session.headers['Connection'] = 'keep-alive'
+                _session = session
+
+    return _session
+
+
+def http_get(url, **kwargs):
+    """GET through the shared pool (drop-in for requests.get)"""
+    kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+    return get_session().get(url, **kwargs)
+
+
+def http_post(url, **kwargs):
+    """POST through the shared pool (drop-in for requests.post)"""
+    kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+    return get_session().post(url, **kwargs)
+
+
+def transport_stats():
+    """Snapshot of connection reuse and DNS cache counters"""
+    with _stats_lock:
+        opened = sum(_connections_opened.values())
+        sent = sum(_requests_sent.values())
+        per_host = {
+            host: {'requests': _requests_sent[host], 'opened': _connections_opened[host],
+                   'reused': max(_requests_sent[host] - _connections_opened[host], 0)}
+            for host in _requests_sent
+        }
+        return {
+            'requests': sent,
+            'connections_opened': opened,
+            'connections_reused': max(sent - opened, 0),
+            'dns_hits': _dns_stats['hits'],
+            'dns_misses': _dns_stats['misses'],
+            'per_host': per_host,
+        }
+
+
+def print_transport_stats():
+    """Print the connection reuse summary (for the end-of-run report)"""
+    stats = transport_stats()
+    if not stats['requests']:
+        return
+
+    print(f"HTTP: {stats['requests']} requests, {stats['connections_opened']} connections opened, "
+          f"{stats['connections_reused']} reused")
+    print(f"DNS cache: {stats['dns_hits']} hits, {stats['dns_misses']} misses")
+    for host, host_stats in sorted(stats['per_host'].items(), key=lambda kv: -kv[1]['requests']):
+        print(f"  {host}: {host_stats['requests']} req / {host_stats['opened']} opened / "
+              f"{host_stats['reused']} reused")
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Job Identity Resolver
+- One place for what the scrapers each did their own way: canonical job ID,
+  canonical URL, company and ATS for a job URL
+- The URL is parsed once; the host is dispatched through a hostname-suffix table
+  to a per-ATS extractor with precompiled patterns (no chain of substring checks)
+- One tracking-parameter list for every scraper, so dedup keys agree between
+  scripts. gh_jid is an ID, not tracking: it resolves to greenhouse_<id>
+- IDs keep their existing formats (greenhouse_N, ashby_<uuid>, lever_<id>,
+  workday_<req>, icims_N); other URLs are identified by their canonical URL
+- Results are LRU-cached: the same URLs recur across queries, pages and runs
+- python job_identity.py bench [--urls 100000]
+"""
+
+import argparse
+import os
+import random
+import re
+import time
+from collections import namedtuple
+from functools import lru_cache
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+JOB_IDENTITY_CACHE = int(os.getenv('JOB_IDENTITY_CACHE', 65536))
+
+TRACKING_PARAMS = frozenset({'gh_src', 'source', 'ref', 'src', 'gclid', 'fbclid', 'msclkid', 'trk',
+                             'lever-source', 'lever-origin', 'lever-via'})
+
+JobIdentity = namedtuple('JobIdentity', 'canonical_id canonical_url company ats')
+
+UUID_RE = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}')
+LEVER_ID_RE = re.compile(r'^[0-9a-f\-]+$')
+GREENHOUSE_JOB_RE = re.compile(r'/jobs/(\d+)')
+WORKDAY_JOB_RE = re.compile(r'/job/[^/]+/([^/]+)')
+WORKDAY_TENANT_RE = re.compile(r'^([^.]+)\.wd\d+\.')
+ICIMS_JOB_RE = re.compile(r'/jobs/(\d+)')
+ICIMS_PREFIX_RE = re.compile(r'^(?:us)?careers-')
+
+
+def _title(slug):
+    return slug.replace('-', ' ').title() if slug else None
+
+
+def _split_query(query):
+    """(query without tracking params, all params)"""
+    if not query:
+        return '', {}
+    pairs = parse_qsl(query, keep_blank_values=True)
+    kept = [(k, v) for k, v in pairs if k not in TRACKING_PARAMS and not k.startswith('utm_')]
+    return (query if len(kept) == len(pairs) else urlencode(kept)), dict(pairs)
+
+
+def _greenhouse(host, segments, path, params):
+    """boards./job-boards.greenhouse.io/<slug>/jobs/<id>, embed?for=<slug>&token=<id>"""
+    slug = segments[0] if segments and segments[0] not in ('embed', 'v1') else params.get('for')
+    match = GREENHOUSE_JOB_RE.search(path)
+    job_id = match.group(1) if match else params.get('token') or params.get('gh_jid')
+    if not job_id:
+        return None, None, _title(slug)
+    url = f"https://boards.greenhouse.io/{slug}/jobs/{job_id}" if slug else None
+    return f"greenhouse_{job_id}", url, _title(slug)
+
+
+def _ashby(host, segments, path, params):
+    """jobs.ashbyhq.com/<slug>/<uuid>[/application]"""
+    slug = segments[0] if segments else None
+    if host != 'jobs.ashbyhq.com':
+        slug = host.split('.')[0]
+    match = UUID_RE.search(path)
+    if not match:
+        return None, None, _title(slug)
+    return f"ashby_{match.group(0)}", f"https://jobs.ashbyhq.com/{slug}/{match.group(0)}", _title(slug)
+
+
+def _lever(host, segments, path, params):
+    """jobs.lever.co/<slug>/<id>[/apply]"""
+    slug = segments[0] if segments else host.split('.')[0]
+    if len(segments) >= 2 and LEVER_ID_RE.match(segments[1]):
+        return f"lever_{segments[1]}", f"https://jobs.lever.co/{slug}/{segments[1]}", _title(slug)
+    return None, None, _title(slug)
+
+
+def _workday(host, segments, path, params):
+    """<tenant>.wd<N>.myworkdayjobs.com/[locale/]<site>/job/<location>/<title>_<req>"""
+    tenant = WORKDAY_TENANT_RE.match(host)
+    company = tenant.group(1).title() if tenant else None
+    match = WORKDAY_JOB_RE.search(path)
+    return (f"workday_{match.group(1)}" if match else None), None, company
+
+
+def _icims(host, segments, path, params):
+    """careers-<company>.icims.com/jobs/<id>/<title>/job"""
+    company = ICIMS_PREFIX_RE.sub('', host.split('.')[0])
+    match = ICIMS_JOB_RE.search(path)
+    return (f"icims_{match.group(1)}" if match else None), None, company.title()
+
+
+def _path_slug(host, segments, path, params):
+    """apply.workable.com/<slug>/..., jobs.smartrecruiters.com/<slug>/..."""
+    return None, None, _title(segments[0] if segments else None)
+
+
+# host suffix -> (ats label, extractor)
+ATS_BY_HOST_SUFFIX = {
+    'greenhouse.io': ('Greenhouse', _greenhouse),
+    'ashbyhq.com': ('Ashby', _ashby),
+    'lever.co': ('Lever', _lever),
+    'myworkdayjobs.com': ('Workday', _workday),
+    'icims.com': ('iCIMS', _icims),
+    'apply.workable.com': ('Workable', _path_slug),
+    'jobs.smartrecruiters.com': ('SmartRecruiters', _path_slug),
+}
+
+
+def _dispatch(host):
+    labels = host.split('.')
+    for i in range(len(labels) - 1):
+        entry = ATS_BY_HOST_SUFFIX.get('.'.join(labels[i:]))
+        if entry is not None:
+            return entry
+    return None, None
+
+
+@lru_cache(maxsize=JOB_IDENTITY_CACHE)
+def resolve(url):
+    """JobIdentity(canonical_id, canonical_url, company, ats) for a job URL. company/ats are None if unknown"""
+    if not url:
+        return JobIdentity(url, url, None, None)
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    path = parts.path.rstrip('/')
+    query, params = _split_query(parts.query)
+    canonical_url = urlunsplit((parts.scheme.lower(), host, path, query, ''))
+
+    ats, extractor = _dispatch(host.split(':')[0])
+    if extractor is None:
+        # Embedded Greenhouse boards on a company's own careers site
+        if 'gh_jid' in params:
+            return JobIdentity(f"greenhouse_{params['gh_jid']}", canonical_url, None, 'Greenhouse')
+        return JobIdentity(canonical_url, canonical_url, None, None)
+
+    segments = [segment for segment in path.split('/') if segment]
+    job_id, ats_url, company = extractor(host, segments, path, params)
+    return JobIdentity(job_id or canonical_url, ats_url or canonical_url, company, ats)
+
+
+def normalize_url(url):
+    """Canonical URL: lowercase scheme/host, no fragment, trailing slash or tracking params"""
+    return resolve(url).canonical_url
+
+
+def extract_job_id(url):
+    """ATS job ID (greenhouse_N, ashby_<uuid>, lever_<id>, workday_<req>, icims_N), else the canonical URL"""
+    return resolve(url).canonical_id
+
+
+def extract_company(url, default='Unknown'):
+    """Company from the board slug/tenant in the URL"""
+    return resolve(url).company or default
+
+
+def extract_company_name(url, title, default='Unknown'):
+    """Company from the URL, else from the result title ("Role at Company", "Role - Company")"""
+    company = resolve(url).company
+    if company:
+        return company
+    if ' at ' in title:
+        return title.split(' at ')[-1].strip()
+    if ' - ' in title:
+        return title.split(' - ')[-1].strip()
+    return default
+
+
+def cache_stats():
+    info = resolve.cache_info()
+    lookups = info.hits + info.misses
+    return f"Job identity: {lookups} URLs resolved, {info.hits / lookups * 100 if lookups else 0:.0f}% from cache"
+
+
+def sample_corpus(count, seed=0):
+    """Synthetic job URLs across the supported ATSs, with tracking params and repeats"""
+    rng = random.Random(seed)
+    slugs = [f"company-{n}" for n in range(500)]
+    templates = [
+        lambda s, n: f"https://boards.greenhouse.io/{s}/jobs/{4000000 + n}?gh_src=abc{n % 7}",
+        lambda s, n: f"https://job-boards.greenhouse.io/{s}/jobs/{5000000 + n}",
+        lambda s, n: f"https://{s}.com/careers/open-roles?gh_jid={6000000 + n}&utm_source=linkedin",
+        lambda s, n: f"https://jobs.ashbyhq.com/{s}/{n:08x}-1234-4abc-8def-{n:012x}/application",
+        lambda s, n: f"https://jobs.lever.co/{s}/{n:08x}-aaaa-4bbb-8ccc-{n:012x}/apply?lever-source=LinkedIn",
+        lambda s, n: f"https://{s.replace('-', '')}.wd5.myworkdayjobs.com/en-US/External/job/New-York-NY/"
+                     f"Machine-Learning-Engineer_JR{100000 + n}",
+        lambda s, n: f"https://careers-{s.replace('-', '')}.icims.com/jobs/{70000 + n}/ml-engineer/job?hub=7",
+        lambda s, n: f"https://apply.workable.com/{s}/j/{n:010X}/",
+        lambda s, n: f"https://www.{s}.com/jobs/{n}#apply",
+    ]
+    unique = [rng.choice(templates)(rng.choice(slugs), n) for n in range(count // 2)]
+    return [rng.choice(unique) for _ in range(count)]
+
+
+def benchmark(count):
+    corpus = sample_corpus(count)
+    resolve.cache_clear()
+    start = time.perf_counter()
+    for url in corpus:
+        resolve.__wrapped__(url)
+    uncached = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for url in corpus:
+        resolve(url)
+    first_pass = time.perf_counter() - start
+    start = time.perf_counter()
+    for url in corpus:
+        resolve(url)
+    warm = time.perf_counter() - start
+
+    print(f"{count:,} URLs ({len(set(corpus)):,} unique)")
+    for label, seconds in [('uncached', uncached), ('LRU, first pass', first_pass), ('LRU, warm', warm)]:
+        print(f"  {label:<16} {seconds:.2f}s  {count / seconds:>10,.0f} URLs/s  {seconds / count * 1e6:.2f} us/URL")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Job identity resolver")
+    sub = parser.add_subparsers(dest='command', required=True)
+    bench = sub.add_parser('bench', help="throughput over a synthetic URL corpus")
+    bench.add_argument('--urls', type=int, default=100000)
+    sub.add_parser('resolve', help="resolve URLs given as arguments").add_argument('urls', nargs='+')
+    args = parser.parse_args()
+
+    if args.command == 'bench':
+        benchmark(args.urls)
+    else:
+        for url in args.urls:
+            print(resolve(url))
+
+
+if __name__ == "__main__":
+    main()
@@ -12,8 +12,15 @@ import time
 from datetime import datetime
 import json
 import os
-from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+from job_identity import normalize_url, extract_company_name, cache_stats
+from history_store import append_history, print_history_stats
 from dotenv import load_dotenv
+from async_search import search_all
+from http_transport import http_get, print_transport_stats
+from response_cache import get_cache, print_cache_stats
+from seen_store import open_seen_store
+from query_planner import plan_queries, split_results
+from near_dup import fold_near_duplicates, commit_near_duplicates, print_near_dup_stats
 
 load_dotenv()
 
@@ -23,6 +30,9 @@ SEARCH_ENGINE_ID = os.getenv('SEARCH_ENGINE_ID')
 OUTPUT_FILE = os.getenv('OUTPUT_FILE', 'ai_ml_jobs.csv')
 SEEN_JOBS_FILE = os.getenv('SEEN_JOBS_FILE', 'seen_jobs.json')
 DELAY_BETWEEN_SEARCHES = int(os.getenv('DELAY_BETWEEN_SEARCHES', 2))
+SEARCH_CONCURRENCY = int(os.getenv('SEARCH_CONCURRENCY', 1))  # >1 enables the async engine
+SEARCH_QPS = float(os.getenv('SEARCH_QPS', 5))
+MINIMIZE_QUERIES = os.getenv('MINIMIZE_QUERIES', '0') == '1'
 
 # SEARCHES (removed -senior filters since Google ignores them anyway)
 SEARCHES = [
@@ -195,43 +205,24 @@ SEARCHES = [
 ]
 
 
-def normalize_url(url):
-    """Normalize URL for deduplication"""
-    parsed = urlparse(url)
-    query_params = parse_qs(parsed.query)
-    clean_params = {k: v for k, v in query_params.items()
-                    if not k.startswith('utm_') and k not in ['ref', 'source']}
-    clean_query = urlencode(clean_params, doseq=True)
-
-    normalized = urlunparse((
-        parsed.scheme.lower(),
-        parsed.netloc.lower(),
-        parsed.path.rstrip('/'),
-        '',
-        clean_query,
-        ''
-    ))
-    return normalized
-
-
 def load_seen_jobs():
-    """Load seen jobs"""
-    if os.path.exists(SEEN_JOBS_FILE):
-        with open(SEEN_JOBS_FILE, 'r') as f:
-            return set(json.load(f))
-    return set()
+    """Load seen jobs (SQLite store; SEEN_JOBS_FILE is imported on first use)"""
+    return open_seen_store(SEEN_JOBS_FILE)
 
 
 def save_seen_jobs(seen_jobs):
-    """Save seen jobs"""
-    with open(SEEN_JOBS_FILE, 'w') as f:
-        json.dump(list(seen_jobs), f)
+    """Save seen jobs (commits only what changed this run)"""
+    seen_jobs.commit()
 
 
 def search_google_with_retry(query, api_key, search_engine_id, date_restrict='d1', max_retries=3):
     """Execute Google API search with retry"""
     base_url = "https://www.googleapis.com/customsearch/v1"
 
+    cached = get_cache().get('customsearch', query, 1, date_restrict)
+    if cached is not None:
+        return json.loads(cached)
+
     for attempt in range(max_retries):
         params = {
             'key': api_key,
@@ -242,7 +233,7 @@ def search_google_with_retry(query, api_key, search_engine_id, date_restrict='d1
         }
 
         try:
-            response = requests.get(base_url, params=params, timeout=10)
+            response = http_get(base_url, params=params, timeout=10)
 
             if response.status_code == 429:
                 wait_time = (2 ** attempt) * 5
@@ -251,6 +242,7 @@ def search_google_with_retry(query, api_key, search_engine_id, date_restrict='d1
                 continue
 
             response.raise_for_status()
+            get_cache().put('customsearch', query, 1, date_restrict, response.text)
             return response.json()
 
         except requests.exceptions.HTTPError as e:
@@ -269,47 +261,6 @@ def search_google_with_retry(query, api_key, search_engine_id, date_restrict='d1
     return None
 
 
-def extract_company_name(url, title):
-    """Extract company name"""
-    if 'ashbyhq.com' in url:
-        parts = url.split('/')
-        for i, part in enumerate(parts):
-            if 'jobs.ashbyhq.com' in url and i + 1 < len(parts):
-                return parts[i + 1].replace('-', ' ').title()
-
-    if 'greenhouse.io' in url:
-        parts = url.split('/')
-        if 'boards' in parts:
-            idx = parts.index('boards')
-            if idx + 1 < len(parts):
-                return parts[idx + 1].replace('-', ' ').title()
-
-    if 'lever.co' in url:
-        parts = url.split('/')
-        if len(parts) > 3:
-            return parts[3].replace('-', ' ').title()
-
-    company_map = {
-        'openai.com': 'OpenAI',
-        'anthropic.com': 'Anthropic',
-        'scale.ai': 'Scale AI',
-        'cohere.com': 'Cohere',
-    }
-
-    for domain, name in company_map.items():
-        if domain in url:
-            return name
-
-    if ' at ' in title:
-        return title.split(' at ')[-1].strip()
-    if ' - ' in title:
-        parts = title.split(' - ')
-        if len(parts) > 1:
-            return parts[-1].strip()
-
-    return "Unknown Company"
-
-
 def parse_job_results(results, metadata):
     """Parse results and FILTER OUT senior roles here"""
     jobs = []
@@ -345,7 +296,7 @@ def parse_job_results(results, metadata):
 
         job = {
             'title': title,
-            'company': extract_company_name(url, title),
+            'company': extract_company_name(url, title, 'Unknown Company'),
             'url': url,
             'normalized_url': normalized_url,
             'snippet': item.get('snippet', ''),
@@ -394,20 +345,37 @@ def main():
 
     seen_jobs = load_seen_jobs()
     all_new_jobs = []
-    total_searches = len(SEARCHES)
 
-    for idx, search_config in enumerate(SEARCHES, 1):
+    search_plan = SEARCHES
+    if MINIMIZE_QUERIES:
+        search_plan = plan_queries(SEARCHES)
+        print(f"Query plan: {len(SEARCHES)} -> {len(search_plan)} queries")
+    total_searches = len(search_plan)
+
+    # Concurrent mode: fetch every query up front (single page each), then parse in order
+    prefetched = None
+    if SEARCH_CONCURRENCY > 1:
+        print(f"Concurrent search: {SEARCH_CONCURRENCY} workers, {SEARCH_QPS} QPS cap")
+        prefetched = search_all(search_plan, GOOGLE_API_KEY, SEARCH_ENGINE_ID,
+                                qps=SEARCH_QPS, concurrency=SEARCH_CONCURRENCY, max_results=10)
+
+    for idx, search_config in enumerate(search_plan, 1):
         print(
             f"\n[{idx}/{total_searches}] {search_config['role']} in {search_config['location']} ({search_config['ats']})")
 
-        results = search_google_with_retry(
-            query=search_config['query'],
-            api_key=GOOGLE_API_KEY,
-            search_engine_id=SEARCH_ENGINE_ID
-        )
+        if prefetched is not None:
+            results = prefetched[idx - 1]
+        else:
+            results = search_google_with_retry(
+                query=search_config['query'],
+                api_key=GOOGLE_API_KEY,
+                search_engine_id=SEARCH_ENGINE_ID
+            )
 
         if results:
-            jobs = parse_job_results(results, search_config)
+            jobs = []
+            for source, sub_results in split_results(results, search_config):
+                jobs.extend(parse_job_results(sub_results, source))
             new_jobs = [job for job in jobs if job['normalized_url'] not in seen_jobs]
 
             if new_jobs:
@@ -417,12 +385,17 @@ def main():
             else:
                 print(f"   No new jobs")
 
-        if idx < total_searches:
+        if idx < total_searches and prefetched is None:
             time.sleep(DELAY_BETWEEN_SEARCHES)
 
+    # Copies of one posting (other ATS, location, repost) fold into the first one found
+    all_new_jobs = fold_near_duplicates(all_new_jobs, 'scraper', lambda job: job['normalized_url'])
+
     if all_new_jobs:
         save_to_csv(all_new_jobs, OUTPUT_FILE)
+        append_history(all_new_jobs, 'scraper')
         save_seen_jobs(seen_jobs)
+        commit_near_duplicates()
 
         print("\n" + "=" * 60)
         print(f"SUCCESS! Found {len(all_new_jobs)} NEW entry/mid-level jobs")
@@ -430,11 +403,19 @@ def main():
         print(f"Saved to: {OUTPUT_FILE}")
         print("=" * 60)
     else:
+        save_seen_jobs(seen_jobs)  # refreshes last_seen of jobs seen again
         print("\n" + "=" * 60)
         print("No new jobs this run")
         print(f"Total tracked: {len(seen_jobs)}")
         print("=" * 60)
 
+    print(seen_jobs.summary())
+    print_near_dup_stats()
+    print_history_stats()
+    print(cache_stats())
+    print_cache_stats()
+    print_transport_stats()
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -17,11 +17,25 @@ import random
 from datetime import datetime, timedelta
 from pathlib import Path
 from dotenv import load_dotenv
-from urllib.parse import urlparse, parse_qs, urlunparse, urlencode
+from job_identity import normalize_url, extract_company, cache_stats
+from history_store import append_history, print_history_stats
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.options import Options
+from response_cache import get_cache, print_cache_stats
+from serp_parser import parse_serp_html
+from board_registry import get_registry, save_registry, print_registry_stats
+from browser_service import BROWSER_SERVICE, attach_driver, find_browser_binary
+from browser_pool import BROWSER_WORKERS, BROWSER_HEADLESS, BROWSER_POOL_EARLY_STOP, collect_pages, replay
+from serp_extract import extract_page
+from serp_lite import SERP_LITE, iter_lite_pages, start_query, begin_query, query_was_live, record_load, print_load_stats
+from page_ready import wait_for_search_box, wait_for_results, click_next_page, print_wait_stats
+from pacing import get_pacing, get_worker_pacing, save_pacing, print_pacing_stats
+from run_journal import RunJournal
+from seen_store import SeenStore, drop_reported
+from near_dup import fold_near_duplicates, commit_near_duplicates, print_near_dup_stats
+from revisit_scheduler import DAEMON_MODE, REVISIT_MIN_MINUTES, RevisitSchedule, run_daemon
 
 load_dotenv(Path(__file__).with_name(".env"), override=True)
 
@@ -30,6 +44,7 @@ OUTPUT_DIR = os.getenv('OUTPUT_DIR', 'ai_ml_jobs_output')
 DELAY_BETWEEN_SEARCHES = int(os.getenv('DELAY_BETWEEN_SEARCHES', 20))  # 20 seconds to avoid CAPTCHA
 MAX_RESULTS_PER_QUERY = int(os.getenv('MAX_RESULTS_PER_QUERY', 20))
 HOURS_LOOKBACK = int(os.getenv('HOURS_LOOKBACK', 24))
+SEEN_NAMESPACE = 'seen_jobs_brave'   # jobs reported on earlier days (seen_store.py)
 
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
@@ -156,17 +171,24 @@ SEARCHES_BY_CATEGORY = {
 }
 
 
-def setup_brave_driver():
+def setup_brave_driver(headless=False):
     """
     Setup Brave browser with anti-detection measures
     - Incognito mode (no cookies/tracking)
     - Disable automation flags
     - Random user agent
+    - headless: for pool workers (no visible window)
+    - BROWSER_SERVICE=1: attach to the warm browser service instead of a cold start
     """
-    brave_path = "/Applications/Brave Browser.app/Contents/MacOS/Brave Browser"
+    if BROWSER_SERVICE and not headless:
+        driver = attach_driver()
+        if driver is not None:
+            return driver
 
-    if not os.path.exists(brave_path):
-        print("ERROR: Brave not found at:", brave_path)
+    brave_path = find_browser_binary()
+
+    if brave_path is None:
+        print("ERROR: no Brave/Chrome/Chromium binary found (set BROWSER_BINARY)")
         exit(1)
 
     options = Options()
@@ -185,6 +207,9 @@ def setup_brave_driver():
     options.add_argument('--disable-dev-shm-usage')
     options.add_argument('--start-maximized')
     options.add_argument('--disable-gpu')
+    if headless:
+        options.add_argument('--headless=new')
+        options.add_argument('--window-size=1920,1080')
 
     # Random realistic user agent
     options.add_argument(
@@ -208,89 +233,6 @@ def setup_brave_driver():
         exit(1)
 
 
-def normalize_url(url):
-    """Remove # anchors AND tracking parameters"""
-    if not url:
-        return None
-
-    # Remove fragment
-    if '#' in url:
-        url = url.split('#')[0]
-
-    # Parse URL
-    parsed = urlparse(url)
-    query_params = parse_qs(parsed.query)
-
-    # Remove tracking params
-    tracking_params = ['gh_src', 'gh_jid', 'source', 'utm_source', 'utm_medium',
-                       'utm_campaign', 'ref', 'gclid', 'lever-source']
-
-    cleaned_params = {k: v for k, v in query_params.items() if k not in tracking_params}
-
-    # Rebuild query
-    new_query = urlencode(cleaned_params, doseq=True) if cleaned_params else ''
-
-    # Rebuild URL
-    normalized = urlunparse((
-        parsed.scheme,
-        parsed.netloc,
-        parsed.path,
-        '', new_query, ''
-    ))
-
-    return normalized.rstrip('/')
-
-
-def extract_company(url):
-    """Extract company from URL"""
-    if 'jobs.ashbyhq.com' in url:
-        match = re.search(r'jobs\.ashbyhq\.com/([^/]+)', url)
-        if match:
-            return match.group(1).replace('-', ' ').title()
-
-    if 'ashbyhq.com' in url:
-        match = re.search(r'//([^.]+)\.ashbyhq\.com', url)
-        if match:
-            return match.group(1).replace('-', ' ').title()
-
-    if 'boards.greenhouse.io' in url:
-        match = re.search(r'boards\.greenhouse\.io/([^/]+)', url)
-        if match:
-            return match.group(1).replace('-', ' ').title()
-
-    if 'greenhouse.io' in url:
-        match = re.search(r'//([^.]+)\.greenhouse\.io', url)
-        if match:
-            return match.group(1).replace('-', ' ').title()
-
-    if 'jobs.lever.co' in url:
-        match = re.search(r'jobs\.lever\.co/([^/]+)', url)
-        if match:
-            return match.group(1).replace('-', ' ').title()
-
-    if 'lever.co' in url:
-        match = re.search(r'//([^.]+)\.lever\.co', url)
-        if match:
-            return match.group(1).replace('-', ' ').title()
-
-    if 'myworkdayjobs.com' in url:
-        match = re.search(r'//([^.]+)\.wd\d+\.myworkdayjobs', url)
-        if match:
-            return match.group(1).title()
-
-    if 'apply.workable.com' in url:
-        match = re.search(r'apply\.workable\.com/([^/]+)', url)
-        if match:
-            return match.group(1).replace('-', ' ').title()
-
-    if 'jobs.smartrecruiters.com' in url:
-        match = re.search(r'jobs\.smartrecruiters\.com/([^/]+)', url)
-        if match:
-            return match.group(1).replace('-', ' ').title()
-
-    return "Unknown"
-
-
 def is_senior_role(title):
     """Check if senior role"""
     title_lower = title.lower()
@@ -305,98 +247,157 @@ def is_senior_role(title):
     return any(re.search(pattern, title_lower) for pattern in SENIOR_PATTERNS)
 
 
-def google_search(driver, query, date_filter, seen_urls_global, max_results=20):
-    """Search Google with after:DATE filter + GLOBAL deduplication"""
-    jobs = []
+def iter_serp_pages(driver, query, date_filter, max_pages=3):
+    """
+    Yield each result page as a list of (title, url, snippet). Lazy: the next page is only
+    loaded when the caller asks for it
+    """
+    start_query()
+    if SERP_LITE:
+        # One direct-URL load with up to 100 results instead of homepage + submit + pnnext
+        yield from iter_lite_pages(driver, query, date_filter, ('div.tF2Cxc', 'div.g'), max_pages * 10)
+        return
 
-    try:
+    cache = get_cache()
+
+    # Replay cached SERP pages for the same query/date instead of hitting Google again
+    cached_html = cache.get('google_serp', query, 0, date_filter)
+
+    query_with_filter = f"{query} after:{date_filter}"
+
+    if cached_html is None:
+        begin_query('classic')
         driver.get("https://www.google.com")
-        time.sleep(2)
+        wait_for_search_box(driver)
+        record_load(driver, 'classic')
 
         search_box = driver.find_element(By.NAME, "q")
         search_box.clear()
 
-        query_with_filter = f"{query} after:{date_filter}"
         search_box.send_keys(query_with_filter)
         search_box.send_keys(Keys.RETURN)
 
         print(f"    Query: {query_with_filter}")
-        time.sleep(6)  # Increased wait for results to load
+        wait_for_results(driver, ('div.tF2Cxc', 'div.g'))
+        record_load(driver, 'classic')
+    else:
+        print(f"    Query: {query_with_filter} (cached)")
+
+    for page in range(max_pages):
+        if cached_html is not None:
+            results = [(r['title'], r['url'], r['snippet']) for r in parse_serp_html(cached_html)]
+            print(f"    Page {page + 1}: {len(results)} results (cached)")
+        else:
+            # Primary selector div.tF2Cxc, fallback div.g - one script call per page
+            containers, results = extract_page(driver, ('div.tF2Cxc', 'div.g'))
+
+            print(f"    Page {page + 1}: {containers} results")
 
-        page = 0
+            # Empty pages may be CAPTCHA/consent walls, so only cache real results
+            if containers:
+                cache.put('google_serp', query, page * 10, date_filter, driver.page_source)
 
-        while len(jobs) < max_results and page < 3:
-            # Primary selector
-            results = driver.find_elements(By.CSS_SELECTOR, 'div.tF2Cxc')
+        if not results:
+            return
 
-            # Fallback
-            if not results:
-                results = driver.find_elements(By.CSS_SELECTOR, 'div.g')
+        yield results
 
-            print(f"    Page {page + 1}: {len(results)} results")
+        # Next page
+        if page + 1 >= max_pages:
+            return
 
-            if not results:
+        if cached_html is not None:
+            cached_html = cache.get('google_serp', query, (page + 1) * 10, date_filter)
+            if cached_html is None:
+                return
+            continue
+
+        try:
+            next_btn = driver.find_element(By.ID, "pnnext")
+            click_next_page(driver, next_btn, ('div.tF2Cxc', 'div.g'))
+            record_load(driver, 'classic')
+        except:
+            return
+
+
+def select_jobs(pages, seen_urls_global, max_results=20):
+    """Filter result pages into jobs, with GLOBAL deduplication. Stops pulling pages once full"""
+    jobs = []
+
+    for results in pages:
+        for title, url, snippet in results:
+            if len(jobs) >= max_results:
                 break
 
-            for result in results:
-                if len(jobs) >= max_results:
-                    break
+            if not title or not url or len(title) < 5:
+                continue
 
-                try:
-                    h3 = result.find_element(By.CSS_SELECTOR, 'h3')
-                    title = h3.text.strip()
+            if not url.startswith('http'):
+                continue
 
-                    link = result.find_element(By.CSS_SELECTOR, 'a')
-                    url = link.get_attribute('href')
+            # Must be from ATS allowlist
+            if not any(ats in url for ats in ATS_ALLOW):
+                continue
 
-                    if not title or not url or len(title) < 5:
-                        continue
+            # Remember the board for direct polling
+            get_registry().record_url(url, extract_company(url))
 
-                    if not url.startswith('http'):
-                        continue
+            # Normalize URL
+            normalized = normalize_url(url)
 
-                    # Must be from ATS allowlist
-                    if not any(ats in url for ats in ATS_ALLOW):
-                        continue
+            # Global deduplication
+            if normalized in seen_urls_global:
+                continue
+            seen_urls_global.add(normalized)
 
-                    # Normalize URL
-                    normalized = normalize_url(url)
+            # Filter senior
+            if is_senior_role(title):
+                continue
 
-                    # Global deduplication
-                    if normalized in seen_urls_global:
-                        continue
-                    seen_urls_global.add(normalized)
+            company = extract_company(url)
 
-                    # Filter senior
-                    if is_senior_role(title):
-                        continue
+            print(f"    ✓ {company} - {title[:55]}")
 
-                    company = extract_company(url)
+            jobs.append({
+                'title': title,
+                'company': company,
+                'url': url,
+                'snippet': snippet
+            })
 
-                    print(f"    ✓ {company} - {title[:55]}")
+        if len(jobs) >= max_results:
+            break
 
-                    jobs.append({
-                        'title': title,
-                        'company': company,
-                        'url': url
-                    })
+    return jobs
 
-                except Exception as e:
-                    continue
 
-            # Next page
-            if len(jobs) < max_results and page < 2:
-                try:
-                    next_btn = driver.find_element(By.ID, "pnnext")
-                    next_btn.click()
-                    time.sleep(4)
-                    page += 1
-                except:
-                    break
-            else:
-                break
+def pages_full(pages, max_results=20):
+    """
+    Pool stop predicate (BROWSER_POOL_EARLY_STOP=1): select_jobs replayed without the URLs
+    earlier queries claim would be full. With them it can need more pages, so this can
+    stop a query short of what the single driver returns
+    """
+    seen = set()
+    kept = 0
+    for results in pages:
+        for title, url, _ in results:
+            if not title or not url or len(title) < 5 or not url.startswith('http'):
+                continue
+            if not any(ats in url for ats in ATS_ALLOW):
+                continue
+            normalized = normalize_url(url)
+            if normalized in seen:
+                continue
+            seen.add(normalized)
+            if not is_senior_role(title):
+                kept += 1
+    return kept >= max_results
 
-        return jobs
+
+def google_search(driver, query, date_filter, seen_urls_global, max_results=20):
+    """Search Google with after:DATE filter + GLOBAL deduplication"""
+    try:
+        return select_jobs(iter_serp_pages(driver, query, date_filter), seen_urls_global, max_results)
 
     except Exception as e:
         print(f"    Error: {str(e)[:80]}")
@@ -412,7 +413,8 @@ def save_category_csv(jobs, category_name):
     filename = f"{OUTPUT_DIR}/{category_name}_{timestamp}.csv"
 
     with open(filename, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=['title', 'company', 'url', 'ats', 'date_found'])
+        writer = csv.DictWriter(f, fieldnames=['title', 'company', 'url', 'ats', 'date_found'],
+                                extrasaction='ignore')   # snippet: near-dup folding and history only
         writer.writeheader()
 
         for job in jobs:
@@ -421,6 +423,80 @@ def save_category_csv(jobs, category_name):
     return filename
 
 
+def load_category_csv(category_name):
+    """Today's rows already written for a category (daemon restarts keep them)"""
+    filename = f"{OUTPUT_DIR}/{category_name}_{datetime.now().strftime('%Y-%m-%d')}.csv"
+    if not os.path.exists(filename):
+        return []
+    with open(filename, 'r', newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def daemon_main():
+    """Continuous mode: each query on its own revisit interval, window recomputed per visit"""
+    print("=" * 70)
+    print("AI/ML JOB SCRAPER - DAEMON MODE")
+    print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 70)
+
+    pacing = get_pacing('brave', 20, fallback=lambda: random.randint(18, 22))
+    configs = {f"brave|{category_name}|{s['query']}": (category_name, s)
+               for category_name, searches in SEARCHES_BY_CATEGORY.items() for s in searches}
+    schedule = RevisitSchedule(configs)
+    print(schedule.summary())
+
+    # A revisit must see fresh results, not the SERP cached on the previous visit
+    get_cache().limit_ttl(REVISIT_MIN_MINUTES * 60 / 2)
+
+    driver = setup_brave_driver()
+    seen_urls_global = set()
+    seen_store = SeenStore(SEEN_NAMESPACE)
+    daily_jobs = {}  # (day, category) -> rows in that day's CSV
+    today = datetime.now().strftime('%Y-%m-%d')
+    for category_name in SEARCHES_BY_CATEGORY:
+        rows = daily_jobs[(today, category_name)] = load_category_csv(category_name)
+        seen_urls_global.update(normalize_url(row['url']) for row in rows)
+
+    def run_query(key):
+        category_name, search_config = configs[key]
+
+        # Recompute the window on every visit, not once at import
+        window = (datetime.now() - timedelta(hours=HOURS_LOOKBACK)).strftime('%Y-%m-%d')
+        jobs = google_search(driver, search_config['query'], window, seen_urls_global, MAX_RESULTS_PER_QUERY)
+        if pacing.observe_query(driver, ('div.tF2Cxc', 'div.g')) == 'blocked':
+            return None
+
+        jobs = drop_reported(jobs, seen_store, lambda job: normalize_url(job['url']))
+        jobs = fold_near_duplicates(jobs, 'brave', lambda job: normalize_url(job['url']))
+        if jobs:
+            day = datetime.now().strftime('%Y-%m-%d')
+            for job in jobs:
+                job['ats'] = search_config['ats']
+                job['date_found'] = datetime.now().strftime('%Y-%m-%d %H:%M')
+            rows = daily_jobs.setdefault((day, category_name), [])
+            rows.extend(jobs)
+            print(f"   Found: {len(jobs)} new jobs → {save_category_csv(rows, category_name)}")
+            append_history(jobs, 'brave', category_name)
+            seen_store.commit()
+            commit_near_duplicates()
+        return len(jobs)
+
+    try:
+        # No pause after a visit served from the response cache: nothing was fetched
+        run_daemon(schedule, run_query, lambda: pacing.next_delay() if query_was_live() else 0)
+    finally:
+        save_registry()
+        save_pacing()
+        print(schedule.summary())
+        print(seen_store.summary())
+        print_near_dup_stats()
+        print_pacing_stats()
+        print_history_stats()
+        print(cache_stats())
+        print_cache_stats()
+        driver.quit()
+
+
 def main():
     """Main execution"""
     print("=" * 70)
@@ -431,11 +507,34 @@ def main():
     print(f"Output: {OUTPUT_DIR}/")
     print("=" * 70)
 
-    driver = setup_brave_driver()
+    # Delay between searches: fixed 18-22s, or AIMD on block signals (ADAPTIVE_PACING=1)
+    pacing = get_pacing('brave', 20, fallback=lambda: random.randint(18, 22))
+
+    # Checkpoints: a restarted run skips queries already completed for this date filter
+    journal = RunJournal('brave', date_filter)
+
+    def journal_key(category_name, idx, search_config):
+        return f"{category_name}|{idx}|{search_config['query']}"
+
+    # Worker pool: fetch every query's pages in parallel, then replay them in order below
+    driver = None
+    pooled = None
+    if BROWSER_WORKERS > 1:
+        queries = [s['query'] for category_name, searches in SEARCHES_BY_CATEGORY.items()
+                   for idx, s in enumerate(searches, 1) if not journal.done(journal_key(category_name, idx, s))]
+        print(f"Browser pool: {BROWSER_WORKERS} workers, {len(queries)} queries")
+        pooled = iter(collect_pages(queries, lambda: setup_brave_driver(headless=BROWSER_HEADLESS),
+                                    lambda d, q: iter_serp_pages(d, q, date_filter), get_worker_pacing,
+                                    ('div.tF2Cxc', 'div.g'), BROWSER_WORKERS,
+                                    stop=(lambda pages: pages_full(pages, MAX_RESULTS_PER_QUERY))
+                                    if BROWSER_POOL_EARLY_STOP else None))
+    else:
+        driver = setup_brave_driver()
     print("Browser ready!\n")
 
-    # Global deduplication
+    # Global deduplication (this run), and across runs: jobs reported on an earlier day
     seen_urls_global = set()
+    seen_store = SeenStore(SEEN_NAMESPACE)
 
     category_results = {}
 
@@ -450,14 +549,35 @@ def main():
             for idx, search_config in enumerate(searches, 1):
                 print(f"\n[{idx}/{len(searches)}] {search_config['ats']}")
 
-                jobs = google_search(
-                    driver,
-                    search_config['query'],
-                    date_filter,
-                    seen_urls_global,
-                    MAX_RESULTS_PER_QUERY
-                )
+                key = journal_key(category_name, idx, search_config)
+                checkpoint = journal.done(key)
+                if checkpoint is not None:
+                    seen_urls_global.update(checkpoint['seen'])
+                    seen_store.update(normalize_url(job['url']) for job in checkpoint['jobs'])
+                    category_jobs.extend(checkpoint['jobs'])
+                    print(f"   Restored from journal: {len(checkpoint['jobs'])} jobs")
+                    continue
 
+                seen_before = set(seen_urls_global)
+                if pooled is not None:
+                    pages, error, signal = next(pooled)
+                    jobs = replay(pages, error,
+                                  lambda p: select_jobs(p, seen_urls_global, MAX_RESULTS_PER_QUERY),
+                                  MAX_RESULTS_PER_QUERY)
+                    completed = error is None and signal not in ('blocked', 'empty')
+                else:
+                    jobs = google_search(
+                        driver,
+                        search_config['query'],
+                        date_filter,
+                        seen_urls_global,
+                        MAX_RESULTS_PER_QUERY
+                    )
+                    signal = pacing.observe_query(driver, ('div.tF2Cxc', 'div.g'))
+                    completed = signal not in ('blocked', 'empty')
+
+                jobs = drop_reported(jobs, seen_store, lambda job: normalize_url(job['url']))
+                jobs = fold_near_duplicates(jobs, 'brave', lambda job: normalize_url(job['url']))
                 if jobs:
                     for job in jobs:
                         job['ats'] = search_config['ats']
@@ -468,17 +588,25 @@ def main():
                 else:
                     print(f"   No new jobs")
 
-                if idx < len(searches):
-                    # Random delay between 18-22 seconds (more human-like)
-                    delay = random.randint(18, 22)
-                    print(f"   Waiting {delay}s (anti-CAPTCHA delay)...")
+                # Blocked, empty and failed queries stay out of the journal so a restart retries
+                # them: an empty page may be a block or consent wall is_blocked doesn't know.
+                # A cache hit (signal None) only ever replays pages that had results
+                if completed:
+                    journal.record(key, jobs, seen_urls_global - seen_before)
+
+                # Cache hits fetched nothing: no delay owed
+                if idx < len(searches) and pooled is None and signal is not None:
+                    # Random delay (18-22s fixed, or adaptive) - more human-like
+                    delay = pacing.next_delay()
+                    print(f"   Waiting {delay:.0f}s (anti-CAPTCHA delay)...")
                     time.sleep(delay)
 
             if category_jobs:
                 filename = save_category_csv(category_jobs, category_name)
                 category_results[category_name] = {
                     'count': len(category_jobs),
-                    'file': filename
+                    'file': filename,
+                    'jobs': category_jobs
                 }
                 print(f"\n✓ Saved {len(category_jobs)} jobs → {filename}")
 
@@ -502,13 +630,37 @@ def main():
             print("No jobs found in last 24 hours")
             print("\nTip: Try HOURS_LOOKBACK=24 or 72")
 
+        # Every category CSV is written: record the run in the history, commit the seen URLs,
+        # and the next run starts a fresh journal
+        for category, result in category_results.items():
+            append_history(result['jobs'], 'brave', category)
+        seen_store.commit()
+        commit_near_duplicates()
+        print(journal.summary())
+        journal.finish()
+
+        save_registry()
+        print_registry_stats()
+        print(seen_store.summary())
+        print_near_dup_stats()
+        print_history_stats()
+        print(cache_stats())
+        print_cache_stats()
+        print_wait_stats()
+        print_load_stats()
+        save_pacing()
+        print_pacing_stats()
         print("\n" + "=" * 70)
 
     finally:
         print("\nClosing...")
-        driver.quit()
+        if driver is not None:
+            driver.quit()
         print("Done!")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if DAEMON_MODE:
+        daemon_main()
+    else:
+        main()
\ No newline at end of file
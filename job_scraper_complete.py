@@ -16,8 +16,20 @@ from datetime import datetime
 import json
 import os
 import re
-from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+from job_identity import extract_job_id, extract_company_name, cache_stats
+from history_store import append_history, print_history_stats
 from dotenv import load_dotenv
+from async_search import search_all, requests_sent
+from http_transport import http_get, print_transport_stats
+from response_cache import get_cache, print_cache_stats
+from seen_store import open_seen_store
+from adaptive_pagination import (MAX_START, next_page_decision, record_page_yield,
+                                 page_yield_summary, print_pagination_stats)
+from query_planner import plan_queries, split_results
+from near_dup import fold_near_duplicates, commit_near_duplicates, print_near_dup_stats
+from board_registry import get_registry, save_registry, print_registry_stats
+from query_scheduler import (load_history, save_history, budget_left_today, allocate_pages,
+                             log_allocation, print_allocation, record_query_run)
 
 load_dotenv()
 
@@ -27,6 +39,11 @@ SEARCH_ENGINE_ID = os.getenv('SEARCH_ENGINE_ID')
 OUTPUT_FILE = os.getenv('OUTPUT_FILE', 'ai_ml_jobs_complete.csv')
 SEEN_JOBS_FILE = os.getenv('SEEN_JOBS_FILE', 'seen_jobs_complete.json')
 DELAY_BETWEEN_SEARCHES = int(os.getenv('DELAY_BETWEEN_SEARCHES', 2))
+SEARCH_CONCURRENCY = int(os.getenv('SEARCH_CONCURRENCY', 1))  # >1 enables the async engine
+SEARCH_QPS = float(os.getenv('SEARCH_QPS', 5))
+ADAPTIVE_PAGINATION = os.getenv('ADAPTIVE_PAGINATION', '1') == '1'
+MINIMIZE_QUERIES = os.getenv('MINIMIZE_QUERIES', '0') == '1'
+QUERY_SCHEDULER = os.getenv('QUERY_SCHEDULER', '0') == '1'
 
 # Fit scoring keywords
 KEYWORDS_LLM = ["llm", "large language model", "generative ai", "rag", "retrieval augmented", 
@@ -144,108 +161,89 @@ SEARCHES = [
 ]
 
 
-def normalize_url(url):
-    """Normalize URL"""
-    parsed = urlparse(url)
-    query_params = parse_qs(parsed.query)
-    clean_params = {k: v for k, v in query_params.items() 
-                   if not k.startswith('utm_') and k not in ['ref', 'source', 'lever-source']}
-    clean_query = urlencode(clean_params, doseq=True)
-    
-    normalized = urlunparse((
-        parsed.scheme.lower(),
-        parsed.netloc.lower(),
-        parsed.path.rstrip('/'),
-        '',
-        clean_query,
-        ''
-    ))
-    return normalized
-
-
-def extract_job_id(url):
-    """Extract job ID from ATS URLs"""
-    if 'greenhouse.io' in url:
-        match = re.search(r'/jobs/(\d+)', url)
-        if match:
-            return f"greenhouse_{match.group(1)}"
-    
-    if 'ashbyhq.com' in url:
-        match = re.search(r'/([a-f0-9\-]{36})', url)
-        if match:
-            return f"ashby_{match.group(1)}"
-    
-    if 'lever.co' in url:
-        match = re.search(r'/([a-f0-9\-]+)(?:/apply)?$', url)
-        if match:
-            return f"lever_{match.group(1)}"
-    
-    if 'myworkdayjobs.com' in url:
-        match = re.search(r'/job/[^/]+/([^/]+)', url)
-        if match:
-            return f"workday_{match.group(1)}"
-    
-    if 'icims.com' in url:
-        match = re.search(r'/jobs/(\d+)', url)
-        if match:
-            return f"icims_{match.group(1)}"
-    
-    return normalize_url(url)
-
-
 def load_seen_jobs():
-    """Load seen jobs"""
-    if os.path.exists(SEEN_JOBS_FILE):
-        with open(SEEN_JOBS_FILE, 'r') as f:
-            return set(json.load(f))
-    return set()
+    """Load seen jobs (SQLite store; SEEN_JOBS_FILE is imported on first use)"""
+    return open_seen_store(SEEN_JOBS_FILE)
 
 
 def save_seen_jobs(seen_jobs):
-    """Save seen jobs"""
-    with open(SEEN_JOBS_FILE, 'w') as f:
-        json.dump(list(seen_jobs), f)
-
-
-def search_google_paginated(query, api_key, search_engine_id, date_restrict='d1', max_results=30):
-    """Search with pagination"""
+    """Save seen jobs (commits only what changed this run)"""
+    seen_jobs.commit()
+
+
+def search_google_paginated(query, api_key, search_engine_id, date_restrict='d1', max_results=30,
+                            page_yield=None, max_pages=None):
+    """
+    Search with pagination
+    page_yield: optional callback(items) -> (new passing jobs, mean fit) for yield-driven paging
+    max_pages: optional hard cap on pages fetched (the scheduler's allocation)
+    Returns (results, API requests sent); cache hits cost no request
+    """
     base_url = "https://www.googleapis.com/customsearch/v1"
     all_items = []
+    requests_made = 0
+    cache = get_cache()
+    
+    if page_yield is not None:
+        starts = range(1, MAX_START + 1, 10)
+    elif max_pages is not None:
+        # Fixed paging up to the allocation, which may be more than the default 3 pages
+        starts = range(1, min(max_pages * 10, MAX_START) + 1, 10)
+        max_results = max_pages * 10
+    else:
+        starts = [1, 11, 21]
+    if max_pages is not None:
+        starts = starts[:max_pages]
     
-    for start in [1, 11, 21]:
-        if len(all_items) >= max_results:
+    for start in starts:
+        if page_yield is None and len(all_items) >= max_results:
             break
         
-        params = {
-            'key': api_key,
-            'cx': search_engine_id,
-            'q': query,
-            'dateRestrict': date_restrict,
-            'num': 10,
-            'start': start
-        }
-        
-        try:
-            response = requests.get(base_url, params=params, timeout=10)
+        # Serve repeated query/page/date combinations from the on-disk cache
+        cached = cache.get('customsearch', query, start, date_restrict)
+        if cached is not None:
+            data = json.loads(cached)
+        else:
+            params = {
+                'key': api_key,
+                'cx': search_engine_id,
+                'q': query,
+                'dateRestrict': date_restrict,
+                'num': 10,
+                'start': start
+            }
             
-            if response.status_code == 429:
-                print(f"   Rate limit at page {start//10 + 1}")
+            requests_made += 1
+            try:
+                response = http_get(base_url, params=params, timeout=10)
+                
+                if response.status_code == 429:
+                    print(f"   Rate limit at page {start//10 + 1}")
+                    break
+                
+                response.raise_for_status()
+                data = response.json()
+                cache.put('customsearch', query, start, date_restrict, response.text)
+                    
+            except requests.exceptions.RequestException:
                 break
             
-            response.raise_for_status()
-            data = response.json()
-            
-            if 'items' in data:
-                all_items.extend(data['items'])
-            else:
-                break
-                
-        except requests.exceptions.RequestException:
+            time.sleep(0.5)
+        
+        if 'items' not in data:
             break
+        all_items.extend(data['items'])
         
-        time.sleep(0.5)
+        if page_yield is not None:
+            new_jobs, mean_fit = page_yield(data['items'])
+            keep_going, reason = next_page_decision(start, len(data['items']), new_jobs, mean_fit, max_results)
+            record_page_yield(query, start, len(data['items']), new_jobs, mean_fit, reason,
+                              cached=cached is not None)
+            if not keep_going:
+                print(f"   Page {start//10 + 1}: {new_jobs} new, stopping ({reason})")
+                break
     
-    return {'items': all_items} if all_items else None
+    return ({'items': all_items} if all_items else None), requests_made
 
 
 def is_hard_senior(title):
@@ -311,37 +309,7 @@ def compute_fit_score(title, snippet):
     return score, ", ".join(reasons), ", ".join(list(set(matched_keywords))[:5])
 
 
-def extract_company_name(url, title):
-    """Extract company name"""
-    if 'ashbyhq.com' in url:
-        parts = url.split('/')
-        for i, part in enumerate(parts):
-            if 'jobs.ashbyhq.com' in url and i + 1 < len(parts):
-                return parts[i + 1].replace('-', ' ').title()
-    
-    if 'greenhouse.io' in url:
-        parts = url.split('/')
-        if 'boards' in parts:
-            idx = parts.index('boards')
-            if idx + 1 < len(parts):
-                return parts[idx + 1].replace('-', ' ').title()
-    
-    if 'lever.co' in url:
-        parts = url.split('/')
-        if len(parts) > 3:
-            return parts[3].replace('-', ' ').title()
-    
-    if ' at ' in title:
-        return title.split(' at ')[-1].strip()
-    if ' - ' in title:
-        parts = title.split(' - ')
-        if len(parts) > 1:
-            return parts[-1].strip()
-    
-    return "Unknown Company"
-
-
-def parse_job_results(results, metadata):
+def parse_job_results(results, metadata, verbose=True):
     """Parse with fit scoring and filtering"""
     jobs = []
     
@@ -355,9 +323,13 @@ def parse_job_results(results, metadata):
         
         # Hard filters
         if is_hard_senior(title):
+            if verbose:
+                print(f"   FILTERED (senior): {title[:60]}")
             continue
         
         if not is_us_location(title, snippet):
+            if verbose:
+                print(f"   FILTERED (non-US): {title[:60]}")
             continue
         
         # Compute fit
@@ -365,13 +337,15 @@ def parse_job_results(results, metadata):
         
         # Keep only high-fit jobs
         if fit_score < 30:
+            if verbose:
+                print(f"   FILTERED (fit={fit_score}): {title[:60]}")
             continue
         
         job_id = extract_job_id(url)
         
         job = {
             'title': title,
-            'company': extract_company_name(url, title),
+            'company': extract_company_name(url, title, 'Unknown Company'),
             'url': url,
             'job_id': job_id,
             'snippet': snippet,
@@ -427,19 +401,64 @@ def main():
     seen_jobs = load_seen_jobs()
     all_new_jobs = []
     
-    for idx, search_config in enumerate(SEARCHES, 1):
+    search_plan = SEARCHES
+    if MINIMIZE_QUERIES:
+        search_plan = plan_queries(SEARCHES)
+        print(f"Query plan: {len(SEARCHES)} -> {len(search_plan)} queries")
+    
+    # Budget scheduler: split today's remaining requests by past yield
+    history = None
+    page_caps = [None] * len(search_plan)
+    if QUERY_SCHEDULER:
+        history = load_history()
+        budget = budget_left_today(history)
+        allocation = allocate_pages(search_plan, history, budget)
+        log_allocation(allocation, budget)
+        print_allocation(allocation)
+        search_plan = [config for config, pages, _, _ in allocation if pages > 0]
+        page_caps = [pages for _, pages, _, _ in allocation if pages > 0]
+    
+    # Concurrent mode: fetch every query up front, then parse in order
+    prefetched = None
+    if SEARCH_CONCURRENCY > 1:
+        print(f"Concurrent search: {SEARCH_CONCURRENCY} workers, {SEARCH_QPS} QPS cap")
+        prefetched = search_all(search_plan, GOOGLE_API_KEY, SEARCH_ENGINE_ID,
+                                qps=SEARCH_QPS, concurrency=SEARCH_CONCURRENCY, max_results=30,
+                                page_caps=page_caps if QUERY_SCHEDULER else None)
+    
+    for idx, search_config in enumerate(search_plan, 1):
         pack = search_config.get('pack', 'General')
-        print(f"\n[{idx}/{len(SEARCHES)}] [{pack}] {search_config['role']} - {search_config['ats']}")
+        print(f"\n[{idx}/{len(search_plan)}] [{pack}] {search_config['role']} - {search_config['ats']}")
         
-        results = search_google_paginated(
-            query=search_config['query'],
-            api_key=GOOGLE_API_KEY,
-            search_engine_id=SEARCH_ENGINE_ID,
-            max_results=30
-        )
+        if prefetched is not None:
+            results = prefetched[idx - 1]
+            requests_made = requests_sent(search_config['query'])
+        else:
+            page_yield = None
+            if ADAPTIVE_PAGINATION:
+                def page_yield(items, metadata=search_config):
+                    jobs = [job for source, sub_results in split_results({'items': items}, metadata)
+                            for job in parse_job_results(sub_results, source, verbose=False)]
+                    return page_yield_summary(jobs, seen_jobs)
+            
+            results, requests_made = search_google_paginated(
+                query=search_config['query'],
+                api_key=GOOGLE_API_KEY,
+                search_engine_id=SEARCH_ENGINE_ID,
+                max_results=30,
+                page_yield=page_yield,
+                max_pages=page_caps[idx - 1]
+            )
         
         if results:
-            jobs = parse_job_results(results, search_config)
+            # Every ATS URL teaches us a board that can be polled directly
+            for item in results['items']:
+                get_registry().record_url(item.get('link', ''),
+                                          extract_company_name(item.get('link', ''), item.get('title', '')))
+            
+            jobs = []
+            for source, sub_results in split_results(results, search_config):
+                jobs.extend(parse_job_results(sub_results, source))
             new_jobs = [job for job in jobs if job['job_id'] not in seen_jobs]
             
             if new_jobs:
@@ -450,14 +469,26 @@ def main():
             else:
                 print(f"   No new jobs")
         
-        time.sleep(DELAY_BETWEEN_SEARCHES)
+        if history is not None:
+            # Spend is requests actually sent: cache hits are free, empty/error pages are not
+            fresh = new_jobs if results else []
+            mean_fit = sum(j['fit_score'] for j in fresh) / len(fresh) if fresh else 0.0
+            record_query_run(history, search_config['query'], requests_made, len(fresh), mean_fit)
+        
+        if prefetched is None:
+            time.sleep(DELAY_BETWEEN_SEARCHES)
     
     # Sort by fit score
     all_new_jobs.sort(key=lambda x: x['fit_score'], reverse=True)
+
+    # Copies of one posting (other ATS, location, repost) fold into the first/best-scored one
+    all_new_jobs = fold_near_duplicates(all_new_jobs, 'complete', lambda job: job['job_id'])
     
     if all_new_jobs:
         save_to_csv(all_new_jobs, OUTPUT_FILE)
+        append_history(all_new_jobs, 'complete')
         save_seen_jobs(seen_jobs)
+        commit_near_duplicates()
         
         print("\n" + "=" * 60)
         print(f"SUCCESS! Found {len(all_new_jobs)} jobs")
@@ -468,10 +499,24 @@ def main():
             print(f"  [{job['fit_score']}] {job['company']}: {job['title'][:50]}")
         print("=" * 60)
     else:
+        save_seen_jobs(seen_jobs)  # refreshes last_seen of jobs seen again
         print("\n" + "=" * 60)
         print("No new jobs this run")
         print("=" * 60)
 
+    if history is not None:
+        save_history(history)
+    save_registry()
+    
+    print_pagination_stats()
+    print_registry_stats()
+    print(seen_jobs.summary())
+    print_near_dup_stats()
+    print_history_stats()
+    print(cache_stats())
+    print_cache_stats()
+    print_transport_stats()
+
 
 if __name__ == "__main__":
     main()
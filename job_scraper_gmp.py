@@ -15,6 +15,19 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.options import Options
+from response_cache import get_cache, print_cache_stats
+from serp_parser import parse_serp_html
+from board_registry import get_registry, save_registry, print_registry_stats
+from browser_service import BROWSER_SERVICE, attach_driver, find_browser_binary
+from browser_pool import BROWSER_WORKERS, BROWSER_HEADLESS, collect_pages, replay
+from serp_extract import extract_page
+from serp_lite import SERP_LITE, iter_lite_pages, start_query, begin_query, record_load, print_load_stats
+from page_ready import wait_for_search_box, wait_for_results, click_next_page, print_wait_stats
+from pacing import get_pacing, get_worker_pacing, save_pacing, print_pacing_stats
+from seen_store import SeenStore, drop_reported
+from near_dup import fold_near_duplicates, commit_near_duplicates, print_near_dup_stats
+from job_identity import normalize_url, extract_company, cache_stats
+from history_store import append_history, print_history_stats
 
 load_dotenv(Path(__file__).with_name(".env"), override=True)
 
@@ -23,6 +36,7 @@ OUTPUT_DIR = os.getenv('OUTPUT_DIR', 'gmp_jobs_output')
 DELAY_BETWEEN_SEARCHES = int(os.getenv('DELAY_BETWEEN_SEARCHES', 5))
 MAX_RESULTS_PER_QUERY = int(os.getenv('MAX_RESULTS_PER_QUERY', 30))
 HOURS_LOOKBACK = int(os.getenv('HOURS_LOOKBACK', 48))
+SEEN_NAMESPACE = 'seen_jobs_gmp'   # jobs reported on earlier days (seen_store.py)
 
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
@@ -44,6 +58,9 @@ SENIOR_PATTERNS = [
 
 ENTRY_HINTS = ["associate", "entry level", "junior", " i ", "level 1"]
 
+# Target ATS platforms
+TARGET_ATS = ['myworkdayjobs.com', 'icims.com', 'greenhouse.io', 'lever.co']
+
 # Searches by category
 SEARCHES_BY_CATEGORY = {
     'gmp_qa_associate': [
@@ -65,12 +82,17 @@ SEARCHES_BY_CATEGORY = {
 }
 
 
-def setup_brave_driver():
-    """Setup Brave browser"""
-    brave_path = "/Applications/Brave Browser.app/Contents/MacOS/Brave Browser"
+def setup_brave_driver(headless=False):
+    """Setup Brave browser (headless for pool workers; warm browser service if BROWSER_SERVICE=1)"""
+    if BROWSER_SERVICE and not headless:
+        driver = attach_driver()
+        if driver is not None:
+            return driver
+
+    brave_path = find_browser_binary()
 
-    if not os.path.exists(brave_path):
-        print("ERROR: Brave not found at:", brave_path)
+    if brave_path is None:
+        print("ERROR: no Brave/Chrome/Chromium binary found (set BROWSER_BINARY)")
         exit(1)
 
     options = Options()
@@ -78,6 +100,9 @@ def setup_brave_driver():
     options.add_argument('--disable-blink-features=AutomationControlled')
     options.add_argument('--no-sandbox')
     options.add_argument('--start-maximized')
+    if headless:
+        options.add_argument('--headless=new')
+        options.add_argument('--window-size=1920,1080')
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option('useAutomationExtension', False)
 
@@ -89,34 +114,6 @@ def setup_brave_driver():
         exit(1)
 
 
-def normalize_url(url):
-    """Remove # anchors and tracking params"""
-    if not url or '#' not in url:
-        return url
-    return url.split('#')[0].rstrip('/')
-
-
-def extract_company(url):
-    """Extract company name from URL"""
-    if 'myworkdayjobs.com' in url:
-        match = re.search(r'//([^.]+)\.wd\d+\.myworkdayjobs', url)
-        if match:
-            return match.group(1).title()
-
-    if 'icims.com' in url:
-        match = re.search(r'//([^.]+)\.icims', url)
-        if match:
-            company = match.group(1).replace('careers-', '').replace('uscareers-', '')
-            return company.title()
-
-    if 'greenhouse.io' in url:
-        match = re.search(r'boards\.greenhouse\.io/([^/]+)', url)
-        if match:
-            return match.group(1).replace('-', ' ').title()
-
-    return "Unknown"
-
-
 def is_senior_role(title):
     """Check if senior role"""
     title_lower = title.lower()
@@ -125,106 +122,164 @@ def is_senior_role(title):
     return any(re.search(pattern, title_lower) for pattern in SENIOR_PATTERNS)
 
 
-def google_search(driver, query, date_filter, max_results=30):
+def iter_serp_pages(driver, query, date_filter, max_pages=3):
     """
-    Search Google with after:DATE filter
-    date_filter: YYYY-MM-DD format (e.g., "2026-01-29")
+    Yield each result page as a list of (title, url, snippet). Lazy: the next page is only
+    loaded when the caller asks for it
     """
-    jobs = []
-    seen_urls = set()
+    start_query()
+    if SERP_LITE:
+        # One direct-URL load with up to 100 results instead of homepage + submit + pnnext
+        yield from iter_lite_pages(driver, query, date_filter, ('div.tF2Cxc',), max_pages * 10)
+        return
 
-    try:
+    cache = get_cache()
+
+    # Replay cached SERP pages for the same query/date instead of hitting Google again
+    cached_html = cache.get('google_serp', query, 0, date_filter)
+
+    # Add after:DATE to filter last 48 hours
+    query_with_filter = f"{query} after:{date_filter}"
+
+    if cached_html is None:
+        begin_query('classic')
         driver.get("https://www.google.com")
-        time.sleep(2)
+        wait_for_search_box(driver)
+        record_load(driver, 'classic')
 
         search_box = driver.find_element(By.NAME, "q")
         search_box.clear()
 
-        # Add after:DATE to filter last 48 hours
-        query_with_filter = f"{query} after:{date_filter}"
         search_box.send_keys(query_with_filter)
         search_box.send_keys(Keys.RETURN)
 
         print(f"    Query: {query_with_filter}")
-        time.sleep(4)
+        wait_for_results(driver, ('div.tF2Cxc',))
+        record_load(driver, 'classic')
+    else:
+        print(f"    Query: {query_with_filter} (cached)")
+
+    for page in range(max_pages):
+        if cached_html is not None:
+            results = [(r['title'], r['url'], r['snippet'])
+                       for r in parse_serp_html(cached_html, selectors=('div.tF2Cxc',))]
+            print(f"    Page {page + 1}: {len(results)} result containers (cached)")
+        else:
+            # Correct selector: div.tF2Cxc (Google's current HTML) - one script call per page
+            containers, results = extract_page(driver, ('div.tF2Cxc',))
 
-        page = 0
+            print(f"    Page {page + 1}: {containers} result containers")
 
-        while len(jobs) < max_results and page < 3:
-            # Correct selector: div.tF2Cxc (Google's current HTML)
-            results = driver.find_elements(By.CSS_SELECTOR, 'div.tF2Cxc')
+            # Empty pages may be CAPTCHA/consent walls, so only cache real results
+            if containers:
+                cache.put('google_serp', query, page * 10, date_filter, driver.page_source)
 
-            print(f"    Page {page + 1}: {len(results)} result containers")
+        if not results:
+            print("    No more results")
+            return
 
-            if not results:
-                print("    No more results")
-                break
+        yield results
+
+        # Try next page
+        if page + 1 >= max_pages:
+            return
+
+        if cached_html is not None:
+            cached_html = cache.get('google_serp', query, (page + 1) * 10, date_filter)
+            if cached_html is None:
+                print("    No next page (cached)")
+                return
+            continue
 
-            for result in results:
-                if len(jobs) >= max_results:
-                    break
-
-                try:
-                    # Extract title (h3 tag)
-                    h3 = result.find_element(By.CSS_SELECTOR, 'h3')
-                    title = h3.text.strip()
-
-                    # Extract URL (parent a tag)
-                    link = result.find_element(By.CSS_SELECTOR, 'a')
-                    url = link.get_attribute('href')
-
-                    # Validate
-                    if not title or not url or len(title) < 5:
-                        continue
-
-                    if not url.startswith('http'):
-                        continue
-
-                    # Must be from target ATS platforms
-                    if not any(ats in url for ats in ['myworkdayjobs.com', 'icims.com',
-                                                      'greenhouse.io', 'lever.co']):
-                        continue
-
-                    # Deduplicate by base URL (removes #text anchors)
-                    normalized = normalize_url(url)
-                    if normalized in seen_urls:
-                        continue
-                    seen_urls.add(normalized)
-
-                    # Filter senior roles
-                    if is_senior_role(title):
-                        print(f"    SKIP (senior): {title[:55]}")
-                        continue
-
-                    # Extract company
-                    company = extract_company(url)
-
-                    print(f"    ✓ {company} - {title[:60]}")
-
-                    jobs.append({
-                        'title': title,
-                        'company': company,
-                        'url': url
-                    })
-
-                except Exception as e:
-                    continue
-
-            # Try next page
-            if len(jobs) < max_results and page < 2:
-                try:
-                    next_btn = driver.find_element(By.ID, "pnnext")
-                    next_btn.click()
-                    time.sleep(4)
-                    page += 1
-                    print(f"    → Going to page {page + 1}")
-                except:
-                    print("    No next page")
-                    break
-            else:
+        try:
+            next_btn = driver.find_element(By.ID, "pnnext")
+            click_next_page(driver, next_btn, ('div.tF2Cxc',))
+            record_load(driver, 'classic')
+            print(f"    → Going to page {page + 2}")
+        except:
+            print("    No next page")
+            return
+
+
+def select_jobs(pages, max_results=30):
+    """Filter result pages into jobs (deduplicated within the query). Stops pulling pages once full"""
+    jobs = []
+    seen_urls = set()
+
+    for results in pages:
+        for title, url, snippet in results:
+            if len(jobs) >= max_results:
                 break
 
-        return jobs
+            # Validate
+            if not title or not url or len(title) < 5:
+                continue
+
+            if not url.startswith('http'):
+                continue
+
+            # Must be from target ATS platforms
+            if not any(ats in url for ats in TARGET_ATS):
+                continue
+
+            # Remember the board for direct polling
+            get_registry().record_url(url, extract_company(url))
+
+            # Deduplicate by base URL (removes #text anchors)
+            normalized = normalize_url(url)
+            if normalized in seen_urls:
+                continue
+            seen_urls.add(normalized)
+
+            # Filter senior roles
+            if is_senior_role(title):
+                print(f"    SKIP (senior): {title[:55]}")
+                continue
+
+            # Extract company
+            company = extract_company(url)
+
+            print(f"    ✓ {company} - {title[:60]}")
+
+            jobs.append({
+                'title': title,
+                'company': company,
+                'url': url,
+                'snippet': snippet
+            })
+
+        if len(jobs) >= max_results:
+            break
+
+    return jobs
+
+
+def pages_full(pages, max_results=30):
+    """Pool stop predicate: select_jobs replayed (same filters, dedup before the senior check) is full"""
+    seen = set()
+    kept = 0
+    for results in pages:
+        for title, url, _ in results:
+            if not title or not url or len(title) < 5 or not url.startswith('http'):
+                continue
+            if not any(ats in url for ats in TARGET_ATS):
+                continue
+            normalized = normalize_url(url)
+            if normalized in seen:
+                continue
+            seen.add(normalized)
+            if not is_senior_role(title):
+                kept += 1
+    return kept >= max_results
+
+
+def google_search(driver, query, date_filter, max_results=30):
+    """
+    Search Google with after:DATE filter
+    date_filter: YYYY-MM-DD format (e.g., "2026-01-29")
+    """
+    try:
+        return select_jobs(iter_serp_pages(driver, query, date_filter), max_results)
 
     except Exception as e:
         print(f"    Error: {str(e)[:80]}")
@@ -240,7 +295,8 @@ def save_category_csv(jobs, category_name):
     filename = f"{OUTPUT_DIR}/{category_name}_{timestamp}.csv"
 
     with open(filename, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=['title', 'company', 'url', 'ats', 'date_found'])
+        writer = csv.DictWriter(f, fieldnames=['title', 'company', 'url', 'ats', 'date_found'],
+                                extrasaction='ignore')   # snippet: near-dup folding and history only
         writer.writeheader()
 
         for job in jobs:
@@ -258,10 +314,25 @@ def main():
     print(f"Output: {OUTPUT_DIR}/")
     print("=" * 70)
 
-    driver = setup_brave_driver()
+    # Delay between searches: fixed, or AIMD on block signals (ADAPTIVE_PACING=1)
+    pacing = get_pacing('gmp', DELAY_BETWEEN_SEARCHES)
+
+    # Worker pool: fetch every query's pages in parallel, then replay them in order below
+    driver = None
+    pooled = None
+    if BROWSER_WORKERS > 1:
+        queries = [s['query'] for searches in SEARCHES_BY_CATEGORY.values() for s in searches]
+        print(f"Browser pool: {BROWSER_WORKERS} workers, {len(queries)} queries")
+        pooled = iter(collect_pages(queries, lambda: setup_brave_driver(headless=BROWSER_HEADLESS),
+                                    lambda d, q: iter_serp_pages(d, q, date_filter), get_worker_pacing,
+                                    ('div.tF2Cxc',), BROWSER_WORKERS,
+                                    stop=lambda pages: pages_full(pages, MAX_RESULTS_PER_QUERY)))
+    else:
+        driver = setup_brave_driver()
     print("Browser ready!\n")
 
     category_results = {}
+    seen_store = SeenStore(SEEN_NAMESPACE)
 
     try:
         for category_name, searches in SEARCHES_BY_CATEGORY.items():
@@ -274,13 +345,24 @@ def main():
             for idx, search_config in enumerate(searches, 1):
                 print(f"\n[{idx}/{len(searches)}] {search_config['ats']}")
 
-                jobs = google_search(
-                    driver,
-                    search_config['query'],
-                    date_filter,  # Pass calculated date
-                    MAX_RESULTS_PER_QUERY
-                )
-
+                if pooled is not None:
+                    pages, error, signal = next(pooled)
+                    if signal == 'blocked':
+                        print("   Block page (pool worker) - no results for this query")
+                    jobs = replay(pages, error, lambda p: select_jobs(p, MAX_RESULTS_PER_QUERY),
+                                  MAX_RESULTS_PER_QUERY)
+                else:
+                    jobs = google_search(
+                        driver,
+                        search_config['query'],
+                        date_filter,  # Pass calculated date
+                        MAX_RESULTS_PER_QUERY
+                    )
+                    signal = pacing.observe_query(driver, ('div.tF2Cxc',))
+
+                # Jobs already reported on an earlier day are dropped
+                jobs = drop_reported(jobs, seen_store, lambda job: normalize_url(job['url']))
+                jobs = fold_near_duplicates(jobs, 'gmp', lambda job: normalize_url(job['url']))
                 if jobs:
                     for job in jobs:
                         job['ats'] = search_config['ats']
@@ -291,15 +373,18 @@ def main():
                 else:
                     print(f"   No jobs found")
 
-                if idx < len(searches):
-                    print(f"   Waiting {DELAY_BETWEEN_SEARCHES}s...")
-                    time.sleep(DELAY_BETWEEN_SEARCHES)
+                # Cache hits fetched nothing: no delay owed
+                if idx < len(searches) and pooled is None and signal is not None:
+                    delay = pacing.next_delay()
+                    print(f"   Waiting {delay:.0f}s...")
+                    time.sleep(delay)
 
             if category_jobs:
                 filename = save_category_csv(category_jobs, category_name)
                 category_results[category_name] = {
                     'count': len(category_jobs),
-                    'file': filename
+                    'file': filename,
+                    'jobs': category_jobs
                 }
                 print(f"\n✓ Saved {len(category_jobs)} jobs → {filename}")
 
@@ -323,11 +408,27 @@ def main():
             print("No jobs found in last 48 hours")
             print(f"\nTip: Try increasing HOURS_LOOKBACK to 72 or 168 in .env")
 
+        for category, result in category_results.items():
+            append_history(result['jobs'], 'gmp', category)
+        seen_store.commit()
+        commit_near_duplicates()
+        save_registry()
+        print_registry_stats()
+        print(seen_store.summary())
+        print_near_dup_stats()
+        print_history_stats()
+        print(cache_stats())
+        print_cache_stats()
+        print_wait_stats()
+        print_load_stats()
+        save_pacing()
+        print_pacing_stats()
         print("\n" + "=" * 70)
 
     finally:
         print("\nClosing browser...")
-        driver.quit()
+        if driver is not None:
+            driver.quit()
         print("Done!")
 
 
@@ -445,9 +445,23 @@ from datetime import datetime
 import json
 import os
 import re
-from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+from job_identity import extract_job_id, extract_company_name, cache_stats
+from history_store import append_history, print_history_stats
 from pathlib import Path
 from dotenv import load_dotenv
+from async_search import search_all
+from http_transport import http_get, print_transport_stats
+from response_cache import get_cache, print_cache_stats
+from seen_store import open_seen_store
+from near_dup import fold_near_duplicates, commit_near_duplicates, print_near_dup_stats
+from adaptive_pagination import (MAX_START, next_page_decision, record_page_yield,
+                                 page_yield_summary, print_pagination_stats)
+from query_planner import plan_queries, split_results
+from ats_connectors import BOARD_ROLE, parse_board_spec, poll_boards, board_results
+from board_registry import get_registry, save_registry, print_registry_stats
+from board_sync import load_cursors, save_cursors, sync_boards, delta_polled
+from run_journal import RunJournal
+from revisit_scheduler import DAEMON_MODE, REVISIT_MIN_MINUTES, RevisitSchedule, run_daemon
 
 # Load environment variables
 load_dotenv(Path(__file__).with_name(".env"), override=True)
@@ -458,6 +472,13 @@ SEARCH_ENGINE_ID = os.getenv('SEARCH_ENGINE_ID')
 OUTPUT_FILE = os.getenv('OUTPUT_FILE', 'ai_ml_jobs.csv')
 SEEN_JOBS_FILE = os.getenv('SEEN_JOBS_FILE', 'seen_jobs.json')
 DELAY_BETWEEN_SEARCHES = int(os.getenv('DELAY_BETWEEN_SEARCHES', 2))
+SEARCH_CONCURRENCY = int(os.getenv('SEARCH_CONCURRENCY', 1))  # >1 enables the async engine
+SEARCH_QPS = float(os.getenv('SEARCH_QPS', 5))
+ADAPTIVE_PAGINATION = os.getenv('ADAPTIVE_PAGINATION', '1') == '1'
+MINIMIZE_QUERIES = os.getenv('MINIMIZE_QUERIES', '0') == '1'
+ATS_BOARDS = os.getenv('ATS_BOARDS', '')  # e.g. greenhouse:anthropic,ashby:openai
+ATS_DISCOVER_BOARDS = os.getenv('ATS_DISCOVER_BOARDS', '0') == '1'  # also poll boards from the registry
+BOARD_SYNC = os.getenv('BOARD_SYNC', '1') == '1'  # score only added/changed postings, mark closed ones
 
 if not GOOGLE_API_KEY or not SEARCH_ENGINE_ID:
     raise ValueError("Missing GOOGLE_API_KEY or SEARCH_ENGINE_ID in .env")
@@ -550,109 +571,82 @@ SEARCHES = [
 ]
 
 
-def normalize_url(url):
-    """Normalize URL for deduplication by removing tracking parameters"""
-    parsed = urlparse(url)
-    query_params = parse_qs(parsed.query)
-
-    clean_params = {k: v for k, v in query_params.items()
-                    if not k.startswith('utm_') and k not in ['ref', 'source', 'lever-source']}
-
-    clean_query = urlencode(clean_params, doseq=True)
-
-    return urlunparse((
-        parsed.scheme.lower(),
-        parsed.netloc.lower(),
-        parsed.path.rstrip('/'),
-        '',
-        clean_query,
-        ''
-    ))
-
-
-def extract_job_id(url):
-    """Extract unique job ID from ATS URLs"""
-    if 'greenhouse.io' in url:
-        match = re.search(r'/jobs/(\d+)', url)
-        if match:
-            return f"greenhouse_{match.group(1)}"
-
-    if 'ashbyhq.com' in url:
-        match = re.search(r'/([a-f0-9\-]{36})', url)
-        if match:
-            return f"ashby_{match.group(1)}"
-
-    if 'lever.co' in url:
-        match = re.search(r'/([a-f0-9\-]+)(?:/apply)?$', url)
-        if match:
-            return f"lever_{match.group(1)}"
-
-    if 'myworkdayjobs.com' in url:
-        match = re.search(r'/job/[^/]+/([^/]+)', url)
-        if match:
-            return f"workday_{match.group(1)}"
-
-    return normalize_url(url)
-
-
 def load_seen_jobs():
-    """Load previously seen job IDs"""
-    if os.path.exists(SEEN_JOBS_FILE):
-        with open(SEEN_JOBS_FILE, 'r') as f:
-            return set(json.load(f))
-    return set()
+    """Load previously seen job IDs (SQLite store; SEEN_JOBS_FILE is imported on first use)"""
+    return open_seen_store(SEEN_JOBS_FILE)
 
 
 def save_seen_jobs(seen_jobs):
-    """Save seen job IDs to file"""
-    with open(SEEN_JOBS_FILE, 'w') as f:
-        json.dump(list(seen_jobs), f, indent=2)
+    """Save seen job IDs to file (commits only what changed this run)"""
+    seen_jobs.commit()
 
 
-def search_google_paginated(query, api_key, search_engine_id, date_restrict='d1', max_results=30):
-    """Execute Google Custom Search with pagination (up to 30 results)"""
+def search_google_paginated(query, api_key, search_engine_id, date_restrict='d1', max_results=30,
+                            page_yield=None):
+    """
+    Execute Google Custom Search with pagination (up to 30 results)
+    page_yield: optional callback(items) -> (new passing jobs, mean fit). When given,
+    paging is yield-driven: stop on a dry page, go past 30 results while pages stay productive
+    """
     base_url = "https://www.googleapis.com/customsearch/v1"
     all_items = []
+    cache = get_cache()
 
-    # Google allows 10 results per page, starting at 1, 11, 21
-    for start in [1, 11, 21]:
-        if len(all_items) >= max_results:
-            break
-
-        params = {
-            'key': api_key,
-            'cx': search_engine_id,
-            'q': query,
-            'dateRestrict': date_restrict,
-            'num': 10,
-            'start': start
-        }
-
-        try:
-            response = requests.get(base_url, params=params, timeout=10)
+    # Google allows 10 results per page, starting at 1, 11, 21 ... 91
+    starts = range(1, MAX_START + 1, 10) if page_yield else [1, 11, 21]
 
-            if response.status_code != 200:
-                try:
-                    error_data = response.json()
-                    error_msg = error_data.get('error', {}).get('message', 'Unknown error')
-                except:
-                    error_msg = response.text[:100]
+    for start in starts:
+        if page_yield is None and len(all_items) >= max_results:
+            break
 
-                print(f"   HTTP {response.status_code} at page {start // 10 + 1}: {error_msg}")
+        # Serve repeated query/page/date combinations from the on-disk cache
+        cached = cache.get('customsearch', query, start, date_restrict)
+        if cached is not None:
+            data = json.loads(cached)
+        else:
+            params = {
+                'key': api_key,
+                'cx': search_engine_id,
+                'q': query,
+                'dateRestrict': date_restrict,
+                'num': 10,
+                'start': start
+            }
+
+            try:
+                response = http_get(base_url, params=params, timeout=10)
+
+                if response.status_code != 200:
+                    try:
+                        error_data = response.json()
+                        error_msg = error_data.get('error', {}).get('message', 'Unknown error')
+                    except:
+                        error_msg = response.text[:100]
+
+                    print(f"   HTTP {response.status_code} at page {start // 10 + 1}: {error_msg}")
+                    break
+
+                data = response.json()
+                cache.put('customsearch', query, start, date_restrict, response.text)
+
+            except requests.exceptions.RequestException as e:
+                print(f"   Request error at page {start // 10 + 1}: {str(e)[:60]}")
                 break
 
-            data = response.json()
+            time.sleep(0.5)
 
-            if 'items' in data:
-                all_items.extend(data['items'])
-            else:
-                break
-
-        except requests.exceptions.RequestException as e:
-            print(f"   Request error at page {start // 10 + 1}: {str(e)[:60]}")
+        if 'items' not in data:
             break
-
-        time.sleep(0.5)
+        all_items.extend(data['items'])
+
+        if page_yield is not None:
+            new_jobs, mean_fit = page_yield(data['items'])
+            keep_going, reason = next_page_decision(start, len(data['items']), new_jobs, mean_fit, max_results)
+            record_page_yield(query, start, len(data['items']), new_jobs, mean_fit, reason,
+                              cached=cached is not None)
+            if not keep_going:
+                print(f"   Page {start // 10 + 1}: {new_jobs} new, stopping ({reason})")
+                break
 
     return {'items': all_items} if all_items else None
 
@@ -732,36 +726,7 @@ def compute_fit_score(title, snippet):
     return score, ", ".join(reasons), keywords_str
 
 
-def extract_company_name(url, title):
-    """Extract company name from URL or title"""
-    if 'ashbyhq.com' in url:
-        match = re.search(r'jobs\.ashbyhq\.com/([^/]+)', url)
-        if match:
-            return match.group(1).replace('-', ' ').title()
-
-    if 'greenhouse.io' in url:
-        match = re.search(r'boards\.greenhouse\.io/([^/]+)', url)
-        if match:
-            return match.group(1).replace('-', ' ').title()
-
-    if 'lever.co' in url:
-        match = re.search(r'jobs\.lever\.co/([^/]+)', url)
-        if match:
-            return match.group(1).replace('-', ' ').title()
-
-    # Extract from title patterns
-    if ' at ' in title:
-        return title.split(' at ')[-1].strip()
-
-    if ' - ' in title:
-        parts = title.split(' - ')
-        if len(parts) > 1:
-            return parts[-1].strip()
-
-    return "Unknown"
-
-
-def parse_job_results(results, metadata):
+def parse_job_results(results, metadata, verbose=True):
     """Parse search results with filtering and scoring"""
     jobs = []
 
@@ -775,12 +740,14 @@ def parse_job_results(results, metadata):
 
         # Filter 1: Senior roles
         if is_senior_role(title):
-            print(f"   FILTERED (senior): {title[:60]}")
+            if verbose:
+                print(f"   FILTERED (senior): {title[:60]}")
             continue
 
         # Filter 2: Non-US locations
         if not is_us_location(title, snippet):
-            print(f"   FILTERED (non-US): {title[:60]}")
+            if verbose:
+                print(f"   FILTERED (non-US): {title[:60]}")
             continue
 
         # Compute fit score
@@ -788,7 +755,8 @@ def parse_job_results(results, metadata):
 
         # Filter 3: Low fit score
         if fit_score < 35:
-            print(f"   FILTERED (fit={fit_score}): {title[:60]}")
+            if verbose:
+                print(f"   FILTERED (fit={fit_score}): {title[:60]}")
             continue
 
         job_id = extract_job_id(url)
@@ -836,31 +804,136 @@ def save_to_csv(jobs, filename):
             writer.writerow(row)
 
 
-def main():
-    """Main execution"""
+def daemon_main():
+    """Continuous mode: each query on its own revisit interval (dateRestrict d1 is relative to each request)"""
     print("=" * 70)
-    print("AI/ML JOB SCRAPER")
+    print("AI/ML JOB SCRAPER - DAEMON MODE")
     print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"Queries: {len(SEARCHES)}")
     print(f"Output: {OUTPUT_FILE}")
     print("=" * 70)
 
     seen_jobs = load_seen_jobs()
-    all_new_jobs = []
+    registry = get_registry()
+    search_plan = plan_queries(SEARCHES) if MINIMIZE_QUERIES else SEARCHES
+    configs = {f"quick|{config['query']}": config for config in search_plan}
+    schedule = RevisitSchedule(configs)
+    print(schedule.summary())
 
-    for idx, search_config in enumerate(SEARCHES, 1):
-        print(
-            f"\n[{idx}/{len(SEARCHES)}] {search_config['role']} | {search_config['location']} | {search_config['ats']}")
+    # A revisit must see fresh results, not the response cached on the previous visit
+    get_cache().limit_ttl(REVISIT_MIN_MINUTES * 60 / 2)
 
+    def run_query(key):
+        search_config = configs[key]
         results = search_google_paginated(
             query=search_config['query'],
             api_key=GOOGLE_API_KEY,
             search_engine_id=SEARCH_ENGINE_ID,
             max_results=30
         )
+        if not results:
+            return 0
+
+        for item in results['items']:
+            registry.record_url(item.get('link', ''), extract_company_name(item.get('link', ''), item.get('title', '')))
+
+        jobs = []
+        for source, sub_results in split_results(results, search_config):
+            jobs.extend(parse_job_results(sub_results, source, verbose=False))
+        new_jobs = [job for job in jobs if job['job_id'] not in seen_jobs]
+        seen_jobs.update(job['job_id'] for job in new_jobs)
+        new_jobs = fold_near_duplicates(new_jobs, 'quick', lambda job: job['job_id'])
+
+        # Written as found: no end-of-run burst, nothing lost on restart
+        if new_jobs:
+            save_to_csv(new_jobs, OUTPUT_FILE)
+            append_history(new_jobs, 'quick')
+            commit_near_duplicates()
+            for job in new_jobs:
+                print(f"   [{job['fit_score']}] {job['company']} - {job['title'][:50]}")
+        save_seen_jobs(seen_jobs)
+        return len(new_jobs)
+
+    try:
+        run_daemon(schedule, run_query, lambda: DELAY_BETWEEN_SEARCHES)
+    finally:
+        save_registry()
+        print(schedule.summary())
+        print(seen_jobs.summary())
+        print_near_dup_stats()
+        print_history_stats()
+        print(cache_stats())
+        print_cache_stats()
+        print_transport_stats()
+
+
+def main():
+    """Main execution"""
+    print("=" * 70)
+    print("AI/ML JOB SCRAPER")
+    print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Queries: {len(SEARCHES)}")
+    print(f"Output: {OUTPUT_FILE}")
+    print("=" * 70)
+
+    seen_jobs = load_seen_jobs()
+    all_new_jobs = []
+    registry = get_registry()
+
+    search_plan = SEARCHES
+    if MINIMIZE_QUERIES:
+        search_plan = plan_queries(SEARCHES)
+        print(f"Query plan: {len(SEARCHES)} -> {len(search_plan)} queries")
+
+    # Checkpoints: a restarted run today skips queries already completed
+    journal = RunJournal('quick', datetime.now().strftime('%Y-%m-%d'))
+
+    # Concurrent mode: fetch every query up front, then parse in order
+    prefetched = None
+    if SEARCH_CONCURRENCY > 1:
+        pending = [config for n, config in enumerate(search_plan, 1) if not journal.done(f"{n}|{config['query']}")]
+        print(f"Concurrent search: {SEARCH_CONCURRENCY} workers, {SEARCH_QPS} QPS cap")
+        fetched = search_all(pending, GOOGLE_API_KEY, SEARCH_ENGINE_ID,
+                             qps=SEARCH_QPS, concurrency=SEARCH_CONCURRENCY, max_results=30)
+        prefetched = {id(config): results for config, results in zip(pending, fetched)}
+
+    for idx, search_config in enumerate(search_plan, 1):
+        print(
+            f"\n[{idx}/{len(search_plan)}] {search_config['role']} | {search_config['location']} | {search_config['ats']}")
+
+        key = f"{idx}|{search_config['query']}"
+        checkpoint = journal.done(key)
+        if checkpoint is not None:
+            all_new_jobs.extend(checkpoint['jobs'])
+            seen_jobs.update(checkpoint['seen'])
+            print(f"   Restored from journal: {len(checkpoint['jobs'])} new jobs")
+            continue
+
+        if prefetched is not None:
+            results = prefetched[id(search_config)]
+        else:
+            page_yield = None
+            if ADAPTIVE_PAGINATION:
+                def page_yield(items, metadata=search_config):
+                    jobs = [job for source, sub_results in split_results({'items': items}, metadata)
+                            for job in parse_job_results(sub_results, source, verbose=False)]
+                    return page_yield_summary(jobs, seen_jobs)
+
+            results = search_google_paginated(
+                query=search_config['query'],
+                api_key=GOOGLE_API_KEY,
+                search_engine_id=SEARCH_ENGINE_ID,
+                max_results=30,
+                page_yield=page_yield
+            )
 
         if results:
-            jobs = parse_job_results(results, search_config)
+            # Every ATS URL teaches us a board we can poll directly later
+            for item in results['items']:
+                registry.record_url(item.get('link', ''), extract_company_name(item.get('link', ''), item.get('title', '')))
+
+            jobs = []
+            for source, sub_results in split_results(results, search_config):
+                jobs.extend(parse_job_results(sub_results, source))
             new_jobs = [job for job in jobs if job['job_id'] not in seen_jobs]
 
             if new_jobs:
@@ -869,17 +942,82 @@ def main():
                 seen_jobs.update([job['job_id'] for job in new_jobs])
             else:
                 print(f"   No new jobs")
+
+            # Only queries that returned results are checkpointed: an empty result may be a
+            # quota/HTTP error, and a retried empty query is served from the response cache
+            journal.record(key, new_jobs, [job['job_id'] for job in new_jobs])
         else:
             print(f"   No results")
 
-        time.sleep(DELAY_BETWEEN_SEARCHES)
+        if prefetched is None:
+            time.sleep(DELAY_BETWEEN_SEARCHES)
+
+    # Direct board polling: every opening on a board in one request
+    boards = parse_board_spec(ATS_BOARDS)
+    if ATS_DISCOVER_BOARDS:
+        boards += [b for b in registry.boards_to_poll() if b not in boards]
+
+    closed_jobs = []
+    cursors = None
+    if boards:
+        print(f"\nPolling {len(boards)} ATS boards")
+        if BOARD_SYNC:
+            # Saved only once the delta is in the CSV and the seen store: a crash before
+            # that re-reports the same delta next run instead of losing it
+            cursors = load_cursors()
+            synced = sync_boards(boards, cursors)
+            polled = delta_polled(synced)
+            for (ats, slug), delta, listed, error in synced:
+                registry.record_poll((ats, slug), listed, error)
+                if error:
+                    print(f"   {ats}:{slug} failed: {error}")
+                    continue
+                print(f"   {ats}:{slug}: {listed} listed, +{len(delta['added'])} added, "
+                      f"~{len(delta['changed'])} changed, -{len(delta['removed'])} closed")
+                # Only postings this scraper reported get a Closed row, never ones it filtered out
+                for posting in delta['removed']:
+                    if extract_job_id(posting['link']) not in seen_jobs:
+                        continue
+                    closed_jobs.append({
+                        'fit_score': '', 'title': posting['title'],
+                        'company': extract_company_name(posting['link'], posting['title']),
+                        'location': posting['location'], 'role_category': BOARD_ROLE, 'ats': ats.title(),
+                        'keywords_matched': '', 'fit_reasons': '', 'url': posting['link'],
+                        'date_found': datetime.now().strftime('%Y-%m-%d %H:%M'), 'status': 'Closed', 'snippet': ''
+                    })
+        else:
+            polled = poll_boards(boards)
+            for (ats, slug), items, error in polled:
+                registry.record_poll((ats, slug), len(items), error)
+                if error:
+                    print(f"   {ats}:{slug} failed: {error}")
+
+        board_new = 0
+
+        for metadata, results in board_results(polled):
+            jobs = parse_job_results(results, metadata, verbose=False)
+            new_jobs = [job for job in jobs if job['job_id'] not in seen_jobs]
+            all_new_jobs.extend(new_jobs)
+            seen_jobs.update([job['job_id'] for job in new_jobs])
+            board_new += len(new_jobs)
+
+        print(f"   {sum(len(items) for _, items, _ in polled)} postings scored, {board_new} new high-fit jobs")
+        if closed_jobs:
+            save_to_csv(closed_jobs, OUTPUT_FILE)
+            append_history(closed_jobs, 'quick')
+            print(f"   {len(closed_jobs)} closed postings marked in {OUTPUT_FILE}")
 
     # Sort by fit score descending
     all_new_jobs.sort(key=lambda x: x['fit_score'], reverse=True)
 
+    # Copies of one posting (other ATS, location, repost) fold into the first/best-scored one
+    all_new_jobs = fold_near_duplicates(all_new_jobs, 'quick', lambda job: job['job_id'])
+
     if all_new_jobs:
         save_to_csv(all_new_jobs, OUTPUT_FILE)
+        append_history(all_new_jobs, 'quick')
         save_seen_jobs(seen_jobs)
+        commit_near_duplicates()
 
         print("\n" + "=" * 70)
         print(f"SUCCESS: Found {len(all_new_jobs)} high-fit jobs")
@@ -887,13 +1025,35 @@ def main():
         print(f"Saved to: {OUTPUT_FILE}")
         print("=" * 70)
     else:
+        save_seen_jobs(seen_jobs)  # refreshes last_seen of jobs seen again
         print("\n" + "=" * 70)
         print("No new jobs found this run")
         print("=" * 70)
 
+    if cursors is not None:
+        save_cursors(cursors)
+
+    # CSV is written and seen IDs committed: the next run starts a fresh journal
+    print(journal.summary())
+    journal.finish()
+
+    save_registry()
+
+    print_pagination_stats()
+    print_registry_stats()
+    print(seen_jobs.summary())
+    print_near_dup_stats()
+    print_history_stats()
+    print(cache_stats())
+    print_cache_stats()
+    print_transport_stats()
+
 
 if __name__ == "__main__":
-    main()
+    if DAEMON_MODE:
+        daemon_main()
+    else:
+        main()
 
 
 # ## Required .env File
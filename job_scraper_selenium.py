@@ -6,14 +6,21 @@ Uses undetected-chromedriver to bypass Google's bot detection
 
 import time
 import csv
-import json
 import os
 from datetime import datetime
 from urllib.parse import urlparse
 import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
 from bs4 import BeautifulSoup
-import requests
+from http_transport import print_transport_stats
+from detail_fetcher import get_detail_fetcher, print_detail_stats
+from browser_service import BROWSER_SERVICE, attach_driver
+from page_ready import wait_for_results, print_wait_stats
+from pacing import get_pacing, save_pacing, print_pacing_stats
+from seen_store import open_seen_store
+from job_identity import normalize_url, resolve, cache_stats
+from history_store import append_history, print_history_stats
+from near_dup import fold_near_duplicates, commit_near_duplicates, print_near_dup_stats
 
 OUTPUT_FILE = "ai_ml_jobs_undetected.csv"
 SEEN_JOBS_FILE = "seen_jobs_undetected.json"
@@ -37,7 +44,12 @@ SEARCH_QUERIES = [
 
 
 def setup_driver():
-    """Setup undetected Chrome"""
+    """Setup undetected Chrome (or attach to the warm browser service if BROWSER_SERVICE=1)"""
+    if BROWSER_SERVICE:
+        driver = attach_driver()
+        if driver is not None:
+            return driver
+
     options = uc.ChromeOptions()
 
     # Run headless
@@ -58,8 +70,8 @@ def search_google(driver, query):
         print(f"   Navigating to Google...")
         driver.get(search_url)
 
-        # Wait for page load
-        time.sleep(3)
+        # Wait for results (or the CAPTCHA page) instead of a fixed sleep
+        wait_for_results(driver, ('div.yuRUbf', '#search a'))
 
         # Check if we got CAPTCHA
         if 'sorry' in driver.current_url or 'captcha' in driver.page_source.lower():
@@ -99,47 +111,55 @@ def search_google(driver, query):
         return []
 
 
+def parse_job_page(url, html):
+    """Parse the stable fields of a job page (cached by the detail fetcher)"""
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Extract title
+    title = None
+    for tag in ['h1', 'h2', 'h3']:
+        elem = soup.find(tag)
+        if elem and len(elem.get_text(strip=True)) > 10:
+            title = elem.get_text(strip=True)
+            break
+
+    # Extract company
+    company = extract_company_from_url(url)
+
+    # Extract location
+    location = "Not specified"
+    text = soup.get_text().lower()
+    if 'remote' in text:
+        location = "Remote"
+    elif 'new york' in text or 'nyc' in text:
+        location = "NYC"
+    elif 'san francisco' in text or 'bay area' in text:
+        location = "SF"
+    elif 'boston' in text:
+        location = "Boston"
+
+    return {
+        'title': title or 'No Title',
+        'company': company,
+        'location': location,
+        'url': url,
+        'ats': detect_ats(url)
+    }
+
+
 def extract_job_details(url):
-    """Extract job details from URL"""
+    """Extract job details from URL (conditional GET, re-parsed only when the page changed)"""
     try:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
         }
-        response = requests.get(url, timeout=10, headers=headers)
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # Extract title
-        title = None
-        for tag in ['h1', 'h2', 'h3']:
-            elem = soup.find(tag)
-            if elem and len(elem.get_text(strip=True)) > 10:
-                title = elem.get_text(strip=True)
-                break
-
-        # Extract company
-        company = extract_company_from_url(url)
-
-        # Extract location
-        location = "Not specified"
-        text = soup.get_text().lower()
-        if 'remote' in text:
-            location = "Remote"
-        elif 'new york' in text or 'nyc' in text:
-            location = "NYC"
-        elif 'san francisco' in text or 'bay area' in text:
-            location = "SF"
-        elif 'boston' in text:
-            location = "Boston"
-
-        return {
-            'title': title or 'No Title',
-            'company': company,
-            'location': location,
-            'url': url,
-            'ats': detect_ats(url),
-            'date_found': datetime.now().strftime('%Y-%m-%d %H:%M'),
-            'status': 'Not Applied'
-        }
+        details = get_detail_fetcher().fetch(url, parse_job_page, headers=headers, timeout=10)
+        if details is None:
+            return None
+
+        details['date_found'] = datetime.now().strftime('%Y-%m-%d %H:%M')
+        details['status'] = 'Not Applied'
+        return details
 
     except Exception as e:
         return None
@@ -147,18 +167,9 @@ def extract_job_details(url):
 
 def extract_company_from_url(url):
     """Extract company name"""
-    if 'ashbyhq.com' in url:
-        parts = url.split('/')
-        for i, part in enumerate(parts):
-            if 'jobs.ashbyhq.com' in url and i + 1 < len(parts):
-                return parts[i + 1].replace('-', ' ').title()
-
-    if 'greenhouse.io' in url:
-        parts = url.split('/')
-        if 'boards' in parts:
-            idx = parts.index('boards')
-            if idx + 1 < len(parts):
-                return parts[idx + 1].replace('-', ' ').title()
+    company = resolve(url).company
+    if company:
+        return company
 
     companies = {
         'openai': 'OpenAI',
@@ -177,35 +188,23 @@ def extract_company_from_url(url):
 
 def detect_ats(url):
     """Detect ATS"""
-    if 'ashbyhq' in url:
-        return 'Ashby'
-    elif 'greenhouse' in url:
-        return 'Greenhouse'
-    elif 'lever' in url:
-        return 'Lever'
-    elif 'workday' in url:
-        return 'Workday'
-    return 'Direct'
-
-
-def normalize_url(url):
-    """Normalize URL"""
+    return resolve(url).ats or 'Direct'
+
+
+def legacy_seen_key(url):
+    """Seen key written before job_identity: lower-cased scheme://host/path, no query"""
     parsed = urlparse(url)
     return f"{parsed.scheme}://{parsed.netloc}{parsed.path}".rstrip('/').lower()
 
 
 def load_seen_jobs():
-    """Load seen jobs"""
-    if os.path.exists(SEEN_JOBS_FILE):
-        with open(SEEN_JOBS_FILE, 'r') as f:
-            return set(json.load(f))
-    return set()
+    """Load seen jobs (SQLite store; SEEN_JOBS_FILE is imported on first use)"""
+    return open_seen_store(SEEN_JOBS_FILE)
 
 
 def save_seen_jobs(seen_jobs):
-    """Save seen jobs"""
-    with open(SEEN_JOBS_FILE, 'w') as f:
-        json.dump(list(seen_jobs), f)
+    """Save seen jobs (commits only what changed this run)"""
+    seen_jobs.commit()
 
 
 def save_to_csv(jobs, filename):
@@ -241,11 +240,23 @@ def main():
     seen_jobs = load_seen_jobs()
     all_new_jobs = []
 
+    # Delay between searches: fixed, or AIMD on block signals (ADAPTIVE_PACING=1)
+    pacing = get_pacing('selenium', DELAY_BETWEEN_SEARCHES)
+
     try:
         for idx, query in enumerate(SEARCH_QUERIES, 1):
             print(f"[{idx}/{len(SEARCH_QUERIES)}] {query[:60]}...")
 
             urls = search_google(driver, query)
+            signal = pacing.observe_driver(driver, ('div.yuRUbf', '#search a'))
+
+            # Blocked: back off and retry once instead of giving up on the query
+            if signal == 'blocked' and pacing.adaptive:
+                delay = pacing.next_delay()
+                print(f"   Retrying in {delay:.0f}s...")
+                time.sleep(delay)
+                urls = search_google(driver, query)
+                pacing.observe_driver(driver, ('div.yuRUbf', '#search a'))
 
             if urls:
                 print(f"   Found {len(urls)} URLs")
@@ -255,6 +266,9 @@ def main():
 
                     if normalized in seen_jobs:
                         continue
+                    if legacy_seen_key(url) in seen_jobs:
+                        seen_jobs.add(normalized)  # re-keyed: found under the new key from now on
+                        continue
 
                     job_data = extract_job_details(url)
 
@@ -267,16 +281,21 @@ def main():
 
             # Longer delay between searches
             if idx < len(SEARCH_QUERIES):
-                time.sleep(DELAY_BETWEEN_SEARCHES)
+                time.sleep(pacing.next_delay())
 
     finally:
         driver.quit()
         print("\nChrome closed.")
 
+    # Copies of one posting (other ATS, location, repost) fold into the first one found
+    all_new_jobs = fold_near_duplicates(all_new_jobs, 'selenium', lambda job: normalize_url(job['url']))
+
     # Save results
     if all_new_jobs:
         save_to_csv(all_new_jobs, OUTPUT_FILE)
+        append_history(all_new_jobs, 'selenium')
         save_seen_jobs(seen_jobs)
+        commit_near_duplicates()
 
         print("\n" + "=" * 60)
         print(f"SUCCESS! Found {len(all_new_jobs)} NEW jobs")
@@ -284,11 +303,22 @@ def main():
         print(f"Saved to: {OUTPUT_FILE}")
         print("=" * 60)
     else:
+        save_seen_jobs(seen_jobs)  # refreshes last_seen of jobs seen again
         print("\n" + "=" * 60)
         print("No new jobs found")
         print(f"Total tracked: {len(seen_jobs)}")
         print("=" * 60)
 
+    print_detail_stats()
+    print(seen_jobs.summary())
+    print_near_dup_stats()
+    print_history_stats()
+    print(cache_stats())
+    print_transport_stats()
+    print_wait_stats()
+    save_pacing()
+    print_pacing_stats()
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Job Index
+- The same opening comes back under different URLs: one company on two ATSs,
+  city-specific and "United States" copies, reposts with a fresh ID. Exact job IDs
+  can't see these, so each job is fingerprinted on (company, normalized title,
+  snippet shingles) with a MinHash signature
+- LSH: the signature is cut into bands, each band hashed into a bucket scoped to the
+  company (plus one bucket for the exact normalized title). A new job is compared
+  only with jobs sharing a bucket (sublinear lookup)
+- Candidates are verified before folding: title tokens must nearly match with the
+  same level (I/II, senior, staff, ...), and when both have snippets their
+  estimated Jaccard similarity must reach NEAR_DUP_THRESHOLD
+- A duplicate is folded into the canonical job (first seen) and left out of the
+  CSV; the alias is remembered so later runs fold it the same way
+- One namespace per scraper: a job is only folded into that scraper's own output
+- Canonical jobs not matched for NEAR_DUP_TTL_DAYS are forgotten
+- A run's folds are kept in memory and written in one short transaction by commit(),
+  so overlapping runs (other scrapers, cron) never wait on each other's whole run
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import struct
+import threading
+import time
+
+NEAR_DUP = os.getenv('NEAR_DUP', '1') == '1'
+NEAR_DUP_FILE = os.getenv('NEAR_DUP_FILE', 'near_dup.db')
+NEAR_DUP_THRESHOLD = float(os.getenv('NEAR_DUP_THRESHOLD', 0.6))    # snippet Jaccard to fold
+NEAR_DUP_TTL_DAYS = float(os.getenv('NEAR_DUP_TTL_DAYS', 60))
+TITLE_THRESHOLD = 0.8           # title token Jaccard to fold
+PERMUTATIONS = 64
+BANDS = 16                      # 16 bands x 4 rows: candidates from ~0.5 similarity
+ROWS = PERMUTATIONS // BANDS
+SHINGLE_WORDS = 3
+
+MERSENNE = (1 << 61) - 1
+_rng = [int.from_bytes(hashlib.blake2b(f"minhash-{i}".encode(), digest_size=8).digest(), 'little')
+        for i in range(2 * PERMUTATIONS)]
+PERMUTATION_PARAMS = [(_rng[2 * i] % MERSENNE | 1, _rng[2 * i + 1] % MERSENNE) for i in range(PERMUTATIONS)]
+
+COMPANY_SUFFIXES = re.compile(r'\b(inc|llc|ltd|corp|corporation|co|company|technologies|labs)\b')
+TITLE_PREFIX = re.compile(r'^(job application for|apply for|careers?:)\s+')
+TITLE_PARENS = re.compile(r'[\(\[].*?[\)\]]')
+TITLE_SEPARATORS = re.compile(r'\s+[-–—|@·]\s+|\s+at\s+')
+LOCATION_SUFFIX = re.compile(r',\s*([a-z .]+,\s*)?([a-z]{2}|usa|united states|remote)$')
+NON_WORD = re.compile(r'[^a-z0-9+#]+')
+SNIPPET_NOISE = re.compile(r'\b\d+\s+(hours?|days?|weeks?)\s+ago\b|\b[a-z]{3} \d{1,2}, \d{4}\b')
+LEVEL_TOKENS = {'i', 'ii', 'iii', 'iv', '1', '2', '3', '4', 'junior', 'jr', 'senior', 'sr', 'staff',
+                'principal', 'lead', 'intern', 'internship', 'new', 'grad', 'manager', 'director', 'head'}
+WORK_MODE_TOKENS = {'remote', 'hybrid', 'onsite'}
+
+
+def normalize_company(company):
+    company = COMPANY_SUFFIXES.sub(' ', (company or '').lower())
+    return NON_WORD.sub('', company)
+
+
+def title_tokens(title, company=''):
+    """Role part of a result title: no company/location segments, parentheticals or work mode"""
+    title = TITLE_PREFIX.sub('', (title or '').lower().strip())
+    title = TITLE_PARENS.sub(' ', title)
+    company = normalize_company(company)
+    # "Role - City", "Role at Company", "Company - Role" (Lever)
+    segments = [segment for segment in TITLE_SEPARATORS.split(title) if NON_WORD.sub('', segment)]
+    role = next((segment for segment in segments if normalize_company(segment) != company), '')
+    role = LOCATION_SUFFIX.sub('', role.strip())
+    return [token for token in NON_WORD.split(role) if token and token not in WORK_MODE_TOKENS]
+
+
+def shingles(tokens, snippet):
+    """Title tokens plus word 3-grams of the snippet (relative dates stripped)"""
+    features = {f"t:{token}" for token in tokens}
+    words = [word for word in NON_WORD.split(SNIPPET_NOISE.sub(' ', (snippet or '').lower())) if word]
+    features.update(' '.join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1))
+    return features
+
+
+def minhash(features):
+    """PERMUTATIONS-long signature: per permutation, the minimum hash over all features"""
+    values = [int.from_bytes(hashlib.blake2b(f.encode('utf-8'), digest_size=8).digest(), 'little')
+              for f in features]
+    if not values:
+        return [0] * PERMUTATIONS
+    return [min((a * v + b) % MERSENNE for v in values) & 0xFFFFFFFF for a, b in PERMUTATION_PARAMS]
+
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(1 for x, y in zip(signature, other) if x == y) / PERMUTATIONS
+
+
+def bucket_keys(scope, tokens, signature):
+    """One bucket per LSH band, plus the exact title (copies whose snippets differ a lot)"""
+    bands = [f"{scope}:{band}:" + hashlib.blake2b(
+                struct.pack(f'<{ROWS}I', *signature[band * ROWS:(band + 1) * ROWS]), digest_size=8).hexdigest()
+             for band in range(BANDS)]
+    return bands + [f"{scope}:title:{' '.join(sorted(set(tokens)))}"]
+
+
+def same_title(tokens, other):
+    """Near-equal titles at the same level (Engineer II is not a copy of Engineer I)"""
+    a, b = set(tokens), set(other)
+    if not a or not b or (a & LEVEL_TOKENS) != (b & LEVEL_TOKENS):
+        return False
+    return len(a & b) / len(a | b) >= TITLE_THRESHOLD
+
+
+class NearDupIndex:
+    """Canonical jobs with their MinHash signatures and LSH buckets (SQLite)"""
+
+    def __init__(self, namespace, path=NEAR_DUP_FILE, threshold=NEAR_DUP_THRESHOLD, ttl_days=NEAR_DUP_TTL_DAYS):
+        self.namespace = namespace
+        self.path = path
+        self.threshold = threshold
+        self.stats = {'checked': 0, 'folded': 0, 'canonical': 0, 'candidates': 0}
+        self._new = {}          # new canonical key -> (company, title, url, signature, has_snippet, first_seen)
+        self._new_buckets = {}  # bucket -> new canonical keys in it
+        self._aliases = {}      # folded key -> (canonical key, canonical url, url, folded_at)
+        self._copies = {}       # canonical key matched this run -> copies folded into it
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS canonical (
+                key TEXT PRIMARY KEY,
+                company TEXT,
+                title TEXT,
+                url TEXT,
+                signature BLOB,
+                has_snippet INTEGER,
+                copies INTEGER,
+                first_seen REAL,
+                last_seen REAL
+            )
+        ''')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS buckets (
+                bucket TEXT NOT NULL,
+                key TEXT NOT NULL,
+                PRIMARY KEY (bucket, key)
+            ) WITHOUT ROWID
+        ''')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS aliases (
+                key TEXT PRIMARY KEY,
+                canonical TEXT,
+                url TEXT,
+                folded_at REAL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_buckets_key ON buckets(key)')
+        if ttl_days > 0:
+            self._expire(time.time() - ttl_days * 86400)
+
+    def _expire(self, cutoff):
+        stale = 'SELECT key FROM canonical WHERE last_seen < ?'
+        self._conn.execute('BEGIN IMMEDIATE')
+        try:
+            self._conn.execute(f'DELETE FROM buckets WHERE key IN ({stale})', (cutoff,))
+            self._conn.execute(f'DELETE FROM aliases WHERE canonical IN ({stale})', (cutoff,))
+            self._conn.execute('DELETE FROM canonical WHERE last_seen < ?', (cutoff,))
+            self._conn.execute('COMMIT')
+        except Exception:
+            self._conn.execute('ROLLBACK')
+            raise
+
+    def _find(self, buckets, tokens, signature, has_snippet):
+        """Best verified canonical match: (key, url) or None"""
+        candidates = self._conn.execute(
+            f"SELECT DISTINCT c.key, c.url, c.title, c.signature, c.has_snippet FROM buckets b "
+            f"JOIN canonical c ON c.key = b.key WHERE b.bucket IN ({','.join('?' * len(buckets))})",
+            buckets).fetchall()
+        # Plus canonical jobs added earlier this run, not committed yet
+        pending = {key for bucket in buckets for key in self._new_buckets.get(bucket, ())}
+        candidates += [(key, self._new[key][2], self._new[key][1], self._new[key][3], self._new[key][4])
+                       for key in pending]
+        self.stats['candidates'] += len(candidates)
+
+        best, best_score = None, 0
+        for key, url, title, blob, other_has_snippet in candidates:
+            if not same_title(tokens, title.split()):
+                continue
+            score = similarity(signature, struct.unpack(f'<{PERMUTATIONS}I', blob))
+            if has_snippet and other_has_snippet and score < self.threshold:
+                continue    # same title, different posting (another team / location req)
+            if score > best_score:
+                best, best_score = (key, url), score
+        return best
+
+    def resolve(self, key, title, company, snippet='', url=''):
+        """
+        Canonical (key, url) this job folds into, or None if it is (or becomes) canonical itself.
+        New canonical jobs and folds are kept in memory; call commit() once the output is written.
+        """
+        key = f"{self.namespace}|{key}"
+        with self._lock:
+            self.stats['checked'] += 1
+            now = time.time()
+
+            if key in self._new or self._conn.execute('SELECT 1 FROM canonical WHERE key = ?',
+                                                      (key,)).fetchone() is not None:
+                self._copies.setdefault(key, 0)     # refreshes last_seen on commit
+                return None
+            if key in self._aliases:
+                self.stats['folded'] += 1
+                return self._aliases[key][:2]
+            alias = self._conn.execute(
+                'SELECT a.canonical, c.url FROM aliases a JOIN canonical c ON c.key = a.canonical '
+                'WHERE a.key = ?', (key,)).fetchone()
+            if alias is not None:
+                self.stats['folded'] += 1
+                return alias
+
+            tokens = title_tokens(title, company)
+            company = normalize_company(company)
+            signature = minhash(shingles(tokens, snippet))
+            has_snippet = bool(snippet and snippet.strip())
+            buckets = bucket_keys(f"{self.namespace}:{company}", tokens, signature)
+
+            match = self._find(buckets, tokens, signature, has_snippet) if company and tokens else None
+            if match is not None:
+                self._aliases[key] = (match[0], match[1], url, now)
+                self._copies[match[0]] = self._copies.get(match[0], 0) + 1
+                self.stats['folded'] += 1
+                return match
+
+            self._new[key] = (company, ' '.join(tokens), url, struct.pack(f'<{PERMUTATIONS}I', *signature),
+                              int(has_snippet), now)
+            for bucket in buckets:
+                self._new_buckets.setdefault(bucket, []).append(key)
+            self.stats['canonical'] += 1
+            return None
+
+    def fold(self, jobs, key, verbose=True):
+        """Jobs minus near-duplicates of a canonical job (earlier in `jobs`, or from a previous run)"""
+        kept = []
+        for job in jobs:
+            match = self.resolve(key(job), job.get('title', ''), job.get('company', ''),
+                                 job.get('snippet', ''), job.get('url', ''))
+            if match is None:
+                kept.append(job)
+            elif verbose:
+                print(f"   Near-duplicate: {job.get('company', '')} - {job.get('title', '')[:50]} → {match[1]}")
+        return kept
+
+    def commit(self):
+        """Write this run's canonical jobs, buckets and folds in one short transaction"""
+        with self._lock:
+            if not self._new and not self._aliases and not self._copies:
+                return
+            now = time.time()
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                # OR IGNORE: an overlapping run may have committed the same job first
+                self._conn.executemany(
+                    'INSERT OR IGNORE INTO canonical VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?)',
+                    [(key, *row, now) for key, row in self._new.items()])
+                self._conn.executemany(
+                    'INSERT OR IGNORE INTO buckets VALUES (?, ?)',
+                    [(bucket, key) for bucket, keys in self._new_buckets.items() for key in keys])
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO aliases VALUES (?, ?, ?, ?)',
+                    [(key, canonical, url, folded_at) for key, (canonical, _, url, folded_at) in self._aliases.items()])
+                self._conn.executemany(
+                    'UPDATE canonical SET copies = copies + ?, last_seen = ? WHERE key = ?',
+                    [(copies, now, key) for key, copies in self._copies.items()])
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._new.clear()
+            self._new_buckets.clear()
+            self._aliases.clear()
+            self._copies.clear()
+
+    def summary(self):
+        return (f"Near-duplicates: {self.stats['checked']} jobs checked, {self.stats['folded']} folded into "
+                f"canonical jobs, {self.stats['canonical']} new canonical "
+                f"({self.stats['candidates']} LSH candidates compared)")
+
+
+_index = None
+
+
+def get_near_dup_index(namespace):
+    """Process-wide index for this scraper (opened on first use)"""
+    global _index
+    if _index is None:
+        _index = NearDupIndex(namespace)
+    return _index
+
+
+def fold_near_duplicates(jobs, namespace, key, verbose=True):
+    """Drop near-duplicates when NEAR_DUP is on (unchanged list otherwise)"""
+    if not NEAR_DUP:
+        return jobs
+    return get_near_dup_index(namespace).fold(jobs, key, verbose)
+
+
+def commit_near_duplicates():
+    if _index is not None:
+        _index.commit()
+
+
+def print_near_dup_stats():
+    if _index is not None:
+        print(_index.summary())
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Adaptive Search Pacing (AIMD)
+- Replaces the fixed delay between Selenium searches with one that follows the
+  upstream's response signals:
+  - ok page: delay shrinks by PACING_STEP seconds (additive rate increase)
+  - block page (CAPTCHA / unusual traffic): delay x PACING_BACKOFF (multiplicative decrease)
+  - empty result containers / slow load: delay held (weak signals - narrow
+    after: queries legitimately come back empty)
+- Always inside [PACING_MIN_DELAY, PACING_MAX_DELAY]; jitter never goes below the floor
+- Delay persisted per scraper across runs; run summary reports effective queries/minute
+- ADAPTIVE_PACING=0 keeps each scraper's old fixed delay (signals and rate still reported)
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime
+
+from selenium.webdriver.common.by import By
+
+from page_ready import is_blocked, last_wait
+from serp_lite import query_was_live
+
+ADAPTIVE_PACING = os.getenv('ADAPTIVE_PACING', '0') == '1'
+PACING_STATE_FILE = os.getenv('PACING_STATE_FILE', 'pacing_state.json')
+PACING_MIN_DELAY = float(os.getenv('PACING_MIN_DELAY', 10))     # safety floor, seconds
+PACING_MAX_DELAY = float(os.getenv('PACING_MAX_DELAY', 180))
+PACING_STEP = float(os.getenv('PACING_STEP', 1))                # additive step per ok query
+PACING_BACKOFF = float(os.getenv('PACING_BACKOFF', 2))          # multiplier per block page
+PACING_SLOW_SECONDS = float(os.getenv('PACING_SLOW_SECONDS', 8))
+PACING_JITTER = 0.1                                             # +/- fraction, human-like irregularity
+
+
+class PacingController:
+    """Per-scraper AIMD delay between searches"""
+
+    def __init__(self, name, initial_delay, fallback=None, path=PACING_STATE_FILE, adaptive=ADAPTIVE_PACING):
+        self.name = name
+        self.path = path
+        self.adaptive = adaptive
+        self.fallback = fallback or (lambda: initial_delay)
+        self.signals = {'ok': 0, 'empty': 0, 'slow': 0, 'blocked': 0}
+        self.queries = 0
+        self.first_query = None
+        self.last_query = None
+        self.lock = threading.Lock()
+
+        self.state = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.state = json.load(f)
+        saved = self.state.get(name, {})
+        self.delay = self._clamp(saved.get('delay', initial_delay))
+
+    def _clamp(self, delay):
+        return min(PACING_MAX_DELAY, max(PACING_MIN_DELAY, delay))
+
+    def observe(self, blocked=False, results=None, load_seconds=None):
+        """Feed one query's outcome. Returns the signal name"""
+        if blocked:
+            signal = 'blocked'
+        elif results == 0:
+            signal = 'empty'
+        elif load_seconds is not None and load_seconds > PACING_SLOW_SECONDS:
+            signal = 'slow'
+        else:
+            signal = 'ok'
+
+        with self.lock:
+            now = time.monotonic()
+            self.first_query = self.first_query or now
+            self.last_query = now
+            self.queries += 1
+            self.signals[signal] += 1
+
+            if signal == 'blocked':
+                self.delay = self._clamp(self.delay * PACING_BACKOFF)
+            elif signal == 'ok':
+                self.delay = self._clamp(self.delay - PACING_STEP)
+
+        if signal == 'blocked':
+            print(f"   Block page - backing off to {self.delay:.0f}s between searches")
+        return signal
+
+    def observe_driver(self, driver, selectors):
+        """Observe the page the driver ended the query on: block page, result containers, load time"""
+        try:
+            blocked = is_blocked(driver)
+            results = 0 if blocked else len(driver.find_elements(By.CSS_SELECTOR, ', '.join(selectors)))
+        except Exception:
+            blocked, results = False, None
+        return self.observe(blocked, results, last_wait('results'))
+
+    def observe_query(self, driver, selectors):
+        """
+        observe_driver for a query that loaded pages. None when it was served from the
+        response cache: the driver still shows an older page and nothing was fetched
+        """
+        if not query_was_live():
+            return None
+        return self.observe_driver(driver, selectors)
+
+    def next_delay(self):
+        """Seconds to wait before the next search"""
+        if not self.adaptive:
+            return self.fallback()
+        with self.lock:
+            jittered = self.delay * random.uniform(1 - PACING_JITTER, 1 + PACING_JITTER)
+        return max(PACING_MIN_DELAY, jittered)
+
+    def queries_per_minute(self):
+        elapsed = (self.last_query - self.first_query) if self.queries >= 2 else 0
+        if elapsed <= 0:    # one query, or several within the clock's resolution
+            return None
+        return (self.queries - 1) / (elapsed / 60)
+
+    def save(self):
+        if not self.adaptive:
+            return
+        # Re-read: pool workers' controllers share the file, each saves only its own entry
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as f:
+                self.state = json.load(f)
+        entry = self.state.setdefault(self.name, {})
+        entry['delay'] = round(self.delay, 2)
+        entry['updated_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        entry['blocks'] = entry.get('blocks', 0) + self.signals['blocked']
+        if self.signals['blocked']:
+            entry['last_block'] = entry['updated_at']
+        with open(self.path, 'w') as f:
+            json.dump(self.state, f, indent=2)
+
+    def summary(self):
+        qpm = self.queries_per_minute()
+        rate = f"{qpm:.2f} queries/min" if qpm is not None else "n/a"
+        signals = " ".join(f"{k}={v}" for k, v in self.signals.items())
+        mode = (f"delay {self.delay:.1f}s (floor {PACING_MIN_DELAY:.0f}s, max {PACING_MAX_DELAY:.0f}s)"
+                if self.adaptive else "fixed delay")
+        return f"Pacing: {self.queries} searches, {rate} | {mode} | {signals}"
+
+
+_controller = None
+_workers = []
+
+
+def get_pacing(name, initial_delay, fallback=None):
+    """Process-wide controller for this scraper (created on first use)"""
+    global _controller
+    if _controller is None:
+        _controller = PacingController(name, initial_delay, fallback)
+    return _controller
+
+
+def get_worker_pacing(worker_id):
+    """
+    A pool worker's own controller (saved as "<scraper>/worker<N>"): one worker's block
+    page backs off only that worker. Starts from the scraper's delay the first time
+    """
+    controller = PacingController(f"{_controller.name}/worker{worker_id}", _controller.delay,
+                                  _controller.fallback, _controller.path, _controller.adaptive)
+    _workers.append(controller)
+    return controller
+
+
+def save_pacing():
+    for controller in ([_controller] if _controller is not None else []) + _workers:
+        controller.save()
+
+
+def print_pacing_stats():
+    if _controller is not None and (_controller.queries or not _workers):
+        print(_controller.summary())
+    for controller in _workers:
+        print(f"[{controller.name}] {controller.summary()}")
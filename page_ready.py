@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Event-Driven Page Readiness
+- Replaces fixed time.sleep() guesses in the Selenium scrapers with waits on
+  concrete conditions: search box present, result containers present (or a
+  CAPTCHA / no-results page), previous results gone after a page turn, network idle
+- Every wait has a timeout and never raises: on timeout the caller carries on,
+  exactly as it did after the old fixed sleep
+- Records how long each wait actually took, for the run summary
+"""
+
+import os
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+PAGE_READY_TIMEOUT = float(os.getenv('PAGE_READY_TIMEOUT', 10))
+POLL_INTERVAL = 0.1
+
+_waits = {}  # wait name -> {'times': [...], 'timeouts': n}
+
+
+def _record(name, seconds, timed_out):
+    entry = _waits.setdefault(name, {'times': [], 'timeouts': 0})
+    entry['times'].append(seconds)
+    if timed_out:
+        entry['timeouts'] += 1
+
+
+def wait_until(driver, name, condition, timeout=PAGE_READY_TIMEOUT):
+    """Poll condition(driver) until truthy. Returns its value, or None on timeout"""
+    start = time.monotonic()
+    try:
+        value = WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(condition)
+        _record(name, time.monotonic() - start, False)
+        return value
+    except TimeoutException:
+        _record(name, time.monotonic() - start, True)
+        return None
+
+
+def is_blocked(driver):
+    """CAPTCHA / unusual-traffic interstitial"""
+    return '/sorry/' in driver.current_url or bool(driver.find_elements(By.CSS_SELECTOR, '#captcha-form'))
+
+
+def wait_for_search_box(driver, timeout=PAGE_READY_TIMEOUT):
+    """google.com loaded: the q input is present"""
+    return wait_until(driver, 'search_box',
+                      lambda d: d.find_elements(By.NAME, 'q') or is_blocked(d), timeout)
+
+
+def results_ready(selectors):
+    """Condition: any result container present, or the page settled without any (no results / CAPTCHA)"""
+    def condition(driver):
+        for selector in selectors:
+            if driver.find_elements(By.CSS_SELECTOR, selector):
+                return True
+        if is_blocked(driver):
+            return True
+        return (driver.execute_script('return document.readyState') == 'complete'
+                and bool(driver.find_elements(By.CSS_SELECTOR, '#search, #topstuff, #botstuff')))
+    return condition
+
+
+def wait_for_results(driver, selectors=('div.tF2Cxc', 'div.g'), timeout=PAGE_READY_TIMEOUT):
+    """SERP rendered: result containers (or a terminal no-results / CAPTCHA page) are present"""
+    return wait_until(driver, 'results', results_ready(selectors), timeout)
+
+
+def click_next_page(driver, next_button, selectors=('div.tF2Cxc', 'div.g'), timeout=PAGE_READY_TIMEOUT):
+    """Click pnnext and wait until the old results are gone and the new ones are in"""
+    old = None
+    for selector in selectors:
+        found = driver.find_elements(By.CSS_SELECTOR, selector)
+        if found:
+            old = found[0]
+            break
+    old_url = driver.current_url
+
+    next_button.click()
+
+    def navigated(d):
+        if d.current_url != old_url:
+            return True
+        if old is None:
+            return False
+        try:
+            old.is_enabled()  # raises once the old page is gone
+            return False
+        except Exception:
+            return True
+
+    wait_until(driver, 'page_turn', navigated, timeout)
+    return wait_for_results(driver, selectors, timeout)
+
+
+def wait_for_network_idle(driver, idle_seconds=0.5, timeout=PAGE_READY_TIMEOUT):
+    """No new resource loads for idle_seconds (for screenshots of late-rendering pages)"""
+    state = {'count': -1, 'since': time.monotonic()}
+
+    def idle(d):
+        count = d.execute_script("return performance.getEntriesByType('resource').length")
+        now = time.monotonic()
+        if count != state['count']:
+            state['count'], state['since'] = count, now
+            return False
+        return now - state['since'] >= idle_seconds
+
+    return wait_until(driver, 'network_idle', idle, timeout)
+
+
+def last_wait(name):
+    """Duration of the most recent `name` wait, or None"""
+    entry = _waits.get(name)
+    return entry['times'][-1] if entry and entry['times'] else None
+
+
+def wait_stats():
+    """{name: (count, mean s, max s, timeouts)}"""
+    return {name: (len(e['times']), sum(e['times']) / len(e['times']), max(e['times']), e['timeouts'])
+            for name, e in _waits.items() if e['times']}
+
+
+def print_wait_stats():
+    """Print how long each kind of wait actually took this run"""
+    stats = wait_stats()
+    if not stats:
+        return
+    parts = [f"{name} {count}x avg {mean:.2f}s max {worst:.2f}s" + (f" ({timeouts} timeouts)" if timeouts else "")
+             for name, (count, mean, worst, timeouts) in sorted(stats.items())]
+    print("Page waits: " + ", ".join(parts))
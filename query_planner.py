@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Query Set Minimizer
+- Parses SEARCHES query strings into AND-of-OR groups (phrases, bare words, site:)
+- Drops queries subsumed by broader ones (site:ashbyhq.com covers site:jobs.ashbyhq.com,
+  "Machine Learning" covers "Machine Learning Engineer"); with geo=True (opt-in, approximate)
+  city queries also fall under "United States"
+- Merges queries that differ in a single OR group, within Google's query length limits
+- Keeps every original entry's location/role/ats metadata and attributes results back to it
+- Reports how many requests the reduced set saves per run, at each scraper's own pages per query
+"""
+
+import argparse
+import ast
+import re
+from urllib.parse import urlparse
+
+MAX_QUERY_WORDS = 32     # Google ignores terms past the 32nd word
+MAX_QUERY_CHARS = 2048
+MAX_OR_TERMS = 5         # cap per OR group so merged queries don't crowd each other out of 100 results
+PAGES_PER_QUERY = 3
+
+# Opt-in (geo=True): treat city terms as implying the US terms. Approximate only: a quoted
+# "United States" is an exact phrase, and postings that only name the city don't contain it
+US_TERMS = {'united states', 'usa', 'us'}
+US_CITY_TERMS = {'new york', 'nyc', 'san francisco', 'bay area', 'boston', 'cambridge', 'seattle',
+                 'austin', 'remote us', 'remote united states', 'us only'}
+
+TOKEN_RE = re.compile(r'-?"[^"]*"|\(|\)|-?[^\s()"]+')
+
+
+class Atom:
+    """A single search term: a (possibly quoted) phrase or a site: operator"""
+
+    __slots__ = ('kind', 'text', 'display', 'quoted')
+
+    def __init__(self, kind, text, quoted=False):
+        self.kind = kind
+        self.display = ' '.join(text.split())
+        self.text = self.display.lower()
+        self.quoted = quoted
+
+    def key(self):
+        return self.kind, self.text
+
+    def __eq__(self, other):
+        return self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def render(self):
+        if self.kind == 'site':
+            return f"site:{self.text}"
+        return f'"{self.display}"' if self.quoted else self.display
+
+    def words(self):
+        return 1 if self.kind == 'site' else len(self.text.split())
+
+    def implies(self, other, geo=False):
+        """True when every page matching self also matches other"""
+        if self.kind != other.kind:
+            return False
+        if self.kind == 'site':
+            return self.text == other.text or self.text.endswith('.' + other.text)
+        if f" {other.text} " in f" {self.text} ":
+            return True
+        return geo and self.text in US_CITY_TERMS and other.text in US_TERMS
+
+    def matches(self, text, host):
+        if self.kind == 'site':
+            return host == self.text or host.endswith('.' + self.text)
+        return self.text in text
+
+
+class ParsedQuery:
+    """AND of OR-groups, plus negated terms"""
+
+    def __init__(self, groups, negations):
+        self.groups = [frozenset(g) for g in groups]
+        self.negations = frozenset(negations)
+
+    def signature(self):
+        return frozenset(self.groups), self.negations
+
+    def render(self):
+        parts = []
+        sites = []
+        for group in self.groups:
+            atoms = sorted(group, key=lambda a: a.text)
+            if all(a.kind == 'site' for a in atoms) and len(atoms) == 1:
+                sites.append(atoms[0].render())
+            elif len(atoms) == 1:
+                parts.append(atoms[0].render())
+            else:
+                parts.append('(' + ' OR '.join(a.render() for a in atoms) + ')')
+        negs = [f"-{n}" for n in sorted(self.negations)]
+        return ' '.join(parts + sites + negs)
+
+    def word_count(self):
+        words = sum(a.words() for g in self.groups for a in g)
+        ors = sum(len(g) - 1 for g in self.groups)
+        return words + ors + len(self.negations)
+
+    def within_limits(self):
+        return (self.word_count() <= MAX_QUERY_WORDS and len(self.render()) <= MAX_QUERY_CHARS
+                and all(len(g) <= MAX_OR_TERMS for g in self.groups))
+
+    def subsumes(self, other, geo=False):
+        """True when every result of `other` is also a result of self"""
+        if not self.negations <= other.negations:
+            return False
+        return all(
+            any(all(any(a2.implies(a1, geo) for a1 in g1) for a2 in g2) for g2 in other.groups)
+            for g1 in self.groups
+        )
+
+    def match_score(self, text, host):
+        """Number of groups an item satisfies (used to attribute merged results)"""
+        return sum(1 for g in self.groups if any(a.matches(text, host) for a in g))
+
+
+def parse_query(query):
+    """Parse a query string like '("A" OR "B") "United States" site:x.com -canada'"""
+    groups = []
+    negations = []
+    current = None
+
+    for token in TOKEN_RE.findall(query):
+        if token == '(':
+            current = []
+            continue
+        if token == ')':
+            if current:
+                groups.append(current)
+            current = None
+            continue
+        if token == 'OR':
+            continue
+
+        if token.startswith('-'):
+            negations.append(token[1:].strip('"').lower())
+            continue
+
+        if token.startswith('site:'):
+            atom = Atom('site', token[len('site:'):])
+        elif token.startswith('"'):
+            atom = Atom('phrase', token.strip('"'), quoted=True)
+        else:
+            atom = Atom('phrase', token)
+
+        if current is not None:
+            current.append(atom)
+        else:
+            groups.append([atom])
+
+    return ParsedQuery(groups, negations)
+
+
+def _try_merge(q1, q2):
+    """Merge two queries that differ only in one OR group. Returns ParsedQuery or None"""
+    if q1.negations != q2.negations or len(q1.groups) != len(q2.groups):
+        return None
+
+    only1 = [g for g in q1.groups if g not in q2.groups]
+    only2 = [g for g in q2.groups if g not in q1.groups]
+    if len(only1) != 1 or len(only2) != 1:
+        return None
+
+    merged_groups = [only1[0] | only2[0] if g == only1[0] else g for g in q1.groups]
+    merged = ParsedQuery(merged_groups, q1.negations)
+    return merged if merged.within_limits() else None
+
+
+def plan_queries(searches, geo=False, verbose=False):
+    """
+    Reduce a SEARCHES list. Returns planned search configs: each has the rendered 'query',
+    the metadata of its first source, and 'sources' (every original entry it covers)
+    """
+    plan = [{'parsed': parse_query(s['query']), 'sources': [s]} for s in searches]
+
+    # 1. Exact duplicates and subsumed queries
+    idx = 0
+    while idx < len(plan):
+        absorbed = False
+        for other in plan:
+            if other is plan[idx]:
+                continue
+            if other['parsed'].subsumes(plan[idx]['parsed'], geo):
+                # Specific sources first so their metadata wins during attribution
+                other['sources'] = plan[idx]['sources'] + other['sources']
+                if verbose:
+                    print(f"  SUBSUMED: {plan[idx]['sources'][0]['query']}")
+                    print(f"        by: {other['sources'][-1]['query']}")
+                plan.pop(idx)
+                absorbed = True
+                break
+        if not absorbed:
+            idx += 1
+
+    # 2. Merge queries differing in a single OR group
+    merged_any = True
+    while merged_any:
+        merged_any = False
+        for i in range(len(plan)):
+            for j in range(i + 1, len(plan)):
+                merged = _try_merge(plan[i]['parsed'], plan[j]['parsed'])
+                if merged is None:
+                    continue
+                if verbose:
+                    print(f"  MERGED: {plan[i]['parsed'].render()}")
+                    print(f"     and: {plan[j]['parsed'].render()}")
+                plan[i] = {'parsed': merged, 'sources': plan[i]['sources'] + plan[j]['sources']}
+                plan.pop(j)
+                merged_any = True
+                break
+            if merged_any:
+                break
+
+    planned = []
+    for entry in plan:
+        if len(entry['sources']) == 1:
+            planned.append(entry['sources'][0])
+            continue
+        config = dict(entry['sources'][0])
+        config['query'] = entry['parsed'].render()
+        config['sources'] = entry['sources']
+        planned.append(config)
+    return planned
+
+
+def split_results(results, search_config):
+    """Attribute each result item back to the original SEARCHES entry it best matches"""
+    sources = search_config.get('sources')
+    if not results or not sources:
+        return [(search_config, results)]
+
+    parsed_sources = [parse_query(s['query']) for s in sources]
+    buckets = {}
+
+    for item in results.get('items', []):
+        text = f"{item.get('title', '')} {item.get('snippet', '')} {item.get('link', '')}".lower()
+        host = (urlparse(item.get('link', '')).hostname or '').lower()
+
+        best, best_score = 0, -1
+        for i, parsed in enumerate(parsed_sources):
+            score = parsed.match_score(text, host)
+            if score == len(parsed.groups):
+                best = i
+                break
+            if score > best_score:
+                best, best_score = i, score
+        buckets.setdefault(best, []).append(item)
+
+    return [(sources[i], {'items': items}) for i, items in sorted(buckets.items())]
+
+
+def report_savings(name, searches, pages_per_query=PAGES_PER_QUERY, geo=False, verbose=False):
+    """Print original vs planned query counts and requests saved per run"""
+    print(f"\n{name}")
+    print("-" * 70)
+    planned = plan_queries(searches, geo=geo, verbose=verbose)
+    saved = (len(searches) - len(planned)) * pages_per_query
+    print(f"Queries: {len(searches)} -> {len(planned)}")
+    print(f"Requests per run: {len(searches) * pages_per_query} -> {len(planned) * pages_per_query} "
+          f"(saves {saved})")
+    return planned
+
+
+def load_searches(path, name):
+    """Read a SEARCHES literal straight from a scraper's source (no import side effects)"""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, 'id', None) == name for t in node.targets):
+            value = ast.literal_eval(node.value)
+            if isinstance(value, dict):
+                # SEARCHES_BY_CATEGORY: flatten, keeping the category as metadata
+                return [dict(s, category=cat) for cat, entries in value.items() for s in entries]
+            return value
+    return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report query-set reductions for every scraper")
+    parser.add_argument('--pages', type=int, help="Pages fetched per query (default: each scraper's own)")
+    parser.add_argument('--geo', action='store_true', help="Also treat city queries as covered by US queries "
+                                                           "(approximate: drops city-only results)")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Show each subsumption/merge")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("QUERY SET MINIMIZER")
+    print("=" * 70)
+
+    # Requests per query: job_scraper fetches a single page, quick/complete up to 30 results,
+    # brave up to 3 SERP pages
+    targets = [
+        ('job_scraper.py', 'SEARCHES', 1),
+        ('job_scraper_quick.py', 'SEARCHES', 3),
+        ('job_scraper_complete.py', 'SEARCHES', 3),
+        ('job_scraper_brave.py', 'SEARCHES_BY_CATEGORY', 3),
+    ]
+
+    for path, name, pages in targets:
+        pages = args.pages or pages
+        searches = load_searches(path, name)
+        if name == 'SEARCHES_BY_CATEGORY':
+            # Categories map to separate CSVs, so only minimize within each category
+            categories = {}
+            for s in searches:
+                categories.setdefault(s['category'], []).append(s)
+            print(f"\n{path} ({name})")
+            print("-" * 70)
+            before = after = 0
+            for category, entries in categories.items():
+                planned = plan_queries(entries, geo=args.geo, verbose=args.verbose)
+                before += len(entries)
+                after += len(planned)
+            print(f"Queries: {before} -> {after}")
+            print(f"Requests per run: {before * pages} -> {after * pages} (saves {(before - after) * pages})")
+        else:
+            report_savings(f"{path} ({name})", searches, pages, geo=args.geo, verbose=args.verbose)
+
+    print("\n" + "=" * 70)
+
+
+if __name__ == "__main__":
+    main()
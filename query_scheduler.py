@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Query Budget Scheduler
+- Remembers per-query yield across runs (pages used, new jobs, mean fit score)
+- Splits the day's Custom Search request budget across SEARCHES with a UCB
+  explore/exploit policy: high-yield queries get more pages, dead queries are
+  still probed now and then as their exploration bonus grows
+- Logs every allocation with its expected yield for audit
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+from datetime import datetime
+
+QUERY_HISTORY_FILE = os.getenv('QUERY_HISTORY_FILE', 'query_history.json')
+SCHEDULER_LOG_FILE = os.getenv('SCHEDULER_LOG_FILE', 'scheduler_decisions.jsonl')
+DAILY_QUERY_BUDGET = int(os.getenv('DAILY_QUERY_BUDGET', 100))         # free tier: 100 requests/day
+SCHEDULER_EXPLORATION = float(os.getenv('SCHEDULER_EXPLORATION', 1.0))  # UCB bonus weight
+SCHEDULER_MAX_PAGES = int(os.getenv('SCHEDULER_MAX_PAGES', 10))         # start=91 is the API's last page
+
+PAGE_DECAY = 0.6    # each deeper page is expected to yield this fraction of the previous one
+PRIOR_REWARD = 1.0  # optimistic prior (one fit-weighted new job per page) so unseen queries get tried
+
+
+def load_history(path=QUERY_HISTORY_FILE):
+    """Load per-query history, or an empty one"""
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            return json.load(f)
+    return {'queries': {}, 'days': {}}
+
+
+def save_history(history, path=QUERY_HISTORY_FILE):
+    with open(path, 'w') as f:
+        json.dump(history, f, indent=2)
+
+
+def page_reward(new_jobs, mean_fit):
+    """Fit-weighted new jobs: a page of two 80-fit jobs beats one of three 30-fit jobs"""
+    return new_jobs * mean_fit / 100
+
+
+def query_index(stats, total_pages, exploration=SCHEDULER_EXPLORATION):
+    """(UCB index, mean reward per page) for one query's history"""
+    pages = stats.get('pages', 0)
+    mean = (stats.get('reward', 0.0) + PRIOR_REWARD) / (pages + 1)
+    bonus = exploration * math.sqrt(2 * math.log(total_pages + 2) / (pages + 1))
+    return mean + bonus, mean
+
+
+def budget_left_today(history, daily_budget=DAILY_QUERY_BUDGET):
+    today = datetime.now().strftime('%Y-%m-%d')
+    return max(0, daily_budget - history['days'].get(today, 0))
+
+
+def allocate_pages(searches, history, budget, max_pages=SCHEDULER_MAX_PAGES,
+                   exploration=SCHEDULER_EXPLORATION):
+    """
+    Greedily hand out `budget` pages: the next page always goes to the query with the
+    highest UCB index discounted by PAGE_DECAY per page it already holds.
+    Returns [(search_config, pages, index, expected_reward)] in SEARCHES order
+    """
+    queries = history['queries']
+    total_pages = sum(s.get('pages', 0) for s in queries.values())
+
+    indexes = []
+    heap = []
+    for i, config in enumerate(searches):
+        index, mean = query_index(queries.get(config['query'], {}), total_pages, exploration)
+        indexes.append((index, mean))
+        # Ties go to SEARCHES order so allocations are reproducible
+        heapq.heappush(heap, (-index, i))
+
+    pages = [0] * len(searches)
+    while budget > 0 and heap:
+        neg_value, i = heapq.heappop(heap)
+        pages[i] += 1
+        budget -= 1
+        if pages[i] < max_pages:
+            heapq.heappush(heap, (neg_value * PAGE_DECAY, i))
+
+    allocation = []
+    for i, config in enumerate(searches):
+        index, mean = indexes[i]
+        expected = sum(mean * PAGE_DECAY ** k for k in range(pages[i]))
+        allocation.append((config, pages[i], index, expected))
+    return allocation
+
+
+def log_allocation(allocation, budget, path=SCHEDULER_LOG_FILE):
+    """Append this run's decisions (pages, index, expected yield) to the audit log"""
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    with open(path, 'a', encoding='utf-8') as f:
+        for config, pages, index, expected in allocation:
+            f.write(json.dumps({
+                'time': now,
+                'query': config['query'],
+                'budget': budget,
+                'pages': pages,
+                'ucb_index': round(index, 3),
+                'expected_reward': round(expected, 2),
+            }) + '\n')
+
+
+def record_query_run(history, query, pages_used, new_jobs, mean_fit):
+    """Fold one query's outcome into the history and today's spend"""
+    stats = history['queries'].setdefault(
+        query, {'runs': 0, 'pages': 0, 'new_jobs': 0, 'reward': 0.0, 'fit_sum': 0.0})
+    stats['runs'] += 1
+    stats['pages'] += pages_used
+    stats['new_jobs'] += new_jobs
+    stats['reward'] += page_reward(new_jobs, mean_fit)
+    stats['fit_sum'] += new_jobs * mean_fit
+    stats['last_run'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    stats['last_new_jobs'] = new_jobs
+
+    today = datetime.now().strftime('%Y-%m-%d')
+    history['days'][today] = history['days'].get(today, 0) + pages_used
+
+
+def print_allocation(allocation):
+    funded = [a for a in allocation if a[1] > 0]
+    total = sum(a[1] for a in allocation)
+    print(f"Scheduler: {total} pages across {len(funded)}/{len(allocation)} queries")
+    for config, pages, index, expected in sorted(allocation, key=lambda a: -a[2])[:5]:
+        print(f"  {pages:>2} pages  index {index:.2f}  expected {expected:.1f}  {config['query'][:60]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show today's page allocation for a scraper's SEARCHES")
+    parser.add_argument('--script', default='job_scraper_complete.py', help="Scraper whose SEARCHES to schedule")
+    parser.add_argument('--budget', type=int, help="Override the remaining daily budget")
+    args = parser.parse_args()
+
+    from query_planner import load_searches
+
+    searches = load_searches(args.script, 'SEARCHES')
+    history = load_history()
+    budget = args.budget if args.budget is not None else budget_left_today(history)
+
+    print("=" * 70)
+    print(f"QUERY BUDGET SCHEDULER: {args.script}")
+    print(f"Budget: {budget} requests, history for {len(history['queries'])} queries")
+    print("=" * 70)
+
+    allocation = allocate_pages(searches, history, budget)
+    for config, pages, index, expected in allocation:
+        stats = history['queries'].get(config['query'], {})
+        print(f"{pages:>2} pages | index {index:5.2f} | expected {expected:4.1f} | "
+              f"seen {stats.get('pages', 0):>3} pages, {stats.get('new_jobs', 0):>3} jobs | {config['query'][:50]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Persistent Response Cache
+- On-disk (SQLite) cache for raw search backend responses
+- Keyed on (backend, query, start offset, dateRestrict / after-date)
+- Stores raw Custom Search JSON and raw Google SERP HTML
+- TTL expiry + size-bounded LRU eviction
+- Hit/miss stats for the run summary
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+RESPONSE_CACHE_FILE = os.getenv('RESPONSE_CACHE_FILE', 'response_cache.db')
+RESPONSE_CACHE_TTL_HOURS = float(os.getenv('RESPONSE_CACHE_TTL_HOURS', 12))
+RESPONSE_CACHE_MAX_MB = float(os.getenv('RESPONSE_CACHE_MAX_MB', 50))
+
+
+class ResponseCache:
+    """SQLite-backed response cache with TTL and LRU eviction by total size"""
+
+    def __init__(self, path=RESPONSE_CACHE_FILE, ttl_hours=RESPONSE_CACHE_TTL_HOURS,
+                 max_mb=RESPONSE_CACHE_MAX_MB):
+        self.path = path
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'expired': 0, 'evicted': 0}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                backend TEXT,
+                query TEXT,
+                start INTEGER,
+                date_key TEXT,
+                body TEXT,
+                size INTEGER,
+                created_at REAL,
+                accessed_at REAL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_accessed ON responses(accessed_at)')
+        self._conn.commit()
+
+    def limit_ttl(self, seconds):
+        """Cap the TTL for this process (daemon revisits must not be served stale pages)"""
+        self.ttl_seconds = min(self.ttl_seconds, seconds)
+
+    @staticmethod
+    def make_key(backend, query, start, date_key):
+        raw = json.dumps([backend, query, int(start), str(date_key)])
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def get(self, backend, query, start, date_key):
+        """Return the cached body, or None on miss/expiry"""
+        key = self.make_key(backend, query, start, date_key)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT body, created_at FROM responses WHERE key = ?', (key,)).fetchone()
+
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+
+            body, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self._conn.commit()
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+
+            self._conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+            self._conn.commit()
+            self.stats['hits'] += 1
+            return body
+
+    def put(self, backend, query, start, date_key, body):
+        """Store a raw response body and evict least-recently-used entries past the size cap"""
+        key = self.make_key(backend, query, start, date_key)
+        now = time.time()
+        size = len(body.encode('utf-8'))
+
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, backend, query, int(start), str(date_key), body, size, now, now))
+            self.stats['stores'] += 1
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now):
+        cursor = self._conn.execute('DELETE FROM responses WHERE created_at < ?',
+                                    (now - self.ttl_seconds,))
+        self.stats['expired'] += cursor.rowcount
+
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        for key, size in self._conn.execute(
+                'SELECT key, size FROM responses ORDER BY accessed_at ASC').fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+            total -= size
+            self.stats['evicted'] += 1
+
+    def summary(self):
+        lookups = self.stats['hits'] + self.stats['misses']
+        hit_rate = (self.stats['hits'] / lookups * 100) if lookups else 0
+        return (f"Response cache: {self.stats['hits']} hits, {self.stats['misses']} misses "
+                f"({hit_rate:.0f}% hit rate), {self.stats['stores']} stored, "
+                f"{self.stats['evicted']} evicted, {self.stats['expired']} expired")
+
+
+_cache = None
+
+
+def get_cache():
+    """Process-wide cache instance (opened on first use)"""
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache()
+    return _cache
+
+
+def print_cache_stats():
+    """Print hit/miss stats if the cache was used this run"""
+    if _cache is not None:
+        print(_cache.summary())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Daemon Mode: Per-Query Revisit Scheduling
+- Instead of running every query back-to-back once per cron run, a daemon runs
+  one query at a time, whenever that query is due
+- Each query has its own revisit interval: it shrinks (x REVISIT_SHRINK) when a visit
+  surfaces new jobs and grows (x REVISIT_GROW) when it doesn't, within
+  [REVISIT_MIN_MINUTES, REVISIT_MAX_MINUTES]
+- New queries are staggered across their first interval, and visits are spaced by the
+  scraper's own delay, so traffic is a steady trickle instead of a burst per run
+- The caller recomputes its time window (after:/lookback date) on every visit
+- Intervals and due times persist in revisit_state.json across daemon restarts
+- python revisit_scheduler.py  shows the current schedule
+"""
+
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+
+DAEMON_MODE = os.getenv('DAEMON_MODE', '0') == '1'
+REVISIT_STATE_FILE = os.getenv('REVISIT_STATE_FILE', 'revisit_state.json')
+REVISIT_MIN_MINUTES = float(os.getenv('REVISIT_MIN_MINUTES', 30))
+REVISIT_MAX_MINUTES = float(os.getenv('REVISIT_MAX_MINUTES', 720))
+REVISIT_INITIAL_MINUTES = float(os.getenv('REVISIT_INITIAL_MINUTES', 120))
+REVISIT_SHRINK = 0.5
+REVISIT_GROW = 1.5
+DAEMON_IDLE_SECONDS = 60        # longest sleep while nothing is due (keeps Ctrl+C responsive)
+DAEMON_REPORT_EVERY = 20        # visits between schedule summaries
+
+
+def _stagger(key, interval):
+    """Deterministic offset in [0, interval) so new queries don't all start at once"""
+    digest = int(hashlib.md5(key.encode()).hexdigest()[:8], 16)
+    return (digest / 0xFFFFFFFF) * interval
+
+
+class RevisitSchedule:
+    """Per-query revisit intervals and due times (epoch seconds)"""
+
+    def __init__(self, keys, path=REVISIT_STATE_FILE):
+        self.path = path
+        self.state = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.state = json.load(f)
+
+        now = time.time()
+        self.keys = list(keys)
+        for key in self.keys:
+            if key not in self.state:
+                interval = REVISIT_INITIAL_MINUTES * 60
+                self.state[key] = {'interval': interval, 'next_due': now + _stagger(key, interval),
+                                   'visits': 0, 'productive': 0, 'new_jobs': 0}
+
+    def save(self):
+        with open(self.path, 'w') as f:
+            json.dump(self.state, f, indent=2)
+
+    def due(self, now=None):
+        """Due keys, most overdue first"""
+        now = now or time.time()
+        due = [key for key in self.keys if self.state[key]['next_due'] <= now]
+        return sorted(due, key=lambda key: self.state[key]['next_due'])
+
+    def next_wakeup(self):
+        return min((self.state[key]['next_due'] for key in self.keys), default=float('inf'))
+
+    def record(self, key, new_jobs, now=None):
+        """Visit done: shrink the interval if it found new jobs, grow it otherwise"""
+        now = now or time.time()
+        entry = self.state[key]
+        factor = REVISIT_SHRINK if new_jobs else REVISIT_GROW
+        entry['interval'] = min(REVISIT_MAX_MINUTES * 60, max(REVISIT_MIN_MINUTES * 60, entry['interval'] * factor))
+        entry['next_due'] = now + entry['interval']
+        entry['visits'] += 1
+        entry['productive'] += 1 if new_jobs else 0
+        entry['new_jobs'] += new_jobs
+        entry['last_visit'] = datetime.fromtimestamp(now).strftime('%Y-%m-%d %H:%M:%S')
+        return entry['interval']
+
+    def retry(self, key, now=None):
+        """Visit failed (blocked/error): try again after the minimum interval, keep the interval"""
+        now = now or time.time()
+        self.state[key]['next_due'] = now + REVISIT_MIN_MINUTES * 60
+
+    def summary(self):
+        intervals = sorted(self.state[key]['interval'] / 60 for key in self.keys)
+        if not intervals:
+            return "Revisit schedule: no queries"
+        per_hour = sum(60 / minutes for minutes in intervals)
+        return (f"Revisit schedule: {len(intervals)} queries | interval min {intervals[0]:.0f} / "
+                f"median {intervals[len(intervals) // 2]:.0f} / max {intervals[-1]:.0f} min | "
+                f"~{per_hour:.1f} searches/hour")
+
+
+def run_daemon(schedule, run_query, gap, max_visits=None, sleep=time.sleep, clock=time.time):
+    """
+    Visit due queries one at a time until interrupted.
+    run_query(key) -> new jobs found, or None if the visit failed (blocked/error);
+    gap() -> seconds to wait after each visit (the scraper's pacing delay)
+    """
+    visits = 0
+    try:
+        while max_visits is None or visits < max_visits:
+            now = clock()
+            due = schedule.due(now)
+            if not due:
+                sleep(min(DAEMON_IDLE_SECONDS, max(1, schedule.next_wakeup() - now)))
+                continue
+
+            key = due[0]
+            print(f"\n[{datetime.fromtimestamp(now).strftime('%H:%M:%S')}] {key[:80]} "
+                  f"({len(due) - 1} more due)")
+            new_jobs = run_query(key)
+            if new_jobs is None:
+                schedule.retry(key, clock())
+                print(f"   Visit failed -> retry in {REVISIT_MIN_MINUTES:.0f} min")
+            else:
+                interval = schedule.record(key, new_jobs, clock())
+                print(f"   {new_jobs} new jobs -> next visit in {interval / 60:.0f} min")
+            schedule.save()
+
+            visits += 1
+            if visits % DAEMON_REPORT_EVERY == 0:
+                print(schedule.summary())
+            sleep(gap())
+    except KeyboardInterrupt:
+        print("\nDaemon stopped")
+    schedule.save()
+    return visits
+
+
+def main():
+    if not os.path.exists(REVISIT_STATE_FILE):
+        print("No revisit schedule yet (run a scraper with DAEMON_MODE=1)")
+        return
+    with open(REVISIT_STATE_FILE, 'r') as f:
+        state = json.load(f)
+    now = time.time()
+    for key, entry in sorted(state.items(), key=lambda item: item[1]['next_due']):
+        due_in = (entry['next_due'] - now) / 60
+        print(f"{entry['interval'] / 60:5.0f} min | due in {due_in:6.0f} min | visits {entry['visits']:>3} "
+              f"({entry['productive']} productive, {entry['new_jobs']} jobs) | {key[:70]}")
+    print(RevisitSchedule(list(state)).summary())
+
+
+if __name__ == "__main__":
+    main()
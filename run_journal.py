@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Run Journal (checkpoint / resume)
+- Append-only JSONL journal per scraper: one line per completed query with the
+  jobs it produced and the dedup keys it added (seen URLs / job IDs)
+- Each line is flushed and fsynced, so a crash or block loses at most the query
+  in flight
+- A restarted run with the same run key (e.g. the same date filter) skips the
+  completed queries and restores their jobs and dedup state; a different run key
+  starts a fresh journal
+- finish() removes the journal once the run's outputs are written
+"""
+
+import json
+import os
+from datetime import datetime
+
+RUN_JOURNAL = os.getenv('RUN_JOURNAL', '1') == '1'
+RUN_JOURNAL_DIR = os.getenv('RUN_JOURNAL_DIR', '.')
+
+
+class RunJournal:
+    """Completed queries of the current run, keyed by a caller-chosen query key"""
+
+    def __init__(self, name, run_key, directory=RUN_JOURNAL_DIR, enabled=RUN_JOURNAL):
+        self.enabled = enabled
+        self.path = os.path.join(directory, f"run_journal_{name}.jsonl")
+        self.run_key = str(run_key)
+        self.restored = 0
+        self.completed = {}
+
+        if not enabled:
+            return
+
+        if os.path.exists(self.path):
+            self._load()
+            if self.completed:
+                print(f"Resuming run {self.run_key}: {len(self.completed)} queries already done")
+
+        # (Re)write header + surviving entries, so appends never follow a torn line
+        header = {'run_key': self.run_key, 'started_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            for record in [header] + list(self.completed.values()):
+                f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def _load(self):
+        with open(self.path, 'r') as f:
+            lines = f.read().splitlines()
+        if not lines:
+            return
+        try:
+            header = json.loads(lines[0])
+        except ValueError:
+            return
+        if header.get('run_key') != self.run_key:
+            return  # journal of an older run: start over
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break  # torn last line from a crash mid-write
+            self.completed[entry['key']] = entry
+        self.restored = len(self.completed)
+
+    def _write(self, record):
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def done(self, key):
+        """The journal entry ({'jobs', 'seen'}) if `key` already completed this run, else None"""
+        return self.completed.get(key)
+
+    def record(self, key, jobs, seen):
+        """Checkpoint one completed query: its jobs and the dedup keys it added"""
+        if not self.enabled:
+            return
+        entry = {'key': key, 'jobs': jobs, 'seen': sorted(seen),
+                 'done_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+        self.completed[key] = entry
+        self._write(entry)
+
+    def finish(self):
+        """Run complete and outputs written: the next run starts fresh"""
+        if self.enabled and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def summary(self):
+        return f"Run journal: {self.restored} queries restored, {len(self.completed) - self.restored} run"
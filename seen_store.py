@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Seen-Jobs Store
+- SQLite (WAL) replacement for the seen_*.json files: indexed membership checks
+  instead of loading every ID into a set, and only new IDs are written instead
+  of rewriting the whole file
+- One table for every scraper; each namespace is named after the JSON file it
+  replaces, so scrapers that shared a file still share their IDs
+- first_seen / last_seen per ID: a lookup that hits refreshes last_seen, and IDs
+  not seen for SEEN_TTL_DAYS expire (0 keeps them forever)
+- New IDs are buffered and committed with the output that reports them, so a
+  crash can't mark a job seen that never reached the CSV
+- Overlapping cron runs are safe: WAL readers never block, writers wait on a busy
+  timeout, and inserts are upserts (no run overwrites another run's IDs)
+- The old JSON file is imported once, on first use
+- A memory-mapped Bloom filter per namespace (bloom_filter.py) sits in front of
+  the table: most "definitely new" checks never touch SQLite. It is updated with
+  every commit and rebuilt from the table when it is missing, over capacity, or
+  behind the table (keys committed by a run with SEEN_BLOOM=0); lookups re-check
+  for another run's rebuild every SEEN_BLOOM_RECHECK seconds
+- python seen_store.py import FILE | stats | bench
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from bloom_filter import BloomFilter
+
+SEEN_STORE_FILE = os.getenv('SEEN_STORE_FILE', 'seen_jobs.db')
+SEEN_TTL_DAYS = float(os.getenv('SEEN_TTL_DAYS', 90))
+SEEN_BUSY_TIMEOUT = 30          # seconds a writer waits for an overlapping run's transaction
+SEEN_BATCH = 10000              # rows per executemany
+SEEN_BLOOM = os.getenv('SEEN_BLOOM', '1') == '1'
+SEEN_BLOOM_FP = float(os.getenv('SEEN_BLOOM_FP', 0.01))
+SEEN_BLOOM_MIN_CAPACITY = 1000000
+SEEN_BLOOM_RECHECK = 1.0        # seconds between lookup-time checks that the filter is still current
+
+
+class SeenStore:
+    """Set-like view of one namespace: `in`, add(), update(), len(); commit() persists"""
+
+    def __init__(self, namespace, path=SEEN_STORE_FILE, ttl_days=SEEN_TTL_DAYS):
+        self.namespace = namespace
+        self.path = path
+        self.ttl_seconds = ttl_days * 86400
+        self.stats = {'lookups': 0, 'hits': 0, 'bloom_skips': 0, 'added': 0, 'expired': 0, 'imported': 0}
+        self._pending = {}      # new key -> first_seen, not yet committed
+        self._hits = set()      # stored keys seen again this run (last_seen refresh)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=SEEN_BUSY_TIMEOUT, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS seen (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            ) WITHOUT ROWID
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_seen_last ON seen(namespace, last_seen)')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS imports (
+                path TEXT NOT NULL,
+                namespace TEXT NOT NULL,
+                count INTEGER,
+                imported_at TEXT,
+                PRIMARY KEY (path, namespace)
+            )
+        ''')
+        # writes: committed write transactions; synced: the last one the Bloom filter has every key of
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS bloom_sync (
+                namespace TEXT PRIMARY KEY,
+                writes INTEGER NOT NULL,
+                synced INTEGER NOT NULL
+            )
+        ''')
+        self.expire()
+
+        self.bloom_path = f"{path}-{namespace}.bloom"
+        self.bloom = self._open_bloom() if SEEN_BLOOM else None
+        self._bloom_checked = time.monotonic()
+
+    def _bloom_synced(self):
+        row = self._conn.execute('SELECT writes, synced FROM bloom_sync WHERE namespace = ?',
+                                 (self.namespace,)).fetchone()
+        return row is None or row[0] == row[1]
+
+    def _open_bloom(self):
+        """The namespace's filter, (re)built from the table if missing, unreadable, over capacity or behind"""
+        try:
+            bloom = BloomFilter(self.bloom_path)
+            if bloom.count <= bloom.capacity and self._bloom_synced():
+                return bloom
+            bloom.close()
+        except (OSError, ValueError):
+            pass
+
+        # Under the write lock, so no other run commits keys the rebuild would miss
+        self._conn.execute('BEGIN IMMEDIATE')
+        try:
+            count = self._conn.execute('SELECT COUNT(*) FROM seen WHERE namespace = ?',
+                                       (self.namespace,)).fetchone()[0]
+            keys = (row[0] for row in self._conn.execute('SELECT key FROM seen WHERE namespace = ?',
+                                                         (self.namespace,)))
+            bloom = BloomFilter.create(self.bloom_path, max(SEEN_BLOOM_MIN_CAPACITY, 2 * count),
+                                       SEEN_BLOOM_FP, keys)
+            self._conn.execute('INSERT INTO bloom_sync VALUES (?, 0, 0) '
+                               'ON CONFLICT(namespace) DO UPDATE SET synced = writes', (self.namespace,))
+        finally:
+            self._conn.execute('COMMIT')
+        return bloom
+
+    def _bloom_add(self, keys):
+        """Called inside the write transaction, which serializes bit updates across processes"""
+        if self.bloom is None:
+            return
+        if not os.path.exists(self.bloom_path) or os.stat(self.bloom_path).st_ino != self.bloom.inode:
+            # Another run rebuilt the filter: switch to its file
+            self.bloom.close()
+            self.bloom = BloomFilter(self.bloom_path)
+        self.bloom.update(keys)
+
+    def _check_bloom(self):
+        """Lookup side of _bloom_add: follow another run's rebuild, rebuild if the table got ahead"""
+        if time.monotonic() - self._bloom_checked < SEEN_BLOOM_RECHECK:
+            return
+        if (not os.path.exists(self.bloom_path) or os.stat(self.bloom_path).st_ino != self.bloom.inode
+                or not self._bloom_synced()):
+            self.bloom.close()
+            self.bloom = self._open_bloom()
+        self._bloom_checked = time.monotonic()
+
+    def _stored(self, key):
+        return self._conn.execute('SELECT first_seen FROM seen WHERE namespace = ? AND key = ?',
+                                  (self.namespace, key)).fetchone()
+
+    def __contains__(self, key):
+        with self._lock:
+            self.stats['lookups'] += 1
+            if key in self._pending:
+                return True
+            if self.bloom is not None:
+                self._check_bloom()
+            if self.bloom is not None and key not in self.bloom:
+                self.stats['bloom_skips'] += 1
+                return False
+            if self._stored(key) is None:
+                return False
+            self._hits.add(key)
+            self.stats['hits'] += 1
+            return True
+
+    def first_seen(self, key):
+        """Epoch seconds the key was first recorded, or None if never seen"""
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key]
+            if self.bloom is not None:
+                self._check_bloom()
+            if self.bloom is not None and key not in self.bloom:
+                return None
+            row = self._stored(key)
+            if row is None:
+                return None
+            self._hits.add(key)
+            return row[0]
+
+    def add(self, key):
+        if key not in self:
+            with self._lock:
+                self._pending.setdefault(key, time.time())
+
+    def update(self, keys):
+        for key in keys:
+            self.add(key)
+
+    def __len__(self):
+        with self._lock:
+            count = self._conn.execute('SELECT COUNT(*) FROM seen WHERE namespace = ?',
+                                       (self.namespace,)).fetchone()[0]
+            return count + len(self._pending)
+
+    def _write(self, rows, now, new_keys):
+        """Upsert (key, first_seen) rows in one transaction: existing keys keep first_seen"""
+        self._conn.execute('BEGIN IMMEDIATE')
+        try:
+            for start in range(0, len(rows), SEEN_BATCH):
+                self._conn.executemany(
+                    'INSERT INTO seen VALUES (?, ?, ?, ?) '
+                    'ON CONFLICT(namespace, key) DO UPDATE SET last_seen = excluded.last_seen',
+                    [(self.namespace, key, first, now) for key, first in rows[start:start + SEEN_BATCH]])
+            self._conn.execute('INSERT INTO bloom_sync VALUES (?, 1, 0) '
+                               'ON CONFLICT(namespace) DO UPDATE SET writes = writes + 1', (self.namespace,))
+            if self.bloom is not None:
+                # Still in sync only if the filter had every earlier write
+                self._bloom_add(new_keys)
+                self._conn.execute('UPDATE bloom_sync SET synced = writes WHERE namespace = ? AND synced = writes - 1',
+                                   (self.namespace,))
+            self._conn.execute('COMMIT')
+        except Exception:
+            self._conn.execute('ROLLBACK')
+            raise
+
+    def commit(self):
+        """Persist new keys and refresh last_seen for keys seen again"""
+        with self._lock:
+            if not self._pending and not self._hits:
+                return
+            now = time.time()
+            rows = list(self._pending.items()) + [(key, now) for key in self._hits]
+            self._write(rows, now, list(self._pending))
+            self.stats['added'] += len(self._pending)
+            self._pending.clear()
+            self._hits.clear()
+
+    def expire(self):
+        """Drop keys not seen for the TTL"""
+        if self.ttl_seconds <= 0:
+            return 0
+        with self._lock:
+            cursor = self._conn.execute('DELETE FROM seen WHERE namespace = ? AND last_seen < ?',
+                                        (self.namespace, time.time() - self.ttl_seconds))
+            self.stats['expired'] += cursor.rowcount
+            return cursor.rowcount
+
+    def import_json(self, path, force=False):
+        """One-shot import of a seen_*.json list. Returns the number of IDs imported (0 if already done)"""
+        if not os.path.exists(path):
+            return 0
+        source = os.path.abspath(path)
+        with self._lock:
+            done = self._conn.execute('SELECT 1 FROM imports WHERE path = ? AND namespace = ?',
+                                      (source, self.namespace)).fetchone()
+            if done and not force:
+                return 0
+            with open(path, 'r') as f:
+                keys = json.load(f)
+            # No history in the JSON files: the file's mtime is the best first/last seen we have
+            mtime = os.path.getmtime(path)
+            self._write([(key, mtime) for key in keys], mtime, keys)
+            self._conn.execute('INSERT OR REPLACE INTO imports VALUES (?, ?, ?, ?)',
+                               (source, self.namespace, len(keys),
+                                datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+            self.stats['imported'] += len(keys)
+            return len(keys)
+
+    def close(self):
+        self.commit()
+        self._conn.close()
+        if self.bloom is not None:
+            self.bloom.close()
+
+    def summary(self):
+        return (f"Seen store ({self.namespace}): {self.stats['lookups']} lookups "
+                f"({self.stats['bloom_skips']} answered by the Bloom filter), {self.stats['hits']} hits, "
+                f"{self.stats['added'] + len(self._pending)} new, {self.stats['expired']} expired")
+
+
+def open_seen_store(legacy_file, path=SEEN_STORE_FILE):
+    """Store namespace replacing `legacy_file` (e.g. seen_jobs.json), importing it on first use"""
+    namespace = os.path.splitext(os.path.basename(legacy_file))[0]
+    store = SeenStore(namespace, path)
+    imported = store.import_json(legacy_file)
+    if imported:
+        print(f"Imported {imported} seen IDs from {legacy_file} into {path}")
+    return store
+
+
+def drop_reported(jobs, store, key, since=None):
+    """
+    Jobs not reported on an earlier day (first seen at/after `since`, default today 00:00);
+    all of them are recorded as seen. Same-day reruns still get the whole day's jobs.
+    """
+    since = since if since is not None else datetime.now().replace(hour=0, minute=0, second=0,
+                                                                   microsecond=0).timestamp()
+    fresh = []
+    for job in jobs:
+        first = store.first_seen(key(job))
+        if first is None or first >= since:
+            fresh.append(job)
+        store.add(key(job))
+    return fresh
+
+
+def benchmark(count, lookups=100000):
+    """JSON load/rewrite vs the store at `count` IDs"""
+    directory = tempfile.mkdtemp()
+    keys = [f"greenhouse_{n}" for n in range(count)]
+    json_path = os.path.join(directory, 'seen_jobs.json')
+    db_path = os.path.join(directory, 'seen_jobs.db')
+
+    start = time.perf_counter()
+    with open(json_path, 'w') as f:
+        json.dump(keys, f)
+    json_save = time.perf_counter() - start
+    start = time.perf_counter()
+    with open(json_path, 'r') as f:
+        loaded = set(json.load(f))
+    json_load = time.perf_counter() - start
+    del loaded
+
+    start = time.perf_counter()
+    store = SeenStore('bench', db_path)
+    store.import_json(json_path)
+    import_seconds = time.perf_counter() - start
+    store.close()
+
+    start = time.perf_counter()
+    store = SeenStore('bench', db_path)
+    open_seconds = time.perf_counter() - start
+
+    new_ids = [f"lever_{n}" for n in range(lookups)]
+    known_ids = [f"greenhouse_{random.randrange(count)}" for _ in range(lookups)]
+    start = time.perf_counter()
+    sum(1 for key in new_ids if key in store)
+    new_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    sum(1 for key in known_ids if key in store)
+    known_seconds = time.perf_counter() - start
+    skips = store.stats['bloom_skips']
+    store.close()   # also refreshes last_seen for the hits
+
+    store = SeenStore('bench', db_path)
+    store.update(f"lever_{n}" for n in range(1000))
+    start = time.perf_counter()
+    store.commit()
+    commit_seconds = time.perf_counter() - start
+    store.close()
+
+    print(f"{count:,} IDs")
+    print(f"  JSON:  load {json_load:.2f}s, rewrite {json_save:.2f}s ({os.path.getsize(json_path) / 1e6:.0f} MB)")
+    print(f"  Store: import {import_seconds:.2f}s (once), open {open_seconds * 1000:.1f} ms, "
+          f"lookups: new IDs {new_seconds / lookups * 1e6:.1f} us ({skips:,}/{lookups:,} answered by the Bloom "
+          f"filter), known IDs {known_seconds / lookups * 1e6:.1f} us, commit 1,000 new {commit_seconds * 1000:.1f} ms "
+          f"({os.path.getsize(db_path) / 1e6:.0f} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seen-jobs store")
+    sub = parser.add_subparsers(dest='command', required=True)
+    imp = sub.add_parser('import', help="import seen_*.json files")
+    imp.add_argument('files', nargs='+')
+    imp.add_argument('--force', action='store_true', help="re-import files already imported")
+    sub.add_parser('stats', help="IDs per namespace")
+    bench = sub.add_parser('bench', help="JSON vs store at N IDs")
+    bench.add_argument('--ids', type=int, default=1000000)
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        for path in args.files:
+            store = SeenStore(os.path.splitext(os.path.basename(path))[0])
+            print(f"{path}: {store.import_json(path, args.force)} IDs -> {store.namespace}")
+            store.close()
+    elif args.command == 'stats':
+        conn = sqlite3.connect(SEEN_STORE_FILE)
+        for namespace, count, first, last in conn.execute(
+                'SELECT namespace, COUNT(*), MIN(first_seen), MAX(last_seen) FROM seen GROUP BY namespace'):
+            print(f"{namespace}: {count} IDs | first {datetime.fromtimestamp(first):%Y-%m-%d} | "
+                  f"last {datetime.fromtimestamp(last):%Y-%m-%d}")
+    else:
+        benchmark(args.ids)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Single-Roundtrip SERP Extraction
+- One injected execute_script call per result page returns every container's
+  title, href and snippet as JSON, instead of find_element/.text/get_attribute
+  per result (4+ WebDriver round trips each, 40+ per page)
+- Same container selectors as before: div.tF2Cxc, fallback div.g
+- Every mode returns (title, url, snippet) per result
+- SERP_EXTRACT=html pulls driver.page_source once and parses it with serp_parser
+  (the browser only fetches; parsing happens off the WebDriver connection)
+- SERP_EXTRACT=elements keeps the old per-element walk
+- Benchmark: python serp_extract.py --html saved_serp.html --repeats 20
+"""
+
+import argparse
+import os
+import statistics
+import time
+from pathlib import Path
+
+from selenium.webdriver.common.by import By
+
+from serp_parser import SNIPPET_SELECTOR, parse_containers
+
+SERP_EXTRACT = os.getenv('SERP_EXTRACT', 'script')  # script | html | elements
+
+DEFAULT_SELECTORS = ('div.tF2Cxc', 'div.g')
+
+# First selector with any containers wins; containers without an h3 or a link are
+# skipped, like the element walk. innerText matches WebElement.text (rendered text)
+EXTRACT_JS = """
+const selectors = arguments[0];
+for (const selector of selectors) {
+    const containers = document.querySelectorAll(selector);
+    if (!containers.length) continue;
+    const results = [];
+    for (const el of containers) {
+        const h3 = el.querySelector('h3');
+        const a = el.querySelector('a');
+        if (!h3 || !a) continue;
+        const snippet = el.querySelector('.VwiC3b, [data-sncf], .IsZvec');
+        results.push({
+            title: h3.innerText.trim(),
+            url: a.href,
+            snippet: snippet ? snippet.innerText.trim() : ''
+        });
+    }
+    return {selector: selector, containers: containers.length, results: results};
+}
+return {selector: null, containers: 0, results: []};
+"""
+
+
+def walk_elements(elements):
+    """Yield (title, url, snippet) from live result containers, one WebDriver call at a time"""
+    for result in elements:
+        try:
+            title = result.find_element(By.CSS_SELECTOR, 'h3').text.strip()
+            url = result.find_element(By.CSS_SELECTOR, 'a').get_attribute('href')
+        except Exception:
+            continue
+        snippet = result.find_elements(By.CSS_SELECTOR, SNIPPET_SELECTOR)
+
+        yield title, url, snippet[0].text.strip() if snippet else ''
+
+
+def extract_page(driver, selectors=DEFAULT_SELECTORS, mode=None):
+    """
+    Extract the current result page.
+    Returns (containers, [(title, url, snippet)]): containers is the number of result
+    containers matched, so callers can tell an empty page from unparseable ones
+    """
+    mode = mode or SERP_EXTRACT
+    if mode == 'script':
+        page = driver.execute_script(EXTRACT_JS, list(selectors))
+        return page['containers'], [(r['title'], r['url'], r['snippet']) for r in page['results']]
+
+    if mode == 'html':
+        _, containers, results = parse_containers(driver.page_source, selectors)
+        return containers, [(r['title'], r['url'], r['snippet']) for r in results]
+
+    elements = []
+    for selector in selectors:
+        elements = driver.find_elements(By.CSS_SELECTOR, selector)
+        if elements:
+            break
+    return len(elements), list(walk_elements(elements))
+
+
+def benchmark(driver, selectors=DEFAULT_SELECTORS, repeats=20):
+    """Time every mode on the page currently loaded. Returns {mode: [seconds, ...]}"""
+    timings = {'elements': [], 'script': [], 'html': []}
+    outputs = {}
+    for _ in range(repeats):
+        for mode in timings:
+            start = time.perf_counter()
+            outputs[mode] = extract_page(driver, selectors, mode)
+            timings[mode].append(time.perf_counter() - start)
+
+    if not outputs['elements'][1] == outputs['script'][1] == outputs['html'][1]:
+        print("WARNING: extraction modes disagree on this page")
+    return timings
+
+
+def main():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    parser = argparse.ArgumentParser(
+        description="Per-page SERP extraction latency: element walk vs one script vs page source")
+    parser.add_argument('--html', required=True, help="Saved Google result page")
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    options = Options()
+    options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    driver = webdriver.Chrome(options=options)
+    try:
+        driver.get(Path(args.html).resolve().as_uri())
+        containers, results = extract_page(driver, mode='script')
+        print(f"{containers} containers, {len(results)} results")
+
+        timings = benchmark(driver, repeats=args.repeats)
+        for mode, times in timings.items():
+            print(f"{mode:<9} median {statistics.median(times) * 1000:7.1f} ms | "
+                  f"max {max(times) * 1000:7.1f} ms")
+        speedup = statistics.median(timings['elements']) / statistics.median(timings['script'])
+        print(f"script is {speedup:.1f}x faster per page")
+    finally:
+        driver.quit()
+
+
+if __name__ == "__main__":
+    main()
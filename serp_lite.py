@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Lightweight SERP Loading
+- Navigates straight to a constructed google.com/search URL instead of loading the
+  homepage, typing the query and clicking pnnext (3 full page loads for 30 results)
+- Requests up to 100 results per page (num=); if Google returns fewer, the next
+  page is another direct URL with start= advanced past what was returned (only
+  while the page still has a pnnext link)
+- Blocks images, fonts and media through the DevTools protocol
+- Counts page loads and bytes transferred per query for both flows, so the run
+  summary shows what the classic flow costs compared to this one
+"""
+
+import os
+import threading
+import weakref
+from urllib.parse import urlencode
+
+from page_ready import wait_for_results
+from response_cache import get_cache
+from serp_parser import parse_containers
+
+SERP_LITE = os.getenv('SERP_LITE', '0') == '1'
+SERP_LITE_NUM = int(os.getenv('SERP_LITE_NUM', 100))                      # results per page requested
+SERP_BLOCK_RESOURCES = os.getenv('SERP_BLOCK_RESOURCES', '1') == '1'
+
+BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico', '*.avif',
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*.mp4', '*.webm', '*.mp3', '*.m4a',
+    '*encrypted-tbn*.gstatic.com/*',   # result thumbnails
+    '*fonts.gstatic.com/*',
+]
+
+# Sum of transferSize over the navigation and its resources (Resource Timing API;
+# cross-origin entries without Timing-Allow-Origin report 0, so this is a lower bound)
+TRANSFER_SIZE_JS = """
+const entries = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+return entries.reduce((total, e) => total + (e.transferSize || 0), 0);
+"""
+
+_blocking = weakref.WeakSet()
+_lock = threading.Lock()
+_stats = {}  # flow -> {'queries', 'loads', 'bytes'}
+_query = threading.local()  # per thread (pool workers): did the current query load a page
+
+
+def search_url(query, start=0, num=SERP_LITE_NUM):
+    """Direct Google results URL"""
+    params = {'q': query, 'num': num, 'hl': 'en'}
+    if start:
+        params['start'] = start
+    return 'https://www.google.com/search?' + urlencode(params)
+
+
+def enable_resource_blocking(driver):
+    """Block images/fonts/media for every later request of this driver (once per driver)"""
+    if not SERP_BLOCK_RESOURCES or driver in _blocking:
+        return
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+        _blocking.add(driver)
+    except Exception as e:
+        print(f"    Resource blocking unavailable: {str(e)[:60]}")
+
+
+def start_query():
+    """A query starts: it counts as served from the response cache until begin_query()"""
+    _query.live = False
+
+
+def query_was_live():
+    """Whether this thread's current query loaded anything (True if start_query wasn't called)"""
+    return getattr(_query, 'live', True)
+
+
+def begin_query(flow):
+    """Count a live (uncached) query for `flow` ('classic' or 'lite')"""
+    _query.live = True
+    with _lock:
+        _stats.setdefault(flow, {'queries': 0, 'loads': 0, 'bytes': 0})['queries'] += 1
+
+
+def record_load(driver, flow):
+    """Count one page load and its transferred bytes. Returns the bytes"""
+    try:
+        transferred = int(driver.execute_script(TRANSFER_SIZE_JS) or 0)
+    except Exception:
+        transferred = 0
+    with _lock:
+        entry = _stats.setdefault(flow, {'queries': 0, 'loads': 0, 'bytes': 0})
+        entry['loads'] += 1
+        entry['bytes'] += transferred
+    return transferred
+
+
+def iter_lite_pages(driver, query, date_filter, selectors, max_results):
+    """
+    Yield result pages as lists of (title, url, snippet) via direct URLs, until max_results
+    results have been fetched, a page comes back empty or there is no next page
+    """
+    cache = get_cache()
+    query_with_filter = f"{query} after:{date_filter}"
+    live = False
+    start = 0
+
+    while start < max_results:
+        html = cache.get('google_serp_lite', query, start, date_filter)
+        if html is None:
+            if not live:
+                enable_resource_blocking(driver)
+                begin_query('lite')
+                live = True
+            driver.get(search_url(query_with_filter, start))
+            wait_for_results(driver, selectors)
+            transferred = record_load(driver, 'lite')
+            html = driver.page_source
+            source = f"{transferred / 1024:.0f} KB"
+        else:
+            source = "cached"
+
+        _, containers, results = parse_containers(html, selectors)
+        print(f"    Query: {query_with_filter} | start {start}: {len(results)} results ({source})")
+
+        if not results:
+            return
+
+        # Empty pages may be CAPTCHA/consent walls, so only cache real results
+        if source != "cached":
+            cache.put('google_serp_lite', query, start, date_filter, html)
+
+        yield [(r['title'], r['url'], r['snippet']) for r in results]
+
+        # Same stop condition as the classic flow: no next-page link, no more results
+        if 'id="pnnext"' not in html:
+            return
+        start += containers
+
+
+def print_load_stats():
+    """Page loads and bytes per live query, per flow"""
+    parts = []
+    for flow, entry in sorted(_stats.items()):
+        if not entry['queries']:
+            continue
+        loads = entry['loads'] / entry['queries']
+        size = entry['bytes'] / entry['queries'] / 1024
+        parts.append(f"{flow} {entry['queries']} queries, {loads:.1f} loads/query, {size:.0f} KB/query")
+    if parts:
+        print("SERP loads: " + " | ".join(parts))
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+SERP HTML Parser
+- Extracts title/url/snippet from Google result page HTML (driver.page_source or
+  saved pages) with lxml, without touching the browser
+- Same container selectors as google_search: div.tF2Cxc, fallback div.g; also
+  understands the selector chain diagnose_brave.py tries
+- Saved pages can be parsed in a process pool:
+  python serp_parser.py debug_screenshots/*.html --workers 4
+"""
+
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from lxml import html as lxml_html
+
+SERP_PARSE_WORKERS = int(os.getenv('SERP_PARSE_WORKERS', os.cpu_count() or 1))
+
+DEFAULT_SELECTORS = ('div.tF2Cxc', 'div.g')
+
+# Everything diagnose_brave.py tries, best first
+SELECTOR_CHAIN = (
+    'div.tF2Cxc',
+    'div.g',
+    'div[data-sokoban-container]',
+    'div.Gx5Zad',
+    'div.yuRUbf',
+    'div#rso div',
+    'div#search div',
+    'div#search a',
+    '[data-ved]',
+)
+
+SNIPPET_SELECTOR = '.VwiC3b, [data-sncf], .IsZvec'
+
+# tag, #id, .class and [attr] / [attr=value] parts of one compound selector
+_PART_RE = re.compile(r'([#.])([\w-]+)|\[([\w-]+)(?:=["\']?([^"\'\]]*)["\']?)?\]')
+_TAG_RE = re.compile(r'^[a-zA-Z][\w-]*|^\*')
+
+_xpath_cache = {}
+
+
+def css_to_xpath(selector):
+    """Translate the simple CSS used for SERP containers (descendant combinators,
+    tag, #id, .class, [attr], [attr=value], comma lists) to XPath"""
+    if selector in _xpath_cache:
+        return _xpath_cache[selector]
+
+    alternatives = []
+    for group in selector.split(','):
+        path = ''
+        for compound in group.split():
+            tag = _TAG_RE.match(compound)
+            rest = compound[tag.end():] if tag else compound
+            conditions = []
+            for kind, name, attr, value in _PART_RE.findall(rest):
+                if kind == '#':
+                    conditions.append(f'@id="{name}"')
+                elif kind == '.':
+                    conditions.append(f'contains(concat(" ", normalize-space(@class), " "), " {name} ")')
+                elif value:
+                    conditions.append(f'@{attr}="{value}"')
+                else:
+                    conditions.append(f'@{attr}')
+            step = (tag.group(0) if tag else '*') + ''.join(f'[{c}]' for c in conditions)
+            path += '//' + step
+        alternatives.append('.' + path)
+
+    xpath = ' | '.join(alternatives)
+    _xpath_cache[selector] = xpath
+    return xpath
+
+
+def select(root, selector):
+    """Elements matching a CSS selector, in document order"""
+    return root.xpath(css_to_xpath(selector))
+
+
+def _text(element):
+    return ' '.join(element.text_content().split())
+
+
+def _outermost(elements):
+    """Drop matches nested inside another match (Google nests div.g)"""
+    matched = set(elements)
+    return [el for el in elements if not any(parent in matched for parent in el.iterancestors())]
+
+
+def _result(container):
+    """{'title', 'url', 'snippet'} for one container, or None without a title/link"""
+    if container.tag == 'a':
+        link = container
+        h3 = container.find('.//h3')
+        title = _text(h3) if h3 is not None else _text(container)
+    else:
+        h3 = container.find('.//h3')
+        link = container.find('.//a[@href]')
+        if h3 is None or link is None:
+            return None
+        title = _text(h3)
+
+    url = link.get('href')
+    if not url or not title:
+        return None
+
+    snippet = select(container, SNIPPET_SELECTOR)
+    return {'title': title, 'url': url, 'snippet': _text(snippet[0]) if snippet else ''}
+
+
+def parse_containers(page_html, selectors=DEFAULT_SELECTORS):
+    """
+    Parse once; the first selector with any containers wins.
+    Returns (selector, containers, [{'title', 'url', 'snippet'}])
+    """
+    if not page_html:
+        return None, 0, []
+    root = lxml_html.fromstring(page_html)
+    for selector in selectors:
+        containers = _outermost(select(root, selector))
+        if containers:
+            results = [r for r in map(_result, containers) if r is not None]
+            return selector, len(containers), results
+    return None, 0, []
+
+
+def parse_serp_html(page_html, selectors=DEFAULT_SELECTORS):
+    """Return [{'title', 'url', 'snippet'}] for the first selector that matches any container"""
+    return parse_containers(page_html, selectors)[2]
+
+
+def selector_report(page_html, selectors=SELECTOR_CHAIN):
+    """Per selector: (selector, matches, sample result or None) - for debugging selectors offline"""
+    root = lxml_html.fromstring(page_html)
+    report = []
+    for selector in selectors:
+        matches = select(root, selector)
+        sample = next((r for r in map(_result, _outermost(matches)) if r is not None), None)
+        report.append((selector, len(matches), sample))
+    return report
+
+
+def _parse_file(args):
+    path, selectors = args
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return path, parse_containers(f.read(), selectors)
+
+
+def parse_files(paths, selectors=DEFAULT_SELECTORS, workers=SERP_PARSE_WORKERS):
+    """Parse saved pages in a process pool. Returns [(path, (selector, containers, results))] in input order"""
+    tasks = [(path, tuple(selectors)) for path in paths]
+    if workers <= 1 or len(tasks) <= 1:
+        return [_parse_file(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_parse_file, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse saved Google result pages offline")
+    parser.add_argument('paths', nargs='+', help="Saved SERP HTML files")
+    parser.add_argument('--workers', type=int, default=SERP_PARSE_WORKERS)
+    parser.add_argument('--chain', action='store_true', help="Try the full diagnostic selector chain")
+    parser.add_argument('--quiet', action='store_true', help="Only print the summary")
+    args = parser.parse_args()
+
+    selectors = SELECTOR_CHAIN if args.chain else DEFAULT_SELECTORS
+    start = time.perf_counter()
+    parsed = parse_files(args.paths, selectors, args.workers)
+    elapsed = time.perf_counter() - start
+
+    total = 0
+    for path, (selector, containers, results) in parsed:
+        total += len(results)
+        if args.quiet:
+            continue
+        print(f"{path}: {len(results)} results ({containers} x {selector})")
+        for r in results:
+            print(f"  {r['title'][:60]:<60} {r['url'][:70]}")
+
+    print(f"\n{len(parsed)} pages, {total} results in {elapsed:.2f}s "
+          f"({len(parsed) / elapsed:.0f} pages/s, {args.workers} workers)")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,9 @@
 API Key Diagnostic Script
 """
 
-import requests
 import os
 from dotenv import load_dotenv
+from http_transport import http_get, print_transport_stats
 
 load_dotenv()
 
@@ -28,7 +28,7 @@ params = {
 }
 
 try:
-    response = requests.get(url, params=params, timeout=10)
+    response = http_get(url, params=params, timeout=10)
     
     print(f"\nStatus Code: {response.status_code}")
     
@@ -59,4 +59,6 @@ try:
 except Exception as e:
     print(f"\nException occurred: {e}")
 
-print("\n" + "=" * 60)
+print()
+print_transport_stats()
+print("=" * 60)
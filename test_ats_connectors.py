@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+ATS connector tests against a local stub server replaying recorded board payloads
+Run: python -m pytest test_ats_connectors.py
+"""
+
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+import ats_connectors
+import board_sync
+
+FIXTURES = Path(__file__).parent / 'fixtures' / 'ats'
+
+# Public endpoint path -> recorded payload
+ROUTES = {
+    '/v1/boards/acme-ai/jobs': 'greenhouse_acme-ai.json',
+    '/v0/postings/acme-ai': 'lever_acme-ai.json',
+    '/posting-api/job-board/acme-ai': 'ashby_acme-ai.json',
+}
+
+
+class StubBoardHandler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        StubBoardHandler.requests.append(self.path)
+        path = self.path.split('?')[0]
+        board_path, _, posting_id = path.rpartition('/')
+        if path in ROUTES:
+            body = (FIXTURES / ROUTES[path]).read_bytes()
+        elif board_path in ROUTES and board_path.startswith('/v1/boards/'):
+            # Greenhouse single posting, served from the recorded board listing
+            jobs = json.loads((FIXTURES / ROUTES[board_path]).read_text())['jobs']
+            body = json.dumps(next(job for job in jobs if str(job['id']) == posting_id)).encode()
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    """Serve the recorded payloads and point every connector at them (restored after the test)"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubBoardHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr(ats_connectors, 'GREENHOUSE_API_BASE', base)
+    monkeypatch.setattr(ats_connectors, 'LEVER_API_BASE', base)
+    monkeypatch.setattr(ats_connectors, 'ASHBY_API_BASE', base)
+    StubBoardHandler.requests = []
+    yield server
+    server.shutdown()
+
+
+def test_board_urls():
+    """Kept job URLs map back to the boards that list them"""
+    urls = [
+        'https://boards.greenhouse.io/acme-ai/jobs/4012345',
+        'https://jobs.lever.co/acme-ai/5f1c2a9e-7b3d-4c1e-9a2b-0d4e6f8a1b2c/apply',
+        'https://jobs.ashbyhq.com/Acme-AI/0b6f2f0e-3c4d-4e5f-8a9b-1c2d3e4f5a6b',
+        'https://boards.greenhouse.io/acme-ai/jobs/4012346',
+        'https://www.linkedin.com/jobs/view/123',
+    ]
+    assert ats_connectors.boards_from_urls(urls) == [
+        ('greenhouse', 'acme-ai'), ('lever', 'acme-ai'), ('ashby', 'acme-ai')]
+    assert ats_connectors.parse_board_spec('greenhouse:acme-ai, bogus:x,ashby:acme-ai') == [
+        ('greenhouse', 'acme-ai'), ('ashby', 'acme-ai')]
+
+
+def test_poll_boards(stub_server):
+    """Each connector maps its payload to Custom Search shaped items"""
+    boards = [('greenhouse', 'acme-ai'), ('lever', 'acme-ai'), ('ashby', 'acme-ai'), ('lever', 'missing')]
+    polled = {board: (items, error) for board, items, error in ats_connectors.poll_boards(boards)}
+
+    items, error = polled[('greenhouse', 'acme-ai')]
+    assert error is None
+    assert len(items) == 3
+    assert items[0]['link'] == 'https://boards.greenhouse.io/acme-ai/jobs/4012345'
+    assert items[0]['snippet'].startswith('San Francisco, CA. We are building retrieval augmented generation')
+
+    items, error = polled[('lever', 'acme-ai')]
+    assert [i['title'] for i in items] == ['Applied AI Engineer', 'MLOps Engineer']
+    assert items[0]['location'] == 'New York, NY'
+
+    items, error = polled[('ashby', 'acme-ai')]
+    assert len(items) == 1  # unlisted posting dropped
+    assert items[0]['location'] == 'Boston, MA (Remote)'
+
+    items, error = polled[('lever', 'missing')]
+    assert items == [] and '404' in error
+
+
+def test_board_jobs_go_through_filters(stub_server):
+    """Board postings come out of parse_job_results like Google results do"""
+    os.environ.setdefault('GOOGLE_API_KEY', 'stub-key-for-tests')
+    os.environ.setdefault('SEARCH_ENGINE_ID', 'stub-cx')
+    import job_scraper_quick
+
+    polled = ats_connectors.poll_boards([('greenhouse', 'acme-ai'), ('lever', 'acme-ai'), ('ashby', 'acme-ai')])
+
+    jobs = []
+    for metadata, results in ats_connectors.board_results(polled):
+        jobs.extend(job_scraper_quick.parse_job_results(results, metadata, verbose=False))
+
+    by_id = {job['job_id']: job for job in jobs}
+    # Staff role (senior), London and Toronto (non-US) are filtered out
+    assert sorted(by_id) == [
+        'ashby_0b6f2f0e-3c4d-4e5f-8a9b-1c2d3e4f5a6b',
+        'greenhouse_4012345',
+        'lever_5f1c2a9e-7b3d-4c1e-9a2b-0d4e6f8a1b2c',
+    ]
+    assert by_id['greenhouse_4012345']['company'] == 'Acme Ai'
+    assert by_id['greenhouse_4012345']['ats'] == 'Greenhouse'
+    assert by_id['lever_5f1c2a9e-7b3d-4c1e-9a2b-0d4e6f8a1b2c']['location'] == 'New York, NY'
+
+
+def test_board_diff():
+    """Sorted-ID merge diff: added, changed (updated after the cursor) and closed postings"""
+    def item(posting_id, updated_at):
+        return {'posting_id': posting_id, 'link': f"https://jobs.lever.co/acme-ai/{posting_id}", 'updated_at': updated_at}
+
+    _, cursor = board_sync.diff_board(None, [item('b', 1769800000000), item('a', 1769700000000), item('c', 1769700000000)])
+    assert cursor['ids'] == ['a', 'b', 'c']
+
+    delta, cursor = board_sync.diff_board(cursor, [item('b', 1769900000000), item('c', 1769700000000), item('d', 1769900000000)])
+    assert [i['posting_id'] for i in delta['added']] == ['d']
+    assert [i['posting_id'] for i in delta['changed']] == ['b']
+    assert delta['removed'] == [{'posting_id': 'a', 'link': 'https://jobs.lever.co/acme-ai/a', 'title': '', 'location': ''}]
+    assert cursor['ids'] == ['b', 'c', 'd'] and cursor['updated_at'] == 1769900000.0
+
+
+def test_board_sync_only_scores_delta(stub_server):
+    """First sync lists everything (Greenhouse content fetched per posting), a re-sync yields nothing"""
+    cursors = {}
+    boards = [('greenhouse', 'acme-ai'), ('ashby', 'acme-ai')]
+    first = board_sync.sync_boards(boards, cursors)
+    # No cursor yet: one listing with content, no request per posting
+    assert [p for p in StubBoardHandler.requests if p.startswith('/v1/')] == [
+        '/v1/boards/acme-ai/jobs?content=true']
+    second = board_sync.sync_boards(boards, cursors)
+
+    (_, gh_delta, gh_listed, _), (_, ashby_delta, _, _) = first
+    assert gh_listed == 3 and len(gh_delta['added']) == 3
+    assert 'retrieval augmented generation' in gh_delta['added'][0]['snippet']
+    assert len(ashby_delta['added']) == 1
+    assert all(not d['added'] and not d['changed'] and not d['removed'] for _, d, _, _ in second)
+    assert board_sync.delta_polled(second) == [(('greenhouse', 'acme-ai'), [], None), (('ashby', 'acme-ai'), [], None)]
+
+
+def test_board_sync_large_delta_lists_content_once(stub_server, monkeypatch):
+    """A delta above GREENHOUSE_DELTA_FETCH_MAX is filled from one content listing, a small one per posting"""
+    board = ('greenhouse', 'acme-ai')
+    _, cursor = board_sync.diff_board(None, [])     # synced before, empty board
+    monkeypatch.setattr(board_sync, 'GREENHOUSE_DELTA_FETCH_MAX', 2)
+    _, delta, _, _ = board_sync.sync_board(board, {'greenhouse:acme-ai': cursor})
+    assert StubBoardHandler.requests == ['/v1/boards/acme-ai/jobs?content=false', '/v1/boards/acme-ai/jobs?content=true']
+    assert len(delta['added']) == 3 and 'retrieval augmented generation' in delta['added'][0]['snippet']
+
+    StubBoardHandler.requests = []
+    monkeypatch.setattr(board_sync, 'GREENHOUSE_DELTA_FETCH_MAX', 10)
+    board_sync.sync_board(board, {'greenhouse:acme-ai': cursor})
+    assert len(StubBoardHandler.requests) == 4 and StubBoardHandler.requests[0].endswith('content=false')
+
+# Fake Workday tenant: 45 US + 5 Canada postings, search + location facets applied server-side
+US_FACET_ID = 'bc33aa3152ec42d4995f4791a106ed09'
+CA_FACET_ID = 'a30a87ed25634629aa6c3958aa2b91ea'
+WORKDAY_POSTINGS = (
+    [{'title': f"Machine Learning Engineer {n}", 'externalPath': f"/job/US-CA-Santa-Clara/Machine-Learning-Engineer_JR{1000 + n}",
+      'locationsText': 'US, CA, Santa Clara', 'postedOn': 'Posted Today', 'bulletFields': [f"JR{1000 + n}"],
+      'country': US_FACET_ID} for n in range(45)]
+    + [{'title': f"Machine Learning Engineer {n}", 'externalPath': f"/job/Canada-Toronto/Machine-Learning-Engineer_JR{2000 + n}",
+        'locationsText': 'Toronto, Canada', 'postedOn': 'Posted Yesterday', 'bulletFields': [f"JR{2000 + n}"],
+        'country': CA_FACET_ID} for n in range(5)]
+    + [{'title': 'Payroll Specialist', 'externalPath': '/job/US-TX-Austin/Payroll-Specialist_JR3000',
+        'locationsText': 'US, TX, Austin', 'postedOn': 'Posted Today', 'bulletFields': ['JR3000'],
+        'country': US_FACET_ID}]
+)
+
+
+class FakeWorkdayHandler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        # Posting detail: /wday/cxs/<tenant>/<site>/job/<location>/<title_id>
+        path = self.path.replace('/wday/cxs/acme/AcmeCareers', '', 1)
+        if not any(p['externalPath'] == path for p in WORKDAY_POSTINGS):
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = json.dumps({'jobPostingInfo': {
+            'jobDescription': '<p>Train and deploy <b>LLM</b> and computer vision models with PyTorch on AWS.</p>',
+        }}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if self.path != '/wday/cxs/acme/AcmeCareers/jobs':
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        FakeWorkdayHandler.requests.append(payload)
+        if payload['limit'] > 20:
+            self.send_response(400)
+            self.end_headers()
+            return
+
+        countries = payload['appliedFacets'].get('locationCountry')
+        matches = [p for p in WORKDAY_POSTINGS
+                   if payload['searchText'].lower() in p['title'].lower()
+                   and (not countries or p['country'] in countries)]
+        page = matches[payload['offset']:payload['offset'] + payload['limit']]
+        body = json.dumps({
+            'total': len(matches),
+            'jobPostings': [{k: v for k, v in p.items() if k != 'country'} for p in page],
+            'facets': [{'facetParameter': 'locationMainGroup', 'values': [
+                {'facetParameter': 'locationCountry', 'descriptor': 'Country', 'values': [
+                    {'descriptor': 'United States of America', 'id': US_FACET_ID, 'count': 46},
+                    {'descriptor': 'Canada', 'id': CA_FACET_ID, 'count': 5},
+                ]},
+            ]}],
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_workday_connector(monkeypatch):
+    """Keyword + country facet applied server-side, every page fetched, links on the tenant host"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeWorkdayHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(ats_connectors, 'WORKDAY_API_BASE', f"http://127.0.0.1:{server.server_address[1]}")
+    FakeWorkdayHandler.requests = []
+    try:
+        board = ats_connectors.board_from_url(
+            'https://acme.wd5.myworkdayjobs.com/en-US/AcmeCareers/job/US-CA-Santa-Clara/Machine-Learning-Engineer_JR1000')
+        assert board == ('workday', 'acme.wd5/AcmeCareers')
+        items = ats_connectors.fetch_workday(board[1], search_text='machine learning',
+                                             locations='United States of America')
+    finally:
+        server.shutdown()
+
+    # 1 facet discovery request + 3 pages of 20 for 45 US matches
+    assert len(FakeWorkdayHandler.requests) == 4
+    assert all(r['appliedFacets'] == {'locationCountry': [US_FACET_ID]} for r in FakeWorkdayHandler.requests[1:])
+    assert sorted(r['offset'] for r in FakeWorkdayHandler.requests[1:]) == [0, 20, 40]
+
+    assert len(items) == 45
+    assert all('Canada' not in item['location'] for item in items)
+    assert items[0]['link'] == ('https://acme.wd5.myworkdayjobs.com/AcmeCareers'
+                                '/job/US-CA-Santa-Clara/Machine-Learning-Engineer_JR1000')
+    assert items[0]['snippet'].startswith('US, CA, Santa Clara. United States of America | JR1000 | Posted Today | '
+                                          'Train and deploy LLM')
+
+    os.environ.setdefault('GOOGLE_API_KEY', 'stub-key-for-tests')
+    os.environ.setdefault('SEARCH_ENGINE_ID', 'stub-cx')
+    import job_scraper_quick
+
+    metadata = {'location': 'United States', 'role': 'ATS Board', 'ats': 'Workday'}
+    jobs = job_scraper_quick.parse_job_results({'items': items}, metadata, verbose=False)
+    assert len(jobs) == 45
+    assert jobs[0]['job_id'] == 'workday_Machine-Learning-Engineer_JR1000'
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Parquet history tests: partition layout, dictionary columns, pruned top-N query, compaction
+Run: python -m pytest test_history_store.py
+"""
+
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+pq = pytest.importorskip('pyarrow.parquet')
+
+from history_store import compact, partition_files, stats, top_jobs, write_jobs
+
+
+def job(n, fit, days_ago=0, role='AI/ML Engineer'):
+    found = datetime.now() - timedelta(days=days_ago)
+    return {'title': f"ML Engineer {n}", 'company': 'Acme AI', 'location': 'New York, NY', 'ats': 'Greenhouse',
+            'role_category': role, 'url': f"https://boards.greenhouse.io/acme/jobs/{n}", 'job_id': f"greenhouse_{n}",
+            'fit_score': fit, 'date_found': found.strftime('%Y-%m-%d %H:%M'), 'status': 'Not Applied'}
+
+
+def test_partitioned_by_date_and_category(tmp_path):
+    files = write_jobs([job(1, 80), job(2, 60, days_ago=3), job(3, 70, role='LLM Engineer')], 'quick',
+                       root=str(tmp_path))
+    assert len(files) == 3
+    today = datetime.now().strftime('%Y-%m-%d')
+    assert os.path.isdir(tmp_path / f"date={today}" / 'category=ai_ml_engineer')
+    assert os.path.isdir(tmp_path / f"date={today}" / 'category=llm_engineer')
+
+    schema = pq.read_schema(files[0])
+    assert str(schema.field('company').type).startswith('dictionary')
+    assert str(schema.field('url').type) == 'string'
+
+    # Pruning by directory name: older days and other categories are never opened
+    since = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+    assert len(partition_files(str(tmp_path), since)) == 2
+    assert len(partition_files(str(tmp_path), since, ['LLM Engineer'])) == 1
+
+
+def test_top_jobs_last_days(tmp_path):
+    root = str(tmp_path)
+    write_jobs([job(1, 50), job(2, 90, days_ago=10), job(3, 75, days_ago=2), job(4, 40)], 'quick', root=root)
+    # The same job recorded again by another run keeps only its best row
+    write_jobs([job(3, 75, days_ago=1), job(5, None)], 'brave', root=root)
+
+    top = top_jobs(days=7, limit=10, root=root)
+    assert [row['job_id'] for row in top] == ['greenhouse_3', 'greenhouse_1', 'greenhouse_4']
+    assert top[0]['category'] == 'ai_ml_engineer'
+    assert [row['job_id'] for row in top_jobs(days=7, min_fit=45, root=root)] == ['greenhouse_3', 'greenhouse_1']
+
+
+def test_compact_merges_partition_files(tmp_path):
+    root = str(tmp_path)
+    for n in range(3):
+        write_jobs([job(n, 60 + n, days_ago=2)], 'quick', root=root)
+    assert stats(root)[2:4] == (3, 3)
+
+    assert compact(root) == (1, 3)
+    assert stats(root)[2:4] == (1, 3)
+    assert [row['job_id'] for row in top_jobs(days=7, root=root)] == ['greenhouse_2', 'greenhouse_1', 'greenhouse_0']
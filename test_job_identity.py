@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Job identity tests: IDs keep their formats, tracking params never split a job, companies come from the URL
+Run: python -m pytest test_job_identity.py
+"""
+
+from job_identity import extract_company_name, extract_job_id, normalize_url, resolve
+
+
+def test_ats_ids_and_companies():
+    cases = [
+        ('https://boards.greenhouse.io/acme-ai/jobs/4012345?gh_src=abc', 'greenhouse_4012345', 'Acme Ai', 'Greenhouse'),
+        ('https://job-boards.greenhouse.io/embed/job_app?for=acme&token=4012345', 'greenhouse_4012345', 'Acme',
+         'Greenhouse'),
+        ('https://jobs.ashbyhq.com/acme/0a1b2c3d-1234-4abc-8def-000000000001/application',
+         'ashby_0a1b2c3d-1234-4abc-8def-000000000001', 'Acme', 'Ashby'),
+        ('https://jobs.lever.co/acme/0a1b2c3d-aaaa-4bbb-8ccc-000000000001/apply?lever-source=LinkedIn',
+         'lever_0a1b2c3d-aaaa-4bbb-8ccc-000000000001', 'Acme', 'Lever'),
+        ('https://acme.wd5.myworkdayjobs.com/en-US/External/job/New-York-NY/ML-Engineer_JR1234',
+         'workday_ML-Engineer_JR1234', 'Acme', 'Workday'),
+        ('https://careers-acme.icims.com/jobs/7012/ml-engineer/job?hub=7', 'icims_7012', 'Acme', 'iCIMS'),
+        ('https://www.acme.com/careers/open-roles?gh_jid=4012345&utm_source=linkedin', 'greenhouse_4012345', None,
+         'Greenhouse'),
+    ]
+    for url, job_id, company, ats in cases:
+        identity = resolve(url)
+        assert (identity.canonical_id, identity.company, identity.ats) == (job_id, company, ats), url
+
+
+def test_tracking_params_do_not_split_a_job():
+    plain = 'https://www.acme.com/jobs/123'
+    for url in ['https://WWW.acme.com/jobs/123/', 'https://www.acme.com/jobs/123?utm_source=x&ref=y',
+                'https://www.acme.com/jobs/123#apply']:
+        assert normalize_url(url) == plain
+        assert extract_job_id(url) == plain
+    assert normalize_url('https://www.acme.com/jobs?team=ml&src=li') == 'https://www.acme.com/jobs?team=ml'
+
+
+def test_company_falls_back_to_title():
+    assert extract_company_name('https://www.acme.com/jobs/123', 'ML Engineer at Acme AI') == 'Acme AI'
+    assert extract_company_name('https://www.acme.com/jobs/123', 'ML Engineer - Acme AI') == 'Acme AI'
+    assert extract_company_name('https://www.acme.com/jobs/123', 'ML Engineer', 'Unknown Company') == 'Unknown Company'
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate index tests: location copies, cross-ATS copies and reposts fold; other levels and teams don't
+Run: python -m pytest test_near_dup.py
+"""
+
+import pytest
+
+from near_dup import NearDupIndex, title_tokens
+
+SNIPPET = ("We are looking for a Machine Learning Engineer to build ranking models for our marketplace. "
+           "You will own training pipelines, feature stores and online evaluation. 3 days ago")
+
+
+def job(key, title, company='Acme AI', snippet=SNIPPET, url=None):
+    return {'job_id': key, 'title': title, 'company': company, 'snippet': snippet,
+            'url': url or f"https://example.com/{key}"}
+
+
+@pytest.fixture
+def index(tmp_path):
+    return NearDupIndex('test', path=str(tmp_path / 'near_dup.db'))
+
+
+def test_title_tokens_strip_company_and_location():
+    assert title_tokens('Job Application for Machine Learning Engineer at Acme AI', 'Acme AI') == \
+        ['machine', 'learning', 'engineer']
+    assert title_tokens('Acme AI - Machine Learning Engineer', 'acme-ai') == ['machine', 'learning', 'engineer']
+    assert title_tokens('Machine Learning Engineer - New York, NY (Hybrid)', 'Acme') == \
+        ['machine', 'learning', 'engineer']
+
+
+def test_copies_fold_into_first_seen(index):
+    jobs = [
+        job('greenhouse_1', 'Machine Learning Engineer - New York, NY'),
+        job('ashby_abc', 'Machine Learning Engineer @ Acme AI', company='acme-ai',
+            snippet=SNIPPET.replace('3 days ago', '1 day ago')),
+        job('greenhouse_2', 'Job Application for Machine Learning Engineer at Acme AI'),
+    ]
+    kept = index.fold(jobs, key=lambda j: j['job_id'], verbose=False)
+    assert [j['job_id'] for j in kept] == ['greenhouse_1']
+
+    # A later run: the canonical job is still kept, its copies still folded
+    kept = index.fold(jobs, key=lambda j: j['job_id'], verbose=False)
+    assert [j['job_id'] for j in kept] == ['greenhouse_1']
+
+
+def test_other_level_team_or_company_is_kept(index):
+    jobs = [
+        job('greenhouse_1', 'Machine Learning Engineer'),
+        job('greenhouse_2', 'Senior Machine Learning Engineer'),
+        job('greenhouse_3', 'Machine Learning Engineer', snippet="Join the payments team to build fraud "
+                                                                 "detection systems in Go and Postgres."),
+        job('lever_x', 'Machine Learning Engineer', company='Other Corp'),
+    ]
+    kept = index.fold(jobs, key=lambda j: j['job_id'], verbose=False)
+    assert len(kept) == 4
+
+
+def test_folds_are_written_on_commit_without_holding_the_db(tmp_path):
+    path = str(tmp_path / 'near_dup.db')
+    first = NearDupIndex('test', path=path)
+    first.fold([job('greenhouse_1', 'Machine Learning Engineer')], key=lambda j: j['job_id'], verbose=False)
+
+    # An overlapping run on the same file neither waits on nor sees the uncommitted fold state
+    other = NearDupIndex('test', path=path)
+    copy = job('ashby_abc', 'Machine Learning Engineer @ Acme AI')
+    assert len(other.fold([copy], key=lambda j: j['job_id'], verbose=False)) == 1
+    other.commit()
+
+    first.commit()
+    later = NearDupIndex('test', path=path)
+    assert later.fold([job('lever_x', 'Machine Learning Engineer')], key=lambda j: j['job_id'], verbose=False) == []
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Seen store tests: Bloom prefilter answers only definite misses, stays in step with the table,
+legacy JSON imports once, old IDs expire, overlapping runs lose no IDs
+Run: python -m pytest test_seen_store.py
+"""
+
+import json
+import multiprocessing
+import os
+import time
+
+import pytest
+
+import seen_store
+from bloom_filter import BloomFilter
+from seen_store import SeenStore, open_seen_store
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / 'seen_jobs.db')
+
+
+def test_bloom_filter_has_no_false_negatives(tmp_path):
+    path = str(tmp_path / 'test.bloom')
+    bloom = BloomFilter.create(path, 10000, 0.01, (f"greenhouse_{n}" for n in range(5000)))
+    assert all(f"greenhouse_{n}" in bloom for n in range(5000))
+    assert sum(f"lever_{n}" in bloom for n in range(5000)) < 150   # ~1% false positives
+    assert bloom.count == 5000
+
+    # Reopened from the file: same bits, same count
+    bloom.close()
+    bloom = BloomFilter(path)
+    assert 'greenhouse_42' in bloom and bloom.count == 5000
+    bloom.close()
+
+
+def test_lookups_and_commit(db):
+    store = SeenStore('test', db)
+    store.update(['greenhouse_1', 'lever_a'])
+    assert 'greenhouse_1' in store and len(store) == 2
+    store.close()
+
+    store = SeenStore('test', db)
+    assert 'greenhouse_1' in store and 'lever_a' in store
+    assert 'ashby_x' not in store and store.stats['bloom_skips'] >= 1
+    # Namespaces don't share IDs
+    assert 'greenhouse_1' not in SeenStore('other', db)
+    store.close()
+
+
+def test_filter_rebuilt_when_behind_the_table(db, monkeypatch):
+    SeenStore('test', db).close()
+
+    # A run with the filter off commits keys the filter never gets
+    monkeypatch.setattr(seen_store, 'SEEN_BLOOM', False)
+    store = SeenStore('test', db)
+    store.add('greenhouse_1')
+    store.close()
+
+    monkeypatch.setattr(seen_store, 'SEEN_BLOOM', True)
+    store = SeenStore('test', db)
+    assert 'greenhouse_1' in store
+    store.close()
+
+
+def test_open_store_follows_other_runs(db, monkeypatch):
+    monkeypatch.setattr(seen_store, 'SEEN_BLOOM_RECHECK', 0)
+    store = SeenStore('test', db)
+
+    monkeypatch.setattr(seen_store, 'SEEN_BLOOM', False)
+    other = SeenStore('test', db)
+    other.add('greenhouse_1')
+    other.close()
+    assert 'greenhouse_1' in store     # table got ahead: rebuilt on the next lookup
+
+    # Another run replaces the filter file: lookups switch to it
+    monkeypatch.setattr(seen_store, 'SEEN_BLOOM', True)
+    os.remove(store.bloom_path)
+    other = SeenStore('test', db)
+    other.add('greenhouse_2')
+    other.close()
+    assert 'greenhouse_2' in store
+    assert os.stat(store.bloom_path).st_ino == store.bloom.inode
+    store.close()
+
+
+def test_legacy_json_imported_once(db, tmp_path):
+    legacy = tmp_path / 'seen_jobs.json'
+    legacy.write_text(json.dumps(['greenhouse_1', 'greenhouse_2']))
+
+    store = open_seen_store(str(legacy), db)
+    assert store.namespace == 'seen_jobs'
+    assert 'greenhouse_1' in store and len(store) == 2
+    store.close()
+
+    legacy.write_text(json.dumps(['greenhouse_1', 'greenhouse_2', 'greenhouse_3']))
+    store = open_seen_store(str(legacy), db)
+    assert 'greenhouse_3' not in store
+    assert store.import_json(str(legacy), force=True) == 3 and 'greenhouse_3' in store
+    store.close()
+
+
+def test_ids_not_seen_for_the_ttl_expire(db, tmp_path):
+    legacy = tmp_path / 'seen_jobs.json'
+    legacy.write_text(json.dumps(['greenhouse_old']))
+    month_ago = time.time() - 30 * 86400
+    os.utime(legacy, (month_ago, month_ago))    # imported IDs are last seen at the file's mtime
+
+    store = SeenStore('seen_jobs', db, ttl_days=0)
+    store.import_json(str(legacy))
+    store.add('greenhouse_new')
+    store.close()
+
+    store = SeenStore('seen_jobs', db, ttl_days=7)
+    assert store.stats['expired'] == 1
+    assert 'greenhouse_old' not in store and 'greenhouse_new' in store
+    store.close()
+
+
+def _commit_range(path, prefix, count):
+    store = SeenStore('test', path)
+    for n in range(count):
+        store.add(f"{prefix}_{n}")
+        if n % 50 == 49:
+            store.commit()
+    store.close()
+
+
+def test_overlapping_runs_lose_no_ids(db):
+    SeenStore('test', db).close()
+    context = multiprocessing.get_context('fork')
+    runs = [context.Process(target=_commit_range, args=(db, prefix, 500)) for prefix in ('greenhouse', 'lever')]
+    for run in runs:
+        run.start()
+    for run in runs:
+        run.join(60)
+    assert [run.exitcode for run in runs] == [0, 0]
+
+    store = SeenStore('test', db)
+    assert len(store) == 1000
+    assert all(f"{prefix}_{n}" in store for prefix in ('greenhouse', 'lever') for n in range(500))
+    assert store.stats['bloom_skips'] == 0     # both runs' keys reached the shared filter
+    store.close()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Offline SERP parser tests against saved result pages
+Run: python -m pytest test_serp_parser.py
+"""
+
+from pathlib import Path
+
+from serp_parser import parse_containers, parse_files, parse_serp_html, selector_report
+
+FIXTURES = Path(__file__).parent / 'fixtures' / 'serp'
+
+
+def test_parse_saved_serp():
+    html = (FIXTURES / 'google_results.html').read_text()
+    selector, containers, results = parse_containers(html)
+
+    assert (selector, containers) == ('div.tF2Cxc', 3)
+    assert [r['url'].rsplit('/', 2)[1] for r in results] == ['acme-ai', 'orbital', 'northwind']
+    assert results[0]['title'] == 'Machine Learning Engineer & Applied Scientist - Acme AI'
+    assert results[0]['snippet'] == '2 days ago — New York, NY. Build ranking models for our search platform.'
+    assert results[1]['snippet'] == 'Remote (US). Fine-tune and serve LLMs.'
+    assert results[2]['snippet'] == ''
+
+
+def test_selector_fallback_and_chain():
+    legacy = (FIXTURES / 'google_results_legacy.html').read_text()
+
+    # No div.tF2Cxc: fall back to outermost div.g, skipping the one without h3/link
+    selector, containers, results = parse_containers(legacy)
+    assert (selector, containers, len(results)) == ('div.g', 4, 3)
+
+    # The gmp scraper only accepts div.tF2Cxc
+    assert parse_serp_html(legacy, selectors=('div.tF2Cxc',)) == []
+
+    report = {selector: (count, sample) for selector, count, sample in selector_report(legacy)}
+    assert report['div.tF2Cxc'] == (0, None)
+    assert report['div#search a'][0] == 3
+    assert report['div.yuRUbf'][1]['title'] == 'Machine Learning Engineer & Applied Scientist - Acme AI'
+
+
+def test_parse_files_in_pool():
+    paths = [str(FIXTURES / 'google_results.html'), str(FIXTURES / 'google_results_legacy.html')] * 3
+    sequential = parse_files(paths, workers=1)
+    pooled = parse_files(paths, workers=2)
+
+    assert pooled == sequential
+    assert [containers for _, (_, containers, _) in pooled] == [3, 4] * 3